@@ -4,19 +4,25 @@ VRP Optimization Endpoint
 Converts API request to VRP domain ontology and runs OR-Tools solver.
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 import sys
 import os
+import tempfile
 
 # Add parent path to import vrp_solver
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
 from schemas.models import (
-    OptimizeRequest, OptimizeResponse, 
-    VehicleRoute, RouteStop, CostBreakdown
+    OptimizeRequest, OptimizeResponse, OptimizeProgress,
+    VehicleRoute, RouteStop, CostBreakdown, BuildStage, ShipmentDiagnostic
 )
 
 router = APIRouter(prefix="/api/optimize", tags=["optimize"])
 
+# Resubmitted scenarios reuse the built CP-SAT model ("" disables the cache)
+MODEL_CACHE_DIR = os.environ.get("VRP_MODEL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "vrp-model-cache"))
+MODEL_CACHE_MAX_MB = int(os.environ.get("VRP_MODEL_CACHE_MAX_MB", "512"))
+
 
 def convert_request_to_vrp_data(request: OptimizeRequest):
     """Convert API request to VRPData domain object."""
@@ -26,8 +32,9 @@ def convert_request_to_vrp_data(request: OptimizeRequest):
         Shipment as DomainShipment, Cargo as DomainCargo,
         LaborPolicy, WorkShift, BreakRule, LaborCost,
         PenaltyConfig as DomainPenaltyConfig, OperationalCost,
-        Stop, StopType
+        share_profiles
     )
+    from vrp_solver.logic.data_loader import build_stops
     from vrp_solver.domain.shipment import TimeWindow as DomainTimeWindow
     
     # Build site_id -> index mapping
@@ -88,7 +95,11 @@ def convert_request_to_vrp_data(request: OptimizeRequest):
         )
         vehicles.append(domain_veh)
     
-    # Matrices (needed for Time Paradox safety check)
+    # Matrices (needed for Time Paradox safety check): one row and column per site
+    num_sites = len(request.sites)
+    for name, matrix in (("durations", request.durations), ("distances", request.distances)):
+        if matrix and (len(matrix) != num_sites or any(len(row) != num_sites for row in matrix)):
+            raise HTTPException(status_code=400, detail=f"{name} must be {num_sites}x{num_sites} (one row and column per site)")
     travel_time = request.durations
     travel_dist = [[d // 1000 for d in row] for row in request.distances]  # m -> km
     setup_time = [[0] * len(locations) for _ in range(len(locations))]
@@ -134,59 +145,11 @@ def convert_request_to_vrp_data(request: OptimizeRequest):
         )
         shipments.append(domain_ship)
     
-    # Build Stops (Stop-based architecture)
-    stops = []
-    stop_id = 0
-    
-    # Start depots (one per vehicle)
-    for v_idx, veh in enumerate(vehicles):
-        stops.append(Stop(
-            id=stop_id,
-            stop_type=StopType.DEPOT_START,
-            location_idx=veh.start_loc,
-            vehicle_idx=v_idx,
-            shipment_idx=-1,
-            weight_delta=0,
-            volume_delta=0
-        ))
-        stop_id += 1
+    # Build Stops (Stop-based architecture, columnar)
+    stops = build_stops(vehicles, shipments)
     
-    # Shipment stops (pickup + delivery)
-    for s_idx, ship in enumerate(shipments):
-        stops.append(Stop(
-            id=stop_id,
-            stop_type=StopType.PICKUP,
-            location_idx=ship.pickup_id,
-            shipment_idx=s_idx,
-            vehicle_idx=-1,
-            weight_delta=+ship.cargo.weight,
-            volume_delta=+ship.cargo.volume
-        ))
-        stop_id += 1
-        
-        stops.append(Stop(
-            id=stop_id,
-            stop_type=StopType.DELIVERY,
-            location_idx=ship.delivery_id,
-            shipment_idx=s_idx,
-            vehicle_idx=-1,
-            weight_delta=-ship.cargo.weight,
-            volume_delta=-ship.cargo.volume
-        ))
-        stop_id += 1
-    
-    # End depots (one per vehicle)
-    for v_idx, veh in enumerate(vehicles):
-        stops.append(Stop(
-            id=stop_id,
-            stop_type=StopType.DEPOT_END,
-            location_idx=veh.end_loc,
-            vehicle_idx=v_idx,
-            shipment_idx=-1,
-            weight_delta=0,
-            volume_delta=0
-        ))
-        stop_id += 1
+    # One instance per distinct profile/cargo/window value
+    share_profiles(locations, vehicles, shipments)
     
     penalties = DomainPenaltyConfig(
         unserved=request.penalties.unserved,
@@ -212,22 +175,144 @@ def convert_request_to_vrp_data(request: OptimizeRequest):
 @router.post("", response_model=OptimizeResponse)
 async def optimize(request: OptimizeRequest):
     """Run VRP optimization."""
-    from vrp_solver.config import VRPConfig
-    from vrp_solver.ortools_solver.wrapper import VRPSolver
-    from vrp_solver.ortools_solver.constraints.routing import RoutingConstraints
-    from vrp_solver.ortools_solver.constraints.time import TimeConstraints
-    from vrp_solver.ortools_solver.constraints.capacity import CapacityConstraints
-    from vrp_solver.ortools_solver.constraints.flow import FlowConstraints
-    from vrp_solver.ortools_solver.constraints.lifo import LifoConstraints
-    from vrp_solver.ortools_solver.constraints.objectives import ObjectiveConstraints
-    from ortools.sat.python import cp_model
+    from vrp_solver.ortools_solver.backends import build_model
+    from vrp_solver.ortools_solver.horizon import solve_iterative
+    from vrp_solver.ortools_solver.lns import solve_lns
+    from vrp_solver.ortools_solver.staged import solve_staged
+    from vrp_solver.heuristics.alns import solve_alns
+    from vrp_solver.ortools_solver.routing_engine import solve_routing
+    from vrp_solver.domain import Solution
     
     # Convert request to domain
-    vrp_data, site_id_map = convert_request_to_vrp_data(request)
+    try:
+        vrp_data, site_id_map = convert_request_to_vrp_data(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))  # E.g. a non-square matrix
     idx_to_site_id = {v: k for k, v in site_id_map.items()}
     
     # Config
-    # Config
+    config = build_config(request)
+    
+    # Pre-solve: answer hopeless requests without spending solver time
+    diagnostics, hopeless = run_presolve(request, vrp_data, config)
+    if hopeless:
+        response = build_response(request, Solution(status="infeasible"), idx_to_site_id)
+        response.diagnostics = diagnostics
+        return response
+    
+    # Build model (all constraint modules) and solve
+    solver = None  # CP-SAT engines: source of the debug build profile
+    try:
+        if config.solver_engine == "alns":
+            solution = solve_alns(vrp_data, config)
+        elif config.solver_engine == "routing":
+            solution = solve_routing(vrp_data, config)
+        elif config.solver_engine != "cpsat":
+            raise ValueError(
+                f"Unknown solver engine '{config.solver_engine}' (expected 'cpsat', 'routing' or 'alns')"
+            )
+        elif config.use_lns:
+            solver, solution, _ = solve_lns(vrp_data, config)
+        elif config.objective_mode == "staged":
+            solver, solution, _ = solve_staged(vrp_data, config)
+        elif config.objective_mode != "weighted":
+            raise ValueError(f"Unknown objective mode '{config.objective_mode}' (expected 'weighted' or 'staged')")
+        else:
+            if config.route_horizon == "iterative":
+                solver, cp_solver, status = solve_iterative(vrp_data, config)
+            else:
+                solver = build_model(vrp_data, config)
+                cp_solver, status = solver.solve()
+            solution = solver.extract_solution(cp_solver, status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response = build_response(request, solution, idx_to_site_id)
+    response.diagnostics = diagnostics
+    if request.config.debug and solver is not None:
+        response.build_profile = [BuildStage(**stage) for stage in solver.build_profile.as_dicts()]
+    return response
+
+
+@router.post("/stream")
+def optimize_stream(request: OptimizeRequest):
+    """
+    Run VRP optimization, streaming every improving plan as Server-Sent Events.
+    
+    Events are "solution" (intermediate plan) and a closing "result" with
+    the final status. Streams the single CP-SAT model (full horizon).
+    """
+    from vrp_solver.ortools_solver.backends import build_model
+    from vrp_solver.ortools_solver.parameters import get_profile
+    from vrp_solver.domain import Solution
+    
+    config = build_config(request)
+    
+    try:
+        vrp_data, site_id_map = convert_request_to_vrp_data(request)
+        if config.solver_engine != "cpsat" or config.use_lns:
+            raise ValueError("Streaming needs solver_engine 'cpsat' without LNS")
+        get_profile(config.solver_profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    idx_to_site_id = {v: k for k, v in site_id_map.items()}
+    
+    # Pre-solve: a hopeless request streams its closing result without a model
+    diagnostics, hopeless = run_presolve(request, vrp_data, config)
+    if hopeless:
+        result = build_response(request, Solution(status="infeasible"), idx_to_site_id)
+        result.diagnostics = diagnostics
+        progress = OptimizeProgress(objective=0, wall_time=0.0, final=True, result=result)
+        return StreamingResponse(iter([f"event: result\ndata: {progress.model_dump_json()}\n\n"]),
+                                 media_type="text/event-stream")
+    
+    try:
+        solver = build_model(vrp_data, config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    def events():
+        for update in solver.solve_stream():
+            result = build_response(request, update.solution, idx_to_site_id)
+            result.diagnostics = diagnostics
+            progress = OptimizeProgress(
+                objective=update.objective,
+                bound=update.bound,
+                wall_time=update.wall_time,
+                final=update.final,
+                result=result,
+            )
+            event = "result" if update.final else "solution"
+            yield f"event: {event}\ndata: {progress.model_dump_json()}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def run_presolve(request: OptimizeRequest, vrp_data, config):
+    """
+    Pre-solve feasibility checks: (diagnostics, hopeless).
+    
+    Instance errors are a 400; hopeless requests need no solve.
+    """
+    from vrp_solver.analysis.presolve import presolve
+    
+    if not request.config.presolve:
+        return [], False
+    report = presolve(vrp_data, config)
+    if report.errors:
+        raise HTTPException(status_code=400, detail="; ".join(report.errors))
+    diagnostics = [
+        ShipmentDiagnostic(shipment_id=request.shipments[diag.shipment_idx].id,
+                           reason=diag.reason, message=diag.message)
+        for diag in report.unservable
+    ]
+    return diagnostics, report.hopeless
+
+
+def build_config(request: OptimizeRequest):
+    """Map the API SolverConfig onto VRPConfig."""
+    from vrp_solver.config import VRPConfig
+    
     if request.config:
         # Use provided config
         config = VRPConfig()
@@ -249,31 +334,39 @@ async def optimize(request: OptimizeRequest):
         config.late_penalty = request.config.late_penalty
         config.zone_penalty = request.config.zone_penalty
         
+        config.solver_engine = request.config.solver_engine
+        config.model_backend = request.config.model_backend
+        config.arc_encoding = request.config.arc_encoding
+        config.route_horizon = request.config.route_horizon
+        config.rehandling_mode = request.config.rehandling_mode
+        config.load_cost_mode = request.config.load_cost_mode
+        config.objective_mode = request.config.objective_mode
+        config.service_objective = request.config.service_objective
+        config.service_stage_time = request.config.service_stage_time
+        config.cost_stage_time = request.config.cost_stage_time
+        config.use_lns = request.config.use_lns
+        config.lns_slice_time = request.config.lns_slice_time
+        config.lns_seed = request.config.lns_seed
+        config.alns_max_iterations = request.config.alns_max_iterations
+        config.alns_seed = request.config.alns_seed
         config.max_solver_time = request.config.max_solver_time
         config.num_solver_workers = request.config.num_solver_workers
+        config.solver_profile = request.config.solver_profile
+        config.profile_build = request.config.debug
     else:
         # Fallback to defaults + top-level legacy overrides
         config = VRPConfig()
         config.max_solver_time = request.max_solver_time
         # Legacy penalties override if needed, but we'll assume new frontend uses config
-
     
-    # Create solver
-    solver = VRPSolver(vrp_data, config)
-    solver.create_variables()
-    
-    # Apply constraints
-    RoutingConstraints.apply(solver)
-    TimeConstraints.apply(solver)
-    CapacityConstraints.apply(solver)
-    FlowConstraints.apply(solver)
-    LifoConstraints.apply(solver)
-    ObjectiveConstraints.apply(solver)
-    
-    # Solve
-    cp_solver, status = solver.solve()
-    
-    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+    config.model_cache_dir = MODEL_CACHE_DIR
+    config.model_cache_max_mb = MODEL_CACHE_MAX_MB
+    return config
+
+
+def build_response(request: OptimizeRequest, solution, idx_to_site_id: dict) -> OptimizeResponse:
+    """Convert a variable-free Solution into the API response."""
+    if not solution.is_feasible:
         return OptimizeResponse(
             status="infeasible",
             routes=[],
@@ -285,65 +378,43 @@ async def optimize(request: OptimizeRequest):
         )
     
     # Extract results (Stop-based)
-    cars = solver.variables
     routes = []
-    
-    for v in range(solver.num_vehicles):
-        if not cp_solver.Value(cars['is_used'][v]):
-            continue
-        
+    for route in solution.routes:
         stops = []
-        
-        for s in range(solver.max_steps):
-            is_d = cp_solver.Value(cars['is_done'][v, s])
-            prev_d = cp_solver.Value(cars['is_done'][v, s-1]) if s > 0 else False
+        for stop in route.stops:
+            loc_idx = stop.location_idx
+            site_id = idx_to_site_id.get(loc_idx, f"site_{loc_idx}")
             
-            if not is_d or (is_d and not prev_d):
-                stop_idx = cp_solver.Value(cars['route'][v, s])
-                stop = vrp_data.stops[stop_idx]
-                loc_idx = stop.location_idx
-                site_id = idx_to_site_id.get(loc_idx, f"site_{loc_idx}")
-                
-                route_stop = RouteStop(
-                    site_id=site_id,
-                    arrival_time=cp_solver.Value(cars['arrival_time'][v, s]),
-                    load_weight=cp_solver.Value(cars['load_w'][v, s]) / config.capacity_scale_factor,
-                    load_volume=cp_solver.Value(cars['load_v'][v, s]) / config.capacity_scale_factor,
-                    is_late=bool(cp_solver.Value(cars['debug_is_late'].get((v, s), 0))),
-                    stop_type=stop.stop_type.value,
-                    shipment_id=request.shipments[stop.shipment_idx].id if stop.shipment_idx >= 0 else None
-                )
-                stops.append(route_stop)
+            route_stop = RouteStop(
+                site_id=site_id,
+                arrival_time=stop.arrival_time,
+                load_weight=stop.cum_weight,
+                load_volume=stop.cum_volume,
+                is_late=stop.late_arrival_min > 0,
+                stop_type=stop.stop_type.value,
+                shipment_id=request.shipments[stop.shipment_idx].id if stop.shipment_idx >= 0 else None
+            )
+            stops.append(route_stop)
         
         veh_route = VehicleRoute(
-            vehicle_id=request.vehicles[v].id,
+            vehicle_id=request.vehicles[route.vehicle_id].id,
             stops=stops,
-            total_distance=0,
+            total_distance=int(route.total_distance),
             total_time=stops[-1].arrival_time if stops else 0
         )
         routes.append(veh_route)
     
     # Costs
-    costs = CostBreakdown(
-        fixed=cp_solver.Value(cars['c_fixed']),
-        distance=cp_solver.Value(cars['c_dist']),
-        labor=cp_solver.Value(cars['c_time']),
-        zone_penalty=cp_solver.Value(cars['c_zone']),
-        rehandling=cp_solver.Value(cars.get('c_rehandling', 0)),
-        waiting=cp_solver.Value(cars['c_waiting']),
-        late_penalty=cp_solver.Value(cars['c_late']),
-        unserved_penalty=cp_solver.Value(cars['c_penalty']),
-        total=cp_solver.Value(cars['total_cost'])
-    )
+    costs = CostBreakdown(**solution.costs)
     
     # Unserved (now uses shipment index, not location index!)
     unserved = []
     for i, ship in enumerate(request.shipments):
-        if not cp_solver.Value(cars['is_served'][i]):
+        if not solution.served[i]:
             unserved.append(ship.id)
     
     return OptimizeResponse(
-        status="optimal" if status == cp_model.OPTIMAL else "feasible",
+        status=solution.status,
         routes=routes,
         costs=costs,
         unserved_shipments=unserved
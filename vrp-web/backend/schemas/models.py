@@ -99,6 +99,11 @@ class MatrixResponse(BaseModel):
 # Optimize Request/Response
 # ============================================================
 
+class PenaltyConfig(BaseModel):
+    unserved: int = 500000
+    late_delivery: int = 50000
+    zone_crossing: int = 2000
+
 
 class SolverConfig(BaseModel):
     # Scale
@@ -125,8 +130,26 @@ class SolverConfig(BaseModel):
     zone_penalty: int = 2000
     
     # Solver
+    solver_engine: str = "cpsat"  # "cpsat", "routing" (OR-Tools routing library) or "alns" (large instances)
+    model_backend: str = "step"  # "step" or "circuit"
+    arc_encoding: str = "element"  # "element" or "table" (step backend)
+    route_horizon: str = "full"  # "full" or "iterative"
+    rehandling_mode: str = "compact"  # "exact", "compact" or "post_eval"
+    load_cost_mode: str = "linear"  # "linear" or "product"
+    objective_mode: str = "weighted"  # "weighted" or "staged" (service first, then cost)
+    service_objective: str = "count"  # Staged stage 1: "count" or "priority"
+    service_stage_time: float = 10.0
+    cost_stage_time: float = 20.0
+    use_lns: bool = False  # Large Neighborhood Search on top of CP-SAT
+    lns_slice_time: float = 5.0
+    lns_seed: int = 0
+    alns_max_iterations: int = 1000000
+    alns_seed: int = 0
     max_solver_time: float = 30.0
-    num_solver_workers: int = 8
+    num_solver_workers: int = 8  # 0 = all CPUs of the quota
+    solver_profile: str = "balanced"  # "fast-feasible", "balanced", "deep" or "deterministic"
+    debug: bool = False  # Return the model-build profile (CP-SAT engines)
+    presolve: bool = True  # Feasibility checks first: hopeless requests skip the solver
 
 class OptimizeRequest(BaseModel):
     sites: List[Site]
@@ -145,6 +168,8 @@ class RouteStop(BaseModel):
     load_weight: float
     load_volume: float
     is_late: bool = False
+    stop_type: str = ""
+    shipment_id: Optional[str] = None
 
 class VehicleRoute(BaseModel):
     vehicle_id: str
@@ -163,8 +188,30 @@ class CostBreakdown(BaseModel):
     unserved_penalty: int
     total: int
 
+class BuildStage(BaseModel):
+    stage: str  # "__init__", "create_variables", constraint module or "warm_start"
+    wall_time: float  # Seconds
+    variables: int
+    constraints: int
+    enforcement_literals: int
+    proto_bytes: int
+
+class ShipmentDiagnostic(BaseModel):
+    shipment_id: str
+    reason: str  # "tags", "capacity", "pickup_window", "delivery_window" or "shift"
+    message: str
+
 class OptimizeResponse(BaseModel):
-    status: str  # "optimal", "feasible", "infeasible"
+    status: str  # "optimal", "feasible", "heuristic" (construction plan) or "infeasible"
     routes: List[VehicleRoute]
     costs: CostBreakdown
     unserved_shipments: List[str] = Field(default_factory=list)
+    diagnostics: List[ShipmentDiagnostic] = Field(default_factory=list)  # Shipments no vehicle can serve (presolve)
+    build_profile: Optional[List[BuildStage]] = None  # SolverConfig.debug only
+
+class OptimizeProgress(BaseModel):
+    objective: int
+    bound: Optional[float] = None  # Best objective bound so far
+    wall_time: float  # Seconds since the solve started
+    final: bool  # Last event: status of the finished solve
+    result: OptimizeResponse
@@ -108,6 +108,15 @@ export function ResultPanel() {
                             <p className="text-xs text-red-600 mt-1">
                                 {result.unserved_shipments.map(id => id).join(', ')}
                             </p>
+                            {result.diagnostics && result.diagnostics.length > 0 && (
+                                <ul className="text-xs text-red-600 mt-2 space-y-0.5">
+                                    {result.diagnostics.map(diag => (
+                                        <li key={diag.shipment_id}>
+                                            <span className="font-semibold">{diag.shipment_id}</span>: {diag.message}
+                                        </li>
+                                    ))}
+                                </ul>
+                            )}
                         </div>
                     </div>
                 )}
@@ -103,11 +103,18 @@ export interface CostBreakdown {
     total: number;
 }
 
+export interface ShipmentDiagnostic {
+    shipment_id: string;
+    reason: 'tags' | 'capacity' | 'pickup_window' | 'delivery_window' | 'shift';
+    message: string;
+}
+
 export interface OptimizeResult {
-    status: 'optimal' | 'feasible' | 'infeasible';
+    status: 'optimal' | 'feasible' | 'heuristic' | 'infeasible';  // heuristic: construction plan, no solver solution
     routes: VehicleRoute[];
     costs: CostBreakdown;
     unserved_shipments: string[];
+    diagnostics?: ShipmentDiagnostic[];  // Shipments no vehicle can serve (pre-solve checks)
 }
 
 export interface SolverConfig {
@@ -0,0 +1,201 @@
+"""
+Pre-Solve Feasibility Analysis.
+
+Vectorized checks that run before any model is built, in milliseconds:
+
+- Instance: matrix shapes vs locations, location references in range,
+  no negative travel times/distances
+- Shipment x vehicle: required tags, cargo vs capacity, and the earliest
+  schedule of start depot -> pickup -> delivery -> end depot against the
+  pickup window, the delivery window and the shift length
+
+The schedule is a lower bound of RouteEvaluator.simulate for that route
+(breaks, setup and same-site transit left out, the matrices assumed to
+satisfy the triangle inequality). Other stops only delay a shipment, so
+one that fails for every vehicle is never served by any plan. A request
+with instance errors, or where no shipment can be served, is hopeless:
+the solver would only confirm it after its full time limit.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+import numpy as np
+from vrp_solver.domain import VRPData, StopType
+from vrp_solver.config import VRPConfig
+
+
+# Checks in the order they narrow the candidate vehicles of a shipment
+CHECKS = ('tags', 'capacity', 'pickup_window', 'delivery_window', 'shift')
+
+# Shipment x vehicle cells evaluated per block (bounds the temporary arrays)
+BLOCK_CELLS = 1 << 21
+
+
+@dataclass
+class ShipmentDiagnostic:
+    """Why no vehicle can serve a shipment."""
+    shipment_idx: int
+    reason: str       # First check that left no vehicle (see CHECKS)
+    message: str
+
+
+@dataclass
+class PresolveReport:
+    """Result of presolve()."""
+    num_shipments: int = 0
+    errors: List[str] = field(default_factory=list)    # Instance-level: the data can't be modeled
+    unservable: List[ShipmentDiagnostic] = field(default_factory=list)
+    candidates: Optional[np.ndarray] = None            # [shipment, vehicle]: passes every check
+    wall_time: float = 0.0                             # Seconds
+    
+    @property
+    def hopeless(self) -> bool:
+        """Nothing a solve could achieve: invalid instance or no servable shipment."""
+        if self.errors:
+            return True
+        return self.num_shipments > 0 and len(self.unservable) == self.num_shipments
+
+
+def presolve(data: VRPData, config: VRPConfig) -> PresolveReport:
+    """Run all checks; per-shipment checks only if the instance is consistent."""
+    started = time.perf_counter()
+    report = PresolveReport(num_shipments=len(data.shipments))
+    report.errors = instance_errors(data)
+    if not report.errors:
+        report.candidates, report.unservable = shipment_diagnostics(data, config)
+    report.wall_time = time.perf_counter() - started
+    return report
+
+
+# ======================
+# Instance Checks
+# ======================
+
+def instance_errors(data: VRPData) -> List[str]:
+    """Shape and reference errors that make the instance impossible to model."""
+    errors = []
+    num_loc = len(data.locations)
+    for name in ('travel_time_matrix', 'travel_dist_matrix', 'setup_time_matrix'):
+        matrix = getattr(data, name)
+        if matrix.shape != (num_loc, num_loc):
+            errors.append(f"{name} is {matrix.shape[0]}x{matrix.shape[1]}, expected {num_loc}x{num_loc} (one per location)")
+        elif matrix.flat.size and int(matrix.flat.min()) < 0:
+            errors.append(f"{name} has negative entries")
+    
+    def out_of_range(kind, items, attrs):
+        for item in items:
+            for attr in attrs:
+                loc = getattr(item, attr)
+                if loc is None or not 0 <= loc < num_loc:
+                    errors.append(f"{kind} '{item.name or item.id}': {attr} {loc} is not a location index")
+    
+    out_of_range('Vehicle', data.vehicles, ('start_loc', 'end_loc'))
+    out_of_range('Shipment', data.shipments, ('pickup_id', 'delivery_id'))
+    if data.shipments and not data.vehicles:
+        errors.append("No vehicles to serve the shipments")
+    return errors
+
+
+# ======================
+# Shipment x Vehicle Checks
+# ======================
+
+def shipment_diagnostics(data: VRPData, config: VRPConfig):
+    """(candidates [shipment, vehicle], diagnostics of the shipments without one)."""
+    num_s, num_v = len(data.shipments), len(data.vehicles)
+    scale = config.capacity_scale_factor
+    ops = data.operations
+    
+    # Vehicle arrays
+    vehicles = data.vehicles
+    start = np.array([veh.start_loc for veh in vehicles], dtype=np.int64)
+    end = np.array([veh.end_loc for veh in vehicles], dtype=np.int64)
+    shift_start = np.array([veh.labor.shift.start_time for veh in vehicles], dtype=np.int64)
+    max_duration = np.array([veh.labor.shift.max_duration for veh in vehicles], dtype=np.int64)
+    cap_w = np.trunc([veh.profile.capacity.weight * scale for veh in vehicles]).astype(np.int64)
+    cap_v = np.trunc([veh.profile.capacity.volume * scale for veh in vehicles]).astype(np.int64)
+    
+    # Shipment arrays (windows/service from the stop table: effective values)
+    table = data.stop_table
+    pickup = np.empty(num_s, dtype=np.int64)
+    delivery = np.empty(num_s, dtype=np.int64)
+    for stops, stop_type in ((pickup, StopType.PICKUP), (delivery, StopType.DELIVERY)):
+        ids = table.ids(stop_type)
+        stops[table.shipment_idx[ids]] = ids
+    p_loc, d_loc = table.location_idx[pickup].astype(np.int64), table.location_idx[delivery].astype(np.int64)
+    weight = np.trunc([ship.weight * scale for ship in data.shipments]).astype(np.int64)
+    volume = np.trunc([ship.volume * scale for ship in data.shipments]).astype(np.int64)
+    
+    # Tags: [shipment, vehicle] count of required tags the vehicle lacks
+    vocab = sorted({tag for ship in data.shipments for tag in ship.required_tags})
+    column = {tag: k for k, tag in enumerate(vocab)}
+    required = np.zeros((num_s, len(vocab)), dtype=np.int32)
+    for s, ship in enumerate(data.shipments):
+        required[s, [column[tag] for tag in ship.required_tags]] = 1
+    lacking = np.ones((num_v, len(vocab)), dtype=np.int32)
+    for v, veh in enumerate(vehicles):
+        lacking[v, [column[tag] for tag in veh.profile.tags if tag in column]] = 0
+    
+    travel = np.asarray(data.travel_time_matrix, dtype=np.int64)
+    loc_service = np.array([loc.service_duration for loc in data.locations], dtype=np.int64)
+    # First arrival after the start depot: depot service + depot dwell (anti-teleport)
+    depart = shift_start + loc_service[start] + ops.depot_service_time
+    
+    candidates = np.zeros((num_s, num_v), dtype=bool)
+    diagnostics = []
+    block = max(1, BLOCK_CELLS // max(num_v, 1))
+    for lo in range(0, num_s, block):
+        rows = slice(lo, min(lo + block, num_s))
+        p, d = p_loc[rows], d_loc[rows]
+        
+        # Earliest schedule of start -> pickup -> delivery -> end, per vehicle
+        arr_p = np.maximum(depart[None, :] + travel[start[None, :], p[:, None]],
+                           table.window_start[pickup[rows]][:, None])
+        arr_d = np.maximum(arr_p + (table.service[pickup[rows]] + travel[p, d])[:, None],
+                           table.window_start[delivery[rows]][:, None])
+        arr_end = arr_d + table.service[delivery[rows]][:, None] + travel[d[:, None], end[None, :]]
+        
+        passed = {
+            'tags': (required[rows] @ lacking.T) == 0,
+            'capacity': (weight[rows][:, None] <= cap_w[None, :]) & (volume[rows][:, None] <= cap_v[None, :]),
+            'pickup_window': arr_p <= table.window_end[pickup[rows]][:, None],
+            'delivery_window': arr_d <= table.window_end[delivery[rows]][:, None],
+            'shift': arr_end - shift_start[None, :] <= max_duration[None, :],
+        }
+        
+        mask = np.ones((rows.stop - lo, num_v), dtype=bool)
+        failed_at = np.full(rows.stop - lo, -1)
+        for k, check in enumerate(CHECKS):
+            before = mask
+            mask = mask & passed[check]
+            failed_at[(failed_at < 0) & ~mask.any(axis=1)] = k
+            for i in np.flatnonzero(failed_at == k):
+                diagnostics.append(_diagnostic(data, scale, lo + int(i), check, before[i], arr_p[i], arr_d[i],
+                                               arr_end[i] - shift_start, max_duration, cap_w, cap_v))
+        candidates[rows] = mask
+    
+    diagnostics.sort(key=lambda diag: diag.shipment_idx)
+    return candidates, diagnostics
+
+
+def _diagnostic(data: VRPData, scale: int, s: int, check: str, still: np.ndarray,
+                arr_p, arr_d, duration, max_duration, cap_w, cap_v) -> ShipmentDiagnostic:
+    """Readable reason, from the vehicles that were still candidates before the check."""
+    ship = data.shipments[s]
+    pick_start, pick_end = data.get_stop_window(data.get_pickup_stop(s).id)
+    drop_start, drop_end = data.get_stop_window(data.get_delivery_stop(s).id)
+    if check == 'tags':
+        message = f"No vehicle has the required tags {sorted(ship.required_tags)}"
+    elif check == 'capacity':
+        message = (f"Cargo (weight {ship.weight}, volume {ship.volume}) exceeds every tag-compatible vehicle "
+                   f"(largest capacity: weight {cap_w[still].max() / scale:g}, volume {cap_v[still].max() / scale:g})")
+    elif check == 'pickup_window':
+        message = (f"Earliest pickup arrival {int(arr_p[still].min())} is after the pickup window "
+                   f"{pick_start}-{pick_end}")
+    elif check == 'delivery_window':
+        message = (f"Earliest delivery arrival {int(arr_d[still].min())} is after the delivery window "
+                   f"{drop_start}-{drop_end}")
+    else:
+        message = (f"Shortest round trip takes {int(duration[still].min())} min, "
+                   f"longer than the shift ({int(max_duration[still].max())} min)")
+    return ShipmentDiagnostic(shipment_idx=s, reason=check, message=message)
@@ -0,0 +1,96 @@
+"""
+Benchmark: Element vs Table Arc Encoding.
+
+Solves every instance of the corpus once per VRPConfig.arc_encoding with
+the same time limit and workers, and reports model size, search effort
+and the result:
+
+    python -m vrp_solver.benchmark_arc_encoding [--time 30] [--workers 8] [--backend step]
+
+Corpus: the dummy instance, the minimal constraint-debug instance and
+the hub & spoke example (hub_spoke_data.json).
+"""
+import sys
+import os
+import json
+import time
+import argparse
+from dataclasses import replace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ortools.sat.python import cp_model
+from vrp_solver.config import VRPConfig
+from vrp_solver.logic.data_loader import load_dummy_data
+from vrp_solver.ortools_solver.wrapper import ARC_ENCODINGS
+from vrp_solver.ortools_solver.backends import build_model
+from vrp_solver.test_constraints_debug import TEST_DATA, convert_to_vrp_data
+
+
+HUB_SPOKE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hub_spoke_data.json')
+
+
+def load_corpus(config: VRPConfig):
+    """(name, VRPData) of every benchmark instance."""
+    with open(HUB_SPOKE_FILE) as f:
+        hub_spoke = json.load(f)
+    return [
+        ('dummy', load_dummy_data(config)),
+        ('constraint_debug', convert_to_vrp_data(TEST_DATA)),
+        ('hub_spoke', convert_to_vrp_data(hub_spoke)),
+    ]
+
+
+def run(name: str, data, config: VRPConfig) -> dict:
+    """Build and solve one instance, return its benchmark row."""
+    started = time.time()
+    solver = build_model(data, config)
+    build_time = time.time() - started
+    proto = solver.model.Proto()
+    
+    cp_solver, status = solver.solve()
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        'instance': name,
+        'encoding': config.arc_encoding,
+        'variables': len(proto.variables),
+        'constraints': len(proto.constraints),
+        'build_s': round(build_time, 2),
+        'solve_s': round(cp_solver.WallTime(), 2),
+        'status': cp_solver.StatusName(status),
+        'objective': int(cp_solver.ObjectiveValue()) if solved else None,
+        'bound': int(cp_solver.BestObjectiveBound()) if solved else None,
+        'branches': cp_solver.NumBranches(),
+        'conflicts': cp_solver.NumConflicts(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--time', type=float, default=30.0, help='CP-SAT time per solve (s)')
+    parser.add_argument('--workers', type=int, default=8, help='CP-SAT workers (0 = all CPUs)')
+    parser.add_argument('--backend', default='step', help='model_backend (the table option applies to step)')
+    args = parser.parse_args()
+    
+    base = VRPConfig(max_solver_time=args.time, num_solver_workers=args.workers, model_backend=args.backend)
+    rows = []
+    for name, data in load_corpus(base):
+        for encoding in ARC_ENCODINGS:
+            row = run(name, data, replace(base, arc_encoding=encoding))
+            rows.append(row)
+            print(f"{name:<18} {encoding:<8} {row['status']:<10} obj={row['objective']} "
+                  f"bound={row['bound']} build={row['build_s']}s solve={row['solve_s']}s", flush=True)
+    
+    # ======================
+    # Summary Table
+    # ======================
+    columns = list(rows[0]) if rows else []
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print()
+    print('  '.join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print('  '.join(str(row[c]).ljust(widths[c]) for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -29,5 +29,30 @@ class VRPConfig:
     zone_penalty: int = 2000
 
     # Solver
+    solver_engine: str = "cpsat"     # "cpsat" (model_backend encodings), "routing" (pywrapcp) or "alns" (large instances)
+    model_backend: str = "step"      # "step" (route[v, s]) or "circuit" (arc literals)
+    arc_encoding: str = "element"    # Step legs: "element" (flat N^2 AddElement) or "table" (AddAllowedAssignments)
+    route_horizon: str = "full"      # "full" (worst-case max_steps) or "iterative" (grow per vehicle)
+    max_horizon_rounds: int = 6      # Iterative horizon: max re-solves
+    rehandling_mode: str = "compact" # "exact" (vehicle x step scan), "compact" (shared pair literals)
+                                     # or "post_eval" (computed on the solution, not optimized)
+    load_cost_mode: str = "linear"   # "linear" (weight x carried distance) or "product" (load x leg, exact products)
+    construction_hint: bool = True   # Greedy insertion plan as hint + timeout fallback
+    objective_mode: str = "weighted" # "weighted" (one total_cost) or "staged" (service first, then cost)
+    service_objective: str = "count" # Staged stage 1: "count" or "priority" (Shipment.priority-weighted)
+    service_stage_time: float = 10.0 # Staged: CP-SAT time of the service stage
+    cost_stage_time: float = 20.0    # Staged: CP-SAT time of the cost stage
+    use_lns: bool = False            # Improve the incumbent by Large Neighborhood Search
+    lns_operators: tuple = ("vehicles", "zone", "time")  # Destroy operators, round-robin
+    lns_neighborhood_size: int = 2   # Vehicles re-planned per iteration
+    lns_slice_time: float = 5.0      # CP-SAT time per iteration
+    lns_max_iterations: int = 1000
+    lns_seed: int = 0
+    alns_max_iterations: int = 1000000  # ALNS stops at max_solver_time or this many iterations
+    alns_seed: int = 0
     max_solver_time: float = 30.0
-    num_solver_workers: int = 8
+    num_solver_workers: int = 8      # 0 = all CPUs (deterministic profile: 8); capped by the process CPU quota
+    solver_profile: str = "balanced" # "fast-feasible", "balanced", "deep" or "deterministic"
+    profile_build: bool = False      # Time and size every model-build stage (solver.build_profile)
+    model_cache_dir: str = ""        # On-disk CpModel cache keyed by instance fingerprint ("" = off)
+    model_cache_max_mb: int = 512    # LRU eviction above this directory size
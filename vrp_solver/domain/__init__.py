@@ -4,16 +4,33 @@ VRP Domain Package.
 Exports all domain entities and the VRPData container.
 """
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+import numpy as np
+from typing import Any, List, Dict, Optional, Sequence, Tuple
 
 # Core Entities
-from .location import Location, SiteProfile
-from .vehicle import Vehicle, VehicleProfile, VehicleCapacity, VehicleCostProfile, VehicleCost
-from .shipment import Shipment, Cargo, TimeWindow
-from .labor import LaborPolicy, WorkShift, BreakRule, LaborCost
-from .cost import PenaltyConfig, OperationalCost
+from .location import Location, SiteProfile, FrozenSiteProfile
+from .vehicle import (
+    Vehicle, VehicleProfile, VehicleCapacity, VehicleCostProfile, VehicleCost,
+    FrozenVehicleProfile, FrozenVehicleCapacity,
+)
+from .shipment import Shipment, Cargo, TimeWindow, FrozenCargo, FrozenTimeWindow
+from .labor import (
+    LaborPolicy, WorkShift, BreakRule, LaborCost,
+    FrozenLaborPolicy, FrozenWorkShift, FrozenBreakRule, FrozenLaborCost,
+)
+from .cost import (
+    PenaltyConfig, OperationalCost,
+    FrozenVehicleCostProfile, FrozenPenaltyConfig, FrozenOperationalCost,
+)
 from .stop import Stop, StopType
+from .stop_table import StopTable, StopView
+from .matrix_store import MatrixStore
 from .route import Route
+from .solution import Solution
+from .profile_pool import ProfilePool, share_profiles, thaw
+
+# VRPData fields the lookups are built from: assigning one drops them
+_INDEXED_FIELDS = frozenset(('locations', 'vehicles', 'shipments', 'stops'))
 
 @dataclass
 class VRPData:
@@ -26,42 +43,92 @@ class VRPData:
     locations: List[Location] = field(default_factory=list)
     vehicles: List[Vehicle] = field(default_factory=list)
     shipments: List[Shipment] = field(default_factory=list)
-    stops: List[Stop] = field(default_factory=list)  # NEW: Stop-based routing
+    stops: Sequence[Stop] = field(default_factory=list)  # StopTable (columnar) or list of Stop
     
-    # Matrices [from_id][to_id]
-    travel_time_matrix: List[List[int]] = field(default_factory=list)
-    travel_dist_matrix: List[List[int]] = field(default_factory=list)
-    setup_time_matrix: List[List[int]] = field(default_factory=list)
+    # Matrices [from_id, to_id] (lists of rows are converted to MatrixStore)
+    travel_time_matrix: MatrixStore = field(default_factory=MatrixStore)
+    travel_dist_matrix: MatrixStore = field(default_factory=MatrixStore)
+    setup_time_matrix: MatrixStore = field(default_factory=MatrixStore)
     
     # Global Policies
     penalties: PenaltyConfig = field(default_factory=PenaltyConfig)
     operations: OperationalCost = field(default_factory=OperationalCost)
     
+    def __post_init__(self):
+        for name in ('travel_time_matrix', 'travel_dist_matrix', 'setup_time_matrix'):
+            matrix = getattr(self, name)
+            if not isinstance(matrix, MatrixStore):
+                setattr(self, name, MatrixStore(matrix))
+        
+        # Lazily built lookups (see _index); not a dataclass field, so
+        # asdict/replace/compare ignore it
+        self._lookup: Optional[Dict[str, Any]] = None
+    
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if name in _INDEXED_FIELDS:
+            super().__setattr__('_lookup', None)
+    
+    # --- Indexes ---
+    
+    def _index(self) -> Dict[str, Any]:
+        """
+        Id and index lookups over the entity lists, built on first use.
+        
+        Assigning an entity list drops them; after editing a list or its
+        entities in place (append, item replacement, changed ids, windows
+        or opening hours), call invalidate_indexes(). Where ids repeat,
+        the first entity wins (as with a linear scan).
+        """
+        if self._lookup is not None:
+            return self._lookup
+        
+        def first_by(items, attr):
+            lookup = {}
+            for item in items:
+                lookup.setdefault(getattr(item, attr), item)
+            return lookup
+        
+        # Columnar stops with effective windows/service (a list of Stop is converted once)
+        table = self.stops if isinstance(self.stops, StopTable) else StopTable.from_stops(self.stops)
+        table = table.resolve(self.locations, self.shipments)
+        
+        def first_stop(stop_type, key_column):
+            ids = table.ids(stop_type)
+            # Reversed: the first stop of a key wins
+            return {int(k): self.stops[int(i)] for k, i in zip(key_column[ids][::-1], ids[::-1])}
+        
+        self._lookup = {
+            'location': first_by(self.locations, 'id'),
+            'vehicle': first_by(self.vehicles, 'id'),
+            'shipment_by_pickup': first_by(self.shipments, 'pickup_id'),
+            'shipment_by_delivery': first_by(self.shipments, 'delivery_id'),
+            'pickup_stop': first_stop(StopType.PICKUP, table.shipment_idx),         # shipment_idx -> Stop
+            'delivery_stop': first_stop(StopType.DELIVERY, table.shipment_idx),     # shipment_idx -> Stop
+            'start_stop': first_stop(StopType.DEPOT_START, table.vehicle_idx),      # vehicle_idx -> Stop
+            'end_stop': first_stop(StopType.DEPOT_END, table.vehicle_idx),          # vehicle_idx -> Stop
+            'shipment_stops': [self.stops[int(i)] for i in np.flatnonzero(~table.is_depot)],
+            'stop_table': table,
+        }
+        return self._lookup
+    
+    def invalidate_indexes(self):
+        """Drop the lookups (after editing an entity list or its entities in place)."""
+        self._lookup = None
+    
     # --- Helper Methods ---
     
     def get_shipment_by_pickup(self, loc_id: int) -> Optional[Shipment]:
-        for s in self.shipments:
-            if s.pickup_id == loc_id:
-                return s
-        return None
+        return self._index()['shipment_by_pickup'].get(loc_id)
 
     def get_shipment_by_delivery(self, loc_id: int) -> Optional[Shipment]:
-        for s in self.shipments:
-            if s.delivery_id == loc_id:
-                return s
-        return None
+        return self._index()['shipment_by_delivery'].get(loc_id)
     
     def get_location(self, loc_id: int) -> Optional[Location]:
-        for loc in self.locations:
-            if loc.id == loc_id:
-                return loc
-        return None
+        return self._index()['location'].get(loc_id)
     
     def get_vehicle(self, veh_id: int) -> Optional[Vehicle]:
-        for v in self.vehicles:
-            if v.id == veh_id:
-                return v
-        return None
+        return self._index()['vehicle'].get(veh_id)
     
     # --- NEW: Stop-based helpers ---
     
@@ -76,40 +143,42 @@ class VRPData:
         stop = self.get_stop(stop_id)
         return stop.location_idx if stop else 0
     
+    def get_stop_window(self, stop_id: int) -> Tuple[int, int]:
+        """Effective (start, end) time window of a stop.
+        
+        Shipment windows are the source of truth; stops without one
+        fall back to the opening hours of their location.
+        """
+        table = self.stop_table
+        return int(table.window_start[stop_id]), int(table.window_end[stop_id])
+    
     def get_pickup_stop(self, shipment_idx: int) -> Optional[Stop]:
         """Get the pickup stop for a shipment."""
-        for stop in self.stops:
-            if stop.shipment_idx == shipment_idx and stop.is_pickup:
-                return stop
-        return None
+        return self._index()['pickup_stop'].get(shipment_idx)
     
     def get_delivery_stop(self, shipment_idx: int) -> Optional[Stop]:
         """Get the delivery stop for a shipment."""
-        for stop in self.stops:
-            if stop.shipment_idx == shipment_idx and stop.is_delivery:
-                return stop
-        return None
+        return self._index()['delivery_stop'].get(shipment_idx)
     
     def get_start_depot_stop(self, vehicle_idx: int) -> Optional[Stop]:
         """Get the start depot stop for a vehicle."""
-        for stop in self.stops:
-            if stop.vehicle_idx == vehicle_idx and stop.stop_type == StopType.DEPOT_START:
-                return stop
-        return None
+        return self._index()['start_stop'].get(vehicle_idx)
     
     def get_end_depot_stop(self, vehicle_idx: int) -> Optional[Stop]:
         """Get the end depot stop for a vehicle."""
-        for stop in self.stops:
-            if stop.vehicle_idx == vehicle_idx and stop.stop_type == StopType.DEPOT_END:
-                return stop
-        return None
+        return self._index()['end_stop'].get(vehicle_idx)
     
     @property
     def num_stops(self) -> int:
         """Total number of stops."""
         return len(self.stops)
     
+    @property
+    def stop_table(self) -> StopTable:
+        """Columnar stops, with effective windows and service durations."""
+        return self._index()['stop_table']
+    
     @property
     def shipment_stops(self) -> List[Stop]:
-        """All pickup and delivery stops (excludes depots)."""
-        return [s for s in self.stops if not s.is_depot]
+        """All pickup and delivery stops (excludes depots). Shared list: do not modify."""
+        return self._index()['shipment_stops']
@@ -4,8 +4,9 @@ Cost Domain Models.
 Encapsulates all cost structures: fixed, variable, penalties.
 """
 from dataclasses import dataclass
+from .profile_pool import frozen_variant
 
-@dataclass
+@dataclass(slots=True)
 class VehicleCostProfile:
     """Cost parameters for a vehicle type."""
     fixed: int = 0               # Per-use fixed cost
@@ -14,15 +15,20 @@ class VehicleCostProfile:
     per_kg_km: int = 0           # Weight-distance cost (fuel efficiency)
     per_wait_minute: int = 0     # Idling/waiting cost (anti-idle)
 
-@dataclass
+@dataclass(slots=True)
 class PenaltyConfig:
     """Penalty costs for violations."""
     unserved: int = 500000       # Penalty for not serving a location
     late_delivery: int = 50000   # Penalty per late delivery event
     zone_crossing: int = 2000    # Penalty for crossing zones
     
-@dataclass
+@dataclass(slots=True)
 class OperationalCost:
     """Operational parameters affecting cost calculations."""
     depot_service_time: int = 30 # Min time at depot (anti-laundering)
     min_intra_transit: int = 5   # Min transit between stops at same site (anti-teleport)
+
+# Frozen variants (shared by ProfilePool)
+FrozenVehicleCostProfile = frozen_variant(VehicleCostProfile)
+FrozenPenaltyConfig = frozen_variant(PenaltyConfig)
+FrozenOperationalCost = frozen_variant(OperationalCost)
@@ -5,29 +5,36 @@ Encapsulates work rules, shift definitions, and break policies.
 """
 from dataclasses import dataclass, field
 from typing import Optional
+from .profile_pool import frozen_variant
 
-@dataclass
+@dataclass(slots=True)
 class BreakRule:
     """Defines mandatory break requirements."""
     interval_minutes: int = 240  # Break required after X minutes of driving
     duration_minutes: int = 30   # Break lasts Y minutes
     
-@dataclass
+@dataclass(slots=True)
 class WorkShift:
     """Defines a work shift window for a driver/vehicle."""
     start_time: int = 0          # Shift start (in time units, e.g., minutes from midnight)
     max_duration: int = 720      # Maximum allowed shift duration (12 hours)
     standard_duration: int = 480 # Standard (non-overtime) duration (8 hours)
 
-@dataclass
+@dataclass(slots=True)
 class LaborCost:
     """Cost parameters related to labor/time."""
     regular_rate: int = 10       # Cost per minute of regular work
     overtime_multiplier: float = 1.5  # Overtime pays X times regular
     
-@dataclass
+@dataclass(slots=True)
 class LaborPolicy:
     """Aggregates all labor-related rules."""
     shift: WorkShift = field(default_factory=WorkShift)
     break_rule: BreakRule = field(default_factory=BreakRule)
     cost: LaborCost = field(default_factory=LaborCost)
+
+# Frozen variants (shared by ProfilePool)
+FrozenBreakRule = frozen_variant(BreakRule)
+FrozenWorkShift = frozen_variant(WorkShift)
+FrozenLaborCost = frozen_variant(LaborCost)
+FrozenLaborPolicy = frozen_variant(LaborPolicy)
@@ -5,14 +5,18 @@ Encapsulates nodes in the network, their properties, and access constraints.
 """
 from dataclasses import dataclass, field
 from typing import List, Optional
+from .profile_pool import frozen_variant
 
-@dataclass
+@dataclass(slots=True)
 class SiteProfile:
     """Static characteristics of a site type."""
     service_time_factor: float = 1.0  # Multiplier for default service time
     access_tags: List[str] = field(default_factory=list)  # e.g., ["no_truck", "lift_gate_required"]
-    
-@dataclass
+
+# Frozen variant (shared by ProfilePool, access_tags as a tuple)
+FrozenSiteProfile = frozen_variant(SiteProfile)
+
+@dataclass(slots=True)
 class Location:
     """A node in the VRP graph (Depot, Customer, Hub)."""
     id: int
@@ -31,7 +35,7 @@ class Location:
     close_time: int = 1440       # Closing time (minutes from midnight, default 24h)
     
     # Site Constraints
-    profile: 'SiteProfile' = field(default_factory=lambda: SiteProfile())
+    profile: SiteProfile = field(default_factory=SiteProfile)
     
     # Optional Coordinates (for visualization/distance calc if not matrix-based)
     x: float = 0.0
@@ -0,0 +1,126 @@
+"""
+Location Matrix Store.
+
+Travel time, distance and setup matrices as contiguous int32 NumPy arrays
+instead of lists of boxed ints (4M objects per matrix for 2 000 sites):
+
+- matrix[i, j] is a plain int, matrix[i] a row view, np.asarray(matrix)
+  the array itself (no copy)
+- flat is the row-major [from * n + to] view used by the CP-SAT Element
+  lookups
+- save/load use .npy files; load memory-maps them read-only, so solver
+  processes on one machine share a single copy of a city-scale matrix
+- Symmetric matrices can be saved packed (upper triangle, about half the
+  size); packed files are expanded in memory on load
+"""
+import hashlib
+from typing import Sequence, Tuple, Union
+import numpy as np
+
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+class MatrixStore:
+    """Square int32 matrix [from_loc][to_loc]."""
+    
+    def __init__(self, values: Union[np.ndarray, Sequence[Sequence[int]]] = ()):
+        if isinstance(values, np.ndarray) and values.dtype == np.int32:
+            array = values  # Already int32 (possibly a memmap): keep it, no copy
+        else:
+            wide = np.asarray(values, dtype=np.int64)
+            if wide.size and (wide.min() < INT32_MIN or wide.max() > INT32_MAX):
+                raise ValueError("Matrix values exceed the int32 range")
+            array = wide.astype(np.int32)
+        if array.size == 0:
+            array = array.reshape(0, 0)
+        if array.ndim != 2 or array.shape[0] != array.shape[1]:
+            raise ValueError(f"Matrix must be square, got shape {array.shape}")
+        self.array = array if array.flags.c_contiguous else np.ascontiguousarray(array)
+    
+    # --- Views ---
+    
+    @property
+    def flat(self) -> np.ndarray:
+        """Row-major 1-D view: flat[from * n + to] (no copy)."""
+        return self.array.reshape(-1)
+    
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.array.shape
+    
+    def __len__(self) -> int:
+        return self.array.shape[0]
+    
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self.array.item(key)  # Plain int: safe in Python arithmetic
+        return self.array[key]
+    
+    def __array__(self, dtype=None, copy=None):
+        if dtype is not None and dtype != self.array.dtype:
+            return self.array.astype(dtype)
+        return self.array
+    
+    def __eq__(self, other):
+        return isinstance(other, MatrixStore) and np.array_equal(self.array, other.array)
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        kind = 'memmap' if isinstance(self.array, np.memmap) else 'array'
+        return f"MatrixStore({len(self)}x{len(self)} int32 {kind})"
+    
+    def __deepcopy__(self, memo):
+        # Read-only (memory-mapped) matrices are shared, never duplicated
+        return self if not self.array.flags.writeable else MatrixStore(self.array.copy())
+    
+    def tolist(self):
+        return self.array.tolist()
+    
+    def digest(self) -> str:
+        """Content hash (fingerprinting without boxing every entry)."""
+        digest = hashlib.sha256(str(self.array.shape).encode())
+        digest.update(self.array.tobytes())
+        return digest.hexdigest()
+    
+    # --- Symmetric Packing ---
+    
+    def is_symmetric(self) -> bool:
+        return bool(np.array_equal(self.array, self.array.T))
+    
+    def packed(self) -> np.ndarray:
+        """Upper triangle (diagonal included), row by row."""
+        if not self.is_symmetric():
+            raise ValueError("Only symmetric matrices can be packed")
+        return self.array[np.triu_indices(len(self))]
+    
+    @classmethod
+    def from_packed(cls, triangle: np.ndarray) -> 'MatrixStore':
+        """Inverse of packed()."""
+        triangle = np.asarray(triangle, dtype=np.int32)
+        n = int((np.sqrt(8 * len(triangle) + 1) - 1) // 2)
+        if n * (n + 1) // 2 != len(triangle):
+            raise ValueError(f"{len(triangle)} values are not an upper triangle")
+        array = np.zeros((n, n), dtype=np.int32)
+        rows, cols = np.triu_indices(n)
+        array[rows, cols] = triangle
+        array[cols, rows] = triangle
+        return cls(array)
+    
+    # --- Files ---
+    
+    def save(self, path: str, pack: bool = False):
+        """Write a .npy file: the full matrix, or the upper triangle if pack."""
+        np.save(path, self.packed() if pack else self.array)
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'MatrixStore':
+        """
+        Read a file written by save. Full matrices are memory-mapped
+        read-only unless mmap is False; packed ones are expanded in memory.
+        """
+        values = np.load(path, mmap_mode='r' if mmap else None)
+        if values.ndim == 1:
+            return cls.from_packed(values)
+        return cls(values)
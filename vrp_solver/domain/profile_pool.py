@@ -0,0 +1,100 @@
+"""
+Shared Profile Pool.
+
+Profiles and other value objects (SiteProfile, VehicleProfile, LaborPolicy,
+VehicleCostProfile, Cargo, TimeWindow...) stay ordinary mutable dataclasses.
+Each has a frozen, hashable variant (FrozenSiteProfile, ...) with the same
+fields: equal frozen values are interchangeable, so a fleet of thousands of
+vehicles or a month of orders only needs one instance per distinct value.
+
+Sharing is opt-in: ProfilePool / share_profiles() replace the profiles of
+entities with pooled frozen variants. Edit a shared profile by assigning a
+new one (dataclasses.replace, or thaw() for a mutable copy).
+"""
+from dataclasses import fields, is_dataclass, make_dataclass, replace
+from typing import Any, Dict, Iterable
+
+
+# Mutable profile class -> its frozen variant (see frozen_variant)
+FROZEN_VARIANTS: Dict[type, type] = {}
+# Frozen variant -> the mutable class
+MUTABLE_CLASSES: Dict[type, type] = {}
+
+
+def frozen_variant(cls: type) -> type:
+    """Frozen, slotted twin of the mutable dataclass cls (same fields, list fields as tuples)."""
+    frozen = make_dataclass(
+        f'Frozen{cls.__name__}',
+        [(f.name, f.type) for f in fields(cls)],
+        frozen=True,
+        slots=True,
+    )
+    frozen.__module__ = cls.__module__
+    frozen.__doc__ = f"Frozen {cls.__name__} (shared between entities by ProfilePool)."
+    FROZEN_VARIANTS[cls] = frozen
+    MUTABLE_CLASSES[frozen] = cls
+    return frozen
+
+
+def is_frozen(value: Any) -> bool:
+    """True for instances of frozen dataclasses."""
+    return is_dataclass(value) and not isinstance(value, type) and value.__dataclass_params__.frozen
+
+
+def thaw(value: Any):
+    """Mutable copy of a frozen profile variant (nested profiles and tags too); other values as is."""
+    cls = MUTABLE_CLASSES.get(type(value))
+    if cls is None:
+        return value
+    values = {}
+    for f in fields(value):
+        current = getattr(value, f.name)
+        values[f.name] = list(current) if isinstance(current, tuple) else thaw(current)
+    return cls(**values)
+
+
+class ProfilePool:
+    """Value-deduplicating store of frozen domain objects."""
+
+    def __init__(self):
+        self._pool: Dict[Any, Any] = {}
+
+    def intern(self, value: Any):
+        """
+        The pooled frozen instance equal to value: mutable profiles are
+        converted to their frozen variant, nested profiles pooled too.
+        """
+        frozen_cls = FROZEN_VARIANTS.get(type(value))
+        if frozen_cls is None and not is_frozen(value):
+            return value
+
+        nested = {}
+        for f in fields(value):
+            current = getattr(value, f.name)
+            shared = tuple(current) if isinstance(current, list) else self.intern(current)
+            if shared is not current:
+                nested[f.name] = shared
+        if frozen_cls is not None:
+            value = frozen_cls(**{f.name: nested.get(f.name, getattr(value, f.name)) for f in fields(value)})
+        elif nested:
+            value = replace(value, **nested)
+        return self._pool.setdefault(value, value)
+
+    def share(self, entities: Iterable[Any]):
+        """Point the profile fields of entities at pooled frozen instances (in place)."""
+        for entity in entities:
+            for f in fields(entity):
+                current = getattr(entity, f.name)
+                if type(current) in FROZEN_VARIANTS or is_frozen(current):
+                    setattr(entity, f.name, self.intern(current))
+
+    def __len__(self) -> int:
+        return len(self._pool)
+
+
+def share_profiles(*entity_lists: Iterable[Any]) -> ProfilePool:
+    """Deduplicate the profiles of locations, vehicles, shipments... by value."""
+    pool = ProfilePool()
+    for entities in entity_lists:
+        pool.share(entities)
+    return pool
@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 from typing import List
 from .stop import Stop
 
-@dataclass
+@dataclass(slots=True)
 class Route:
     """
     A planned sequence of stops for a single vehicle.
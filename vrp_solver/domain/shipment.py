@@ -5,8 +5,9 @@ Encapsulates transport requests, cargo properties, and compatibility requirement
 """
 from dataclasses import dataclass, field
 from typing import List, Optional
+from .profile_pool import frozen_variant
 
-@dataclass
+@dataclass(slots=True)
 class Cargo:
     """Physical properties of the cargo."""
     weight: float = 0.0              # Weight in kg
@@ -14,13 +15,17 @@ class Cargo:
     pallets: int = 0             # Optional pallet count
     temp_class: Optional[str] = None  # e.g., "frozen", "chilled", "ambient"
     
-@dataclass
+@dataclass(slots=True)
 class TimeWindow:
     """A time window constraint."""
     start: int = 0               # Earliest time (ready time)
     end: int = 10000             # Latest time (due time)
+
+# Frozen variants (shared by ProfilePool)
+FrozenCargo = frozen_variant(Cargo)
+FrozenTimeWindow = frozen_variant(TimeWindow)
     
-@dataclass
+@dataclass(slots=True)
 class Shipment:
     """A transport request (Pickup & Delivery pair)."""
     id: int
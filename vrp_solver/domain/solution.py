@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from typing import List, Dict
+from .route import Route
+
+@dataclass
+class Solution:
+    """
+    Variable-free result of a solve.
+    Consumed by the printer and the web API, independent of the model backend.
+    """
+    status: str = "infeasible"   # "optimal", "feasible", "heuristic" (solver fallback), "infeasible"
+    routes: List[Route] = field(default_factory=list)
+    
+    # Cost breakdown (keys match the API CostBreakdown)
+    costs: Dict[str, int] = field(default_factory=dict)
+    
+    # served[ship_idx] = True if shipment is served
+    served: List[bool] = field(default_factory=list)
+    
+    @property
+    def is_feasible(self) -> bool:
+        return self.status in ("optimal", "feasible", "heuristic")
+    
+    @property
+    def total_cost(self) -> int:
+        return self.costs.get("total", 0)
@@ -8,7 +8,7 @@ class StopType(Enum):
     PICKUP = "pickup"
     DELIVERY = "delivery"
 
-@dataclass
+@dataclass(slots=True)
 class Stop:
     """
     Resolved Node in a Route.
@@ -19,6 +19,10 @@ class Stop:
     location_idx: int
     shipment_idx: int = -1
     vehicle_idx: int = -1
+    
+    # --- Load Change (Input) ---
+    weight_delta: float = 0.0    # +cargo at pickup, -cargo at delivery
+    volume_delta: float = 0.0
 
     # --- Results (Planned) ---
     arrival_time: int = 0        # ToA (Time of Arrival)
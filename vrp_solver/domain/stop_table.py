@@ -0,0 +1,223 @@
+"""
+Columnar Stop Store.
+
+VRPData.stops as a struct of arrays: one NumPy column per input attribute
+(type, location, shipment, vehicle, load deltas) plus the effective time
+window and service duration once resolved against locations/shipments.
+Indexing returns a StopView, a two-slot view with the read-only API of
+an input Stop; result fields (arrival, cumulative load...) live on the
+Stop objects of a Route.
+"""
+from typing import Iterator, List, Optional, Sequence
+import numpy as np
+from .stop import Stop, StopType
+
+
+# Column code of each StopType (kind column)
+STOP_TYPES = (StopType.DEPOT_START, StopType.DEPOT_END, StopType.PICKUP, StopType.DELIVERY)
+DEPOT_START, DEPOT_END, PICKUP, DELIVERY = range(len(STOP_TYPES))
+_KIND = {stop_type: code for code, stop_type in enumerate(STOP_TYPES)}
+
+
+class StopView:
+    """Read-only view of one row of a StopTable."""
+    __slots__ = ('table', 'id')
+    
+    def __init__(self, table: 'StopTable', stop_id: int):
+        self.table = table
+        self.id = stop_id
+    
+    @property
+    def stop_type(self) -> StopType:
+        return STOP_TYPES[self.table.kind[self.id]]
+    
+    @property
+    def location_idx(self) -> int:
+        return int(self.table.location_idx[self.id])
+    
+    @property
+    def shipment_idx(self) -> int:
+        return int(self.table.shipment_idx[self.id])
+    
+    @property
+    def vehicle_idx(self) -> int:
+        return int(self.table.vehicle_idx[self.id])
+    
+    @property
+    def weight_delta(self) -> float:
+        return float(self.table.weight_delta[self.id])
+    
+    @property
+    def volume_delta(self) -> float:
+        return float(self.table.volume_delta[self.id])
+    
+    @property
+    def is_depot(self) -> bool:
+        return bool(self.table.kind[self.id] <= DEPOT_END)
+    
+    @property
+    def is_pickup(self) -> bool:
+        return bool(self.table.kind[self.id] == PICKUP)
+    
+    @property
+    def is_delivery(self) -> bool:
+        return bool(self.table.kind[self.id] == DELIVERY)
+    
+    def to_stop(self, **results) -> Stop:
+        """Full Stop dataclass of this row, with result fields set from results."""
+        return Stop(
+            id=self.id,
+            stop_type=self.stop_type,
+            location_idx=self.location_idx,
+            shipment_idx=self.shipment_idx,
+            vehicle_idx=self.vehicle_idx,
+            weight_delta=self.weight_delta,
+            volume_delta=self.volume_delta,
+            **results,
+        )
+    
+    def __eq__(self, other):
+        return isinstance(other, StopView) and other.table is self.table and other.id == self.id
+    
+    def __hash__(self):
+        return hash((id(self.table), self.id))
+    
+    def __repr__(self):
+        return (f"StopView(id={self.id}, stop_type={self.stop_type}, location_idx={self.location_idx}, "
+                f"shipment_idx={self.shipment_idx}, vehicle_idx={self.vehicle_idx})")
+
+
+class StopTable(Sequence):
+    """Struct-of-arrays stop list; row i is stop id i."""
+    
+    def __init__(self, kind, location_idx, shipment_idx, vehicle_idx, weight_delta, volume_delta,
+                 window_start=None, window_end=None, service=None):
+        self.kind = np.asarray(kind, dtype=np.int8)
+        self.location_idx = np.asarray(location_idx, dtype=np.int32)
+        self.shipment_idx = np.asarray(shipment_idx, dtype=np.int32)
+        self.vehicle_idx = np.asarray(vehicle_idx, dtype=np.int32)
+        self.weight_delta = np.asarray(weight_delta, dtype=np.float64)
+        self.volume_delta = np.asarray(volume_delta, dtype=np.float64)
+        
+        # Resolved against locations/shipments (see resolve), None until then
+        self.window_start: Optional[np.ndarray] = window_start
+        self.window_end: Optional[np.ndarray] = window_end
+        self.service: Optional[np.ndarray] = service
+    
+    @classmethod
+    def build(cls, vehicles: Sequence, shipments: Sequence) -> 'StopTable':
+        """
+        Stops of a fleet and its shipments: start depots, then pickup and
+        delivery of each shipment, then end depots.
+        """
+        num_v, num_s = len(vehicles), len(shipments)
+        veh_idx = np.arange(num_v, dtype=np.int32)
+        ship_idx = np.repeat(np.arange(num_s, dtype=np.int32), 2)  # pickup, delivery
+        weight = np.array([ship.cargo.weight for ship in shipments], dtype=np.float64)
+        volume = np.array([ship.cargo.volume for ship in shipments], dtype=np.float64)
+        sign = np.tile(np.array([1.0, -1.0]), num_s)
+        
+        def depots(code, locs):
+            return np.full(num_v, code), np.asarray(locs, dtype=np.int32).reshape(num_v)
+        
+        start_kind, start_loc = depots(DEPOT_START, [veh.start_loc for veh in vehicles])
+        end_kind, end_loc = depots(DEPOT_END, [veh.end_loc for veh in vehicles])
+        ship_loc = np.array([[ship.pickup_id, ship.delivery_id] for ship in shipments],
+                            dtype=np.int32).reshape(2 * num_s)
+        no_v = np.full(2 * num_s, -1, dtype=np.int32)
+        no_s = np.full(num_v, -1, dtype=np.int32)
+        zeros_v = np.zeros(num_v)
+        return cls(
+            kind=np.concatenate([start_kind, np.tile([PICKUP, DELIVERY], num_s), end_kind]),
+            location_idx=np.concatenate([start_loc, ship_loc, end_loc]),
+            shipment_idx=np.concatenate([no_s, ship_idx, no_s]),
+            vehicle_idx=np.concatenate([veh_idx, no_v, veh_idx]),
+            weight_delta=np.concatenate([zeros_v, np.repeat(weight, 2) * sign, zeros_v]),
+            volume_delta=np.concatenate([zeros_v, np.repeat(volume, 2) * sign, zeros_v]),
+        )
+    
+    @classmethod
+    def from_stops(cls, stops: Sequence[Stop]) -> 'StopTable':
+        """Columns of a list of Stop objects (ids must equal positions)."""
+        return cls(
+            kind=[_KIND[s.stop_type] for s in stops],
+            location_idx=[s.location_idx for s in stops],
+            shipment_idx=[s.shipment_idx for s in stops],
+            vehicle_idx=[s.vehicle_idx for s in stops],
+            weight_delta=[s.weight_delta for s in stops],
+            volume_delta=[s.volume_delta for s in stops],
+        )
+    
+    def resolve(self, locations: Sequence, shipments: Sequence) -> 'StopTable':
+        """
+        Table with the effective window and service columns (input columns shared).
+        
+        Shipment windows are the source of truth; depots and stops without
+        one fall back to the opening hours of their location.
+        """
+        def by_location(attr):
+            values = np.array([getattr(loc, attr) for loc in locations], dtype=np.int64)
+            return values[self.location_idx] if len(values) else np.zeros(len(self), dtype=np.int64)
+        
+        start = by_location('open_time')
+        end = by_location('close_time')
+        for code, attr in ((PICKUP, 'pickup_window'), (DELIVERY, 'delivery_window')):
+            rows = np.flatnonzero(self.kind == code)
+            windows = [getattr(shipments[s], attr) for s in self.shipment_idx[rows]]
+            has = np.array([w is not None for w in windows], dtype=bool)
+            start[rows[has]] = [w.start for w in windows if w is not None]
+            end[rows[has]] = [w.end for w in windows if w is not None]
+        
+        return StopTable(
+            self.kind, self.location_idx, self.shipment_idx, self.vehicle_idx,
+            self.weight_delta, self.volume_delta,
+            window_start=start,
+            window_end=end,
+            service=by_location('service_duration'),
+        )
+    
+    @property
+    def is_depot(self) -> np.ndarray:
+        return self.kind <= DEPOT_END
+    
+    @property
+    def is_pickup(self) -> np.ndarray:
+        return self.kind == PICKUP
+    
+    @property
+    def is_delivery(self) -> np.ndarray:
+        return self.kind == DELIVERY
+    
+    def ids(self, stop_type: StopType) -> np.ndarray:
+        """Stop ids of one type."""
+        return np.flatnonzero(self.kind == _KIND[stop_type])
+    
+    def columns(self) -> dict:
+        """Input columns as lists (fingerprinting, serialization)."""
+        return {
+            'kind': self.kind.tolist(),
+            'location_idx': self.location_idx.tolist(),
+            'shipment_idx': self.shipment_idx.tolist(),
+            'vehicle_idx': self.vehicle_idx.tolist(),
+            'weight_delta': self.weight_delta.tolist(),
+            'volume_delta': self.volume_delta.tolist(),
+        }
+    
+    def to_stops(self) -> List[Stop]:
+        """Stop objects of every row."""
+        return [view.to_stop() for view in self]
+    
+    def __len__(self) -> int:
+        return len(self.kind)
+    
+    def __getitem__(self, stop_id):
+        if isinstance(stop_id, slice):
+            return [StopView(self, i) for i in range(*stop_id.indices(len(self)))]
+        if stop_id < 0:
+            stop_id += len(self)
+        if not 0 <= stop_id < len(self):
+            raise IndexError(f"stop id {stop_id} out of range")
+        return StopView(self, int(stop_id))
+    
+    def __iter__(self) -> Iterator[StopView]:
+        return (StopView(self, i) for i in range(len(self)))
@@ -7,8 +7,9 @@ from dataclasses import dataclass, field
 from typing import List, Optional
 from .cost import VehicleCostProfile
 from .labor import LaborPolicy
+from .profile_pool import frozen_variant
 
-@dataclass
+@dataclass(slots=True)
 class VehicleCapacity:
     """Physical capacity limits of a vehicle."""
     weight: float = 50.0             # Max weight (kg)
@@ -18,7 +19,7 @@ class VehicleCapacity:
     max_stops: int = 100             # Max stops per route
     max_distance_km: float = 500.0   # Max distance per route
 
-@dataclass
+@dataclass(slots=True)
 class VehicleProfile:
     """Static characteristics of a vehicle type."""
     type_id: int = 1
@@ -26,7 +27,11 @@ class VehicleProfile:
     tags: List[str] = field(default_factory=list)  # Compatibility tags: ["frozen", "lift_gate", "hazmat"]
     speed_factor: float = 1.0    # Multiplier for travel times (slower trucks = > 1.0)
 
-@dataclass
+# Frozen variants (shared by ProfilePool, tags as a tuple)
+FrozenVehicleCapacity = frozen_variant(VehicleCapacity)
+FrozenVehicleProfile = frozen_variant(VehicleProfile)
+
+@dataclass(slots=True)
 class Vehicle:
     """A specific vehicle instance in the fleet."""
     id: int
@@ -0,0 +1,587 @@
+"""
+Adaptive Large Neighborhood Search Engine.
+
+Solver engine for days too large for the CP-SAT step model. Works directly
+on stop sequences of VRPData (no model variables):
+
+- Destroy: random, worst (largest removal gain), related (pickup/delivery
+  distance + ready time) and whole-route removal.
+- Repair: greedy and regret-2 insertion. For one route, the insertion
+  positions of every unserved shipment are screened at once on NumPy
+  arrays (time windows via latest arrival times, capacity, infeasible
+  arcs) and ranked by an estimate of the added cost. Only the few best
+  positions of the chosen shipment are simulated exactly.
+- Acceptance: simulated annealing, cooled over the wall-clock budget.
+- Adaptation: operator weights updated per segment from their scores.
+
+Route costs are exact RouteEvaluator costs, i.e. those of
+ObjectiveConstraints (fixed, distance with per_kg_km, labor with overtime,
+zone, waiting), plus unserved penalties.
+"""
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+from vrp_solver.domain import VRPData, Solution, StopType
+from vrp_solver.config import VRPConfig
+from vrp_solver.logic.evaluation import RouteEvaluator, Visit
+
+
+# Positions kept per (shipment, vehicle) and simulated exactly on insertion
+INSERTION_CANDIDATES = 4
+
+# Operator scores: new best, better than current, accepted
+SCORE_BEST = 33
+SCORE_BETTER = 9
+SCORE_ACCEPTED = 13
+REACTION_FACTOR = 0.1
+SEGMENT_LENGTH = 100
+
+# Simulated annealing: a 5% worse plan is accepted with probability 1/2 at start
+START_WORSENING = 0.05
+END_TEMPERATURE_RATIO = 0.002
+
+@dataclass
+class ALNSState:
+    """A plan with its per-vehicle route costs and schedules."""
+    plan: Dict[int, List[int]]  # vehicle -> stop sequence (start ... end)
+    cost: Dict[int, int]        # vehicle -> route cost
+    schedule: Dict[int, Tuple[np.ndarray, np.ndarray]]  # vehicle -> (arrival, latest arrival) per stop
+    unserved: Set[int]
+    
+    def copy(self) -> 'ALNSState':
+        # Sequences and schedules are replaced, never mutated: shallow copies suffice
+        return ALNSState(
+            plan=dict(self.plan),
+            cost=dict(self.cost),
+            schedule=dict(self.schedule),
+            unserved=set(self.unserved),
+        )
+
+
+class InsertionTable:
+    """Estimated insertions of the unserved shipments (rows) into vehicles (columns)."""
+    
+    def __init__(self, ships: List[int], num_vehicles: int):
+        self.ships = np.array(ships, dtype=np.int64)
+        self.open = np.ones(len(ships), dtype=bool)             # Still to insert
+        self.best = np.full((len(ships), num_vehicles), np.inf)  # Cheapest estimate per vehicle
+        # vehicle -> (rows, estimates, flat positions, number of gaps), see route_candidates
+        self.positions: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray, int]] = {}
+
+
+class ALNSEngine:
+    """NumPy instance arrays and plan operations shared by all operators."""
+    
+    def __init__(self, data: VRPData, config: VRPConfig):
+        self.data = data
+        self.config = config
+        self.evaluator = RouteEvaluator(data, config)
+        self.rng = np.random.default_rng(config.alns_seed)
+        ev = self.evaluator
+        num_v = len(data.vehicles)
+        
+        # Location matrices
+        self.time = np.asarray(data.travel_time_matrix, dtype=np.int64)
+        self.dist = np.asarray(data.travel_dist_matrix, dtype=np.int64)
+        self.setup = np.asarray(data.setup_time_matrix, dtype=np.int64)
+        zone = np.array([loc.zone_id for loc in data.locations], dtype=np.int64)
+        zone_cross = (zone[:, None] != zone[None, :]) & (zone[:, None] != 0) & (zone[None, :] != 0)
+        
+        # Stop arrays
+        big = np.iinfo(np.int64).max // 4
+        self.stop_loc = np.asarray(ev.stop_loc, dtype=np.int64)
+        self.service = np.asarray(ev.service, dtype=np.int64)
+        self.delta_w = np.asarray(ev.delta_w, dtype=np.int64)
+        self.delta_v = np.asarray(ev.delta_v, dtype=np.int64)
+        self.window_start = np.array([w[0] if w else 0 for w in ev.window], dtype=np.int64)
+        self.window_end = np.array([w[1] if w else big for w in ev.window], dtype=np.int64)
+        table = data.stop_table
+        self.is_start = np.zeros(len(table), dtype=bool)
+        self.is_start[table.ids(StopType.DEPOT_START)] = True
+        self.stop_ship = table.shipment_idx.tolist()    # Lists: indexed per stop in Python loops
+        self.stop_is_pickup = table.is_pickup.tolist()
+        self.infeasible_arcs = ev.infeasible_arcs
+        
+        # Shipment arrays
+        num_ships = len(data.shipments)
+        self.pickup_stop = np.array([ev.pickup_stop[i] for i in range(num_ships)], dtype=np.int64)
+        self.delivery_stop = np.array([ev.delivery_stop[i] for i in range(num_ships)], dtype=np.int64)
+        self.penalty = np.array([ship.unserved_penalty for ship in data.shipments], dtype=np.int64)
+        self.ready = np.asarray(ev.ready, dtype=np.int64)[self.pickup_stop]
+        self.compatible = [np.zeros(num_ships, dtype=bool) for _ in range(num_v)]
+        for v, ships in ev.compatible.items():
+            self.compatible[v][ships] = True
+        
+        # Per-vehicle arc cost estimate: distance + driving labor + zone crossing
+        scale = config.capacity_scale_factor
+        self.arc_cost = []
+        shared = {}
+        for veh in data.vehicles:
+            key = (veh.cost.per_km, veh.labor.cost.regular_rate)
+            if key not in shared:
+                shared[key] = (self.dist * veh.cost.per_km + self.time * veh.labor.cost.regular_rate
+                               + zone_cross * data.penalties.zone_crossing)
+            self.arc_cost.append(shared[key])
+        self.per_kg_km = [veh.cost.per_kg_km for veh in data.vehicles]
+        self.cap_w = [int(veh.profile.capacity.weight * scale) for veh in data.vehicles]
+        self.cap_v = [int(veh.profile.capacity.volume * scale) for veh in data.vehicles]
+        self.shift_end = [veh.labor.shift.start_time + veh.labor.shift.max_duration for veh in data.vehicles]
+        
+        # Unused vehicles with the same signature take the same insertions: try one per group
+        def signature(v):
+            veh = data.vehicles[v]
+            return (veh.profile, veh.cost, veh.labor, veh.start_loc, veh.end_loc)
+        groups = []
+        self.twin_group = []
+        for v in range(num_v):
+            sig = signature(v)
+            for k, group_sig in enumerate(groups):
+                if group_sig == sig:
+                    self.twin_group.append(k)
+                    break
+            else:
+                self.twin_group.append(len(groups))
+                groups.append(sig)
+        
+        # leg[v][i, j] = arrival-to-arrival time from stop i to stop j without waiting
+        # (service, drive, rest, setup, anti-teleport as RouteEvaluator.simulate)
+        li, lj = self.stop_loc[:, None], self.stop_loc[None, :]
+        ops = data.operations
+        anti_teleport = np.where(self.is_start[:, None], ops.depot_service_time,
+                                 np.where(li == lj, ops.min_intra_transit, 0))
+        base_leg = self.service[:, None] + self.time[li, lj] + self.setup[li, lj] + anti_teleport
+        self.leg = []
+        shared = {}
+        for veh in data.vehicles:
+            key = (veh.labor.break_rule.interval_minutes, veh.labor.break_rule.duration_minutes)
+            if key not in shared:
+                rest = np.where(self.time[li, lj] > key[0], key[1], 0)
+                shared[key] = base_leg + rest
+            self.leg.append(shared[key])
+    
+    # ======================
+    # State
+    # ======================
+    
+    def empty_state(self) -> ALNSState:
+        ev = self.evaluator
+        state = ALNSState(plan={}, cost={}, schedule={}, unserved=set(range(len(self.data.shipments))))
+        for v in range(len(self.data.vehicles)):
+            if not self.set_route(state, v, ev.empty_route(v)):
+                raise ValueError(f"Vehicle {v} cannot even drive an empty route")
+        return state
+    
+    def objective(self, state: ALNSState) -> int:
+        return sum(state.cost.values()) + int(self.penalty[list(state.unserved)].sum())
+    
+    def set_route(self, state: ALNSState, v: int, seq: List[int],
+                  visits: Optional[List[Visit]] = None) -> bool:
+        """Replace vehicle v's sequence if feasible."""
+        if visits is None:
+            visits = self.evaluator.simulate(v, seq)
+            if visits is None:
+                return False
+        stops = np.asarray(seq, dtype=np.int64)
+        arrival = np.array([visit[1] for visit in visits], dtype=np.int64)
+        
+        # Latest arrival keeping the rest of the route feasible:
+        # latest[k] = min over k' >= k of (due[k'] - legs k..k'-1)
+        due = np.minimum(self.window_end[stops], self.shift_end[v])
+        offset = np.concatenate(([0], np.cumsum(self.leg[v][stops[:-1], stops[1:]])))
+        latest = np.minimum.accumulate((due - offset)[::-1])[::-1] + offset
+        
+        state.plan[v] = seq
+        state.cost[v] = self.evaluator.route_cost(v, visits)
+        state.schedule[v] = (arrival, latest)
+        return True
+    
+    def served_by(self, state: ALNSState) -> Dict[int, int]:
+        """shipment -> vehicle of every served shipment."""
+        return {
+            self.stop_ship[stop_id]: v
+            for v, seq in state.plan.items()
+            for stop_id in seq[1:-1] if self.stop_is_pickup[stop_id]
+        }
+    
+    def remove(self, state: ALNSState, ships: List[int]):
+        """Take shipments off their routes (a route left infeasible is emptied)."""
+        by_vehicle = {}
+        served = self.served_by(state)
+        for ship_idx in ships:
+            if ship_idx in served:
+                by_vehicle.setdefault(served[ship_idx], set()).add(ship_idx)
+        
+        stop_ship = self.stop_ship
+        for v, gone in by_vehicle.items():
+            seq = [stop_id for stop_id in state.plan[v] if stop_ship[stop_id] not in gone]
+            if not self.set_route(state, v, seq):
+                # E.g. a removed stop split a long drive that now needs a break
+                gone = {stop_ship[stop_id] for stop_id in state.plan[v][1:-1]}
+                self.set_route(state, v, self.evaluator.empty_route(v))
+            state.unserved |= gone
+    
+    # ======================
+    # Insertion
+    # ======================
+    
+    def route_candidates(self, state: ALNSState, v: int, ships: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Estimated added cost of the INSERTION_CANDIDATES best positions of each
+        shipment in vehicle v's route: (estimates, flat positions, number of gaps),
+        both arrays (ships, candidates) sorted by estimate, inf if infeasible.
+        """
+        seq = state.plan[v]
+        stops = np.asarray(seq, dtype=np.int64)
+        arrival, latest = state.schedule[v]
+        prev, nxt = stops[:-1], stops[1:]    # Gap g lies between seq[g] and seq[g + 1]
+        num_gaps = len(prev)
+        
+        P = self.pickup_stop[ships][:, None]     # (ships, 1) against (gaps,)
+        D = self.delivery_stop[ships][:, None]
+        leg = self.leg[v]
+        arcs = self.infeasible_arcs
+        shift_end = self.shift_end[v]
+        
+        # Time: arrive within the window and early enough for the rest of the route
+        arr_p = np.maximum(arrival[:-1] + leg[prev, P], self.window_start[P])
+        ok_p = (arr_p <= np.minimum(self.window_end[P], shift_end)) & ~arcs[prev, P]
+        ok_p_alone = ok_p & (arr_p + leg[P, nxt] <= latest[1:]) & ~arcs[P, nxt]
+        arr_d = np.maximum(arrival[:-1] + leg[prev, D], self.window_start[D])
+        ok_d = ((arr_d <= np.minimum(self.window_end[D], shift_end))
+                & (arr_d + leg[D, nxt] <= latest[1:]) & ~arcs[prev, D] & ~arcs[D, nxt])
+        arr_pd = np.maximum(arr_p + leg[P, D], self.window_start[D])
+        ok_pd = (ok_p & (arr_pd <= np.minimum(self.window_end[D], shift_end))
+                 & (arr_pd + leg[D, nxt] <= latest[1:]) & ~arcs[P, D])
+        
+        # Only shipments with some time-feasible position go on to the (ships, gaps, gaps) arrays
+        viable = np.flatnonzero((ok_p_alone.any(axis=1) & ok_d.any(axis=1)) | ok_pd.any(axis=1))
+        keep = min(INSERTION_CANDIDATES, num_gaps * num_gaps)
+        estimates = np.full((len(ships), keep), np.inf)
+        positions = np.zeros((len(ships), keep), dtype=np.int64)
+        if not len(viable):
+            return estimates, positions, num_gaps
+        P, D = P[viable], D[viable]
+        ok_p_alone, ok_d, ok_pd = ok_p_alone[viable], ok_d[viable], ok_pd[viable]
+        
+        # Capacity: the cargo is on board from the pickup gap to the delivery gap
+        load_w = np.cumsum(self.delta_w[prev])
+        load_v = np.cumsum(self.delta_v[prev])
+        upper = np.triu(np.ones((num_gaps, num_gaps), dtype=bool))
+        peak_w = np.maximum.accumulate(np.where(upper, load_w[None, :], 0), axis=1)
+        peak_v = np.maximum.accumulate(np.where(upper, load_v[None, :], 0), axis=1)
+        w, vol = self.delta_w[P][:, :, None], self.delta_v[P][:, :, None]
+        fits = (peak_w[None] + w <= self.cap_w[v]) & (peak_v[None] + vol <= self.cap_v[v])
+        
+        # Cost: detours + load-distance, each leg charged with the load on arrival at its origin
+        # (as RouteEvaluator.route_costs), + service labor, + fixed cost when opening a route
+        cost, dist = self.arc_cost[v], self.dist
+        kg = self.per_kg_km[v]
+        veh = self.data.vehicles[v]
+        a, b = self.stop_loc[P], self.stop_loc[D]
+        pl, nl = self.stop_loc[prev], self.stop_loc[nxt]
+        base, base_dist = cost[pl, nl], dist[pl, nl]
+        load_in = load_w - self.delta_w[prev]
+        in_p = cost[pl, a] + cost[a, nl] - base + kg * (load_in * (dist[pl, a] - base_dist) + load_w * dist[a, nl])
+        in_d = cost[pl, b] + cost[b, nl] - base + kg * (load_in * (dist[pl, b] - base_dist) + load_w * dist[b, nl])
+        cum = np.concatenate(([0], np.cumsum(base_dist)))
+        carried = -cum[1:][None, :, None] + (cum[:-1] + dist[pl, b] + dist[b, nl])[:, None, :]
+        fixed = (veh.labor.cost.regular_rate * (self.service[P] + self.service[D])
+                 + (veh.cost.fixed if len(seq) == 2 else 0))
+        estimate = (fixed[:, :, None] + in_p[:, :, None] + in_d[:, None, :] + kg * w * carried).astype(float)
+        feasible = upper[None] & fits & ok_p_alone[:, :, None] & ok_d[:, None, :]
+        
+        # Same gap: pickup directly followed by its delivery
+        diag = np.arange(num_gaps)
+        estimate[:, diag, diag] = fixed + cost[pl, a] + cost[a, b] + cost[b, nl] - base + kg * (
+            load_in * (dist[pl, a] - base_dist) + load_w * (dist[a, b] + dist[b, nl])
+            + w[:, :, 0] * dist[b, nl]
+        )
+        feasible[:, diag, diag] = ok_pd & fits[:, diag, diag]
+        
+        estimate[~feasible] = np.inf
+        flat = estimate.reshape(len(viable), -1)
+        best = np.argpartition(flat, keep - 1, axis=1)[:, :keep]
+        best_estimates = np.take_along_axis(flat, best, axis=1)
+        order = np.argsort(best_estimates, axis=1)
+        estimates[viable] = np.take_along_axis(best_estimates, order, axis=1)
+        positions[viable] = np.take_along_axis(best, order, axis=1)
+        return estimates, positions, num_gaps
+    
+    def candidate_vehicles(self, state: ALNSState) -> List[int]:
+        """Used vehicles plus the first unused vehicle of every twin group."""
+        result = []
+        seen = set()
+        for v, seq in state.plan.items():
+            if len(seq) > 2:
+                result.append(v)
+            elif self.twin_group[v] not in seen:
+                seen.add(self.twin_group[v])
+                result.append(v)
+        return result
+    
+    def insertion_table(self, state: ALNSState) -> 'InsertionTable':
+        """Candidates of every unserved shipment in every candidate vehicle."""
+        table = InsertionTable(sorted(state.unserved), len(self.data.vehicles))
+        for v in self.candidate_vehicles(state):
+            self._fill(state, table, v)
+        return table
+    
+    def _fill(self, state: ALNSState, table: 'InsertionTable', v: int):
+        """(Re)compute column v of the table."""
+        table.best[:, v] = np.inf
+        table.positions.pop(v, None)
+        rows = np.flatnonzero(table.open & self.compatible[v][table.ships])
+        if len(rows):
+            estimates, positions, num_gaps = self.route_candidates(state, v, table.ships[rows])
+            table.best[rows, v] = estimates[:, 0]
+            table.positions[v] = (rows, estimates, positions, num_gaps)
+    
+    def insert(self, state: ALNSState, table: 'InsertionTable', v: int, row: int) -> bool:
+        """
+        Simulate the candidates of table row (a shipment) in vehicle v and apply the
+        cheapest one if it beats the unserved penalty. Keeps the table up to date.
+        """
+        ev = self.evaluator
+        ship_idx = int(table.ships[row])
+        seq = state.plan[v]
+        was_unused = len(seq) == 2
+        p_stop, d_stop = int(self.pickup_stop[ship_idx]), int(self.delivery_stop[ship_idx])
+        
+        rows, estimates, positions, num_gaps = table.positions[v]
+        k = np.searchsorted(rows, row)
+        table.best[row, v] = np.inf  # Tried: not offered again unless v changes
+        best = None
+        for estimate, flat in zip(estimates[k], positions[k]):
+            if not np.isfinite(estimate):
+                break
+            i, j = divmod(int(flat), num_gaps)
+            cand = seq[:i + 1] + [p_stop] + seq[i + 1:j + 1] + [d_stop] + seq[j + 1:]
+            visits = ev.simulate(v, cand)
+            if visits is None:
+                continue
+            cost = ev.route_cost(v, visits)
+            if best is None or cost < best[0]:
+                best = (cost, cand, visits)
+        if best is None or best[0] - state.cost[v] >= self.penalty[ship_idx]:
+            return False
+        
+        self.set_route(state, v, best[1], best[2])
+        state.unserved.discard(ship_idx)
+        table.open[row] = False
+        table.best[row] = np.inf
+        self._fill(state, table, v)
+        if was_unused:
+            # The next unused twin now represents the group
+            for other, other_seq in state.plan.items():
+                if len(other_seq) == 2 and self.twin_group[other] == self.twin_group[v]:
+                    self._fill(state, table, other)
+                    break
+        return True
+    
+    # ======================
+    # Search
+    # ======================
+    
+    def removal_count(self, state: ALNSState) -> int:
+        num_served = len(self.data.shipments) - len(state.unserved)
+        low = min(4, num_served)
+        high = min(num_served, max(low, min(100, int(0.4 * len(self.data.shipments)))))
+        return int(self.rng.integers(low, high + 1))
+    
+    def run(self, destroy_ops: Dict[str, 'DestroyOperator'],
+            repair_ops: Dict[str, 'RepairOperator'],
+            log: Optional[Callable[[str], None]] = None) -> Tuple[ALNSState, int]:
+        """
+        Search until config.max_solver_time or config.alns_max_iterations. Returns (best, iterations).
+        
+        log, if given, receives a progress line after every weight segment.
+        """
+        config = self.config
+        rng = self.rng
+        started = time.time()
+        budget = max(config.max_solver_time, 1e-3)
+        
+        current = self.empty_state()
+        greedy_repair(self, current)
+        current_obj = self.objective(current)
+        best, best_obj = current.copy(), current_obj
+        
+        d_names, r_names = list(destroy_ops), list(repair_ops)
+        d_weights, r_weights = np.ones(len(d_names)), np.ones(len(r_names))
+        d_scores, r_scores = np.zeros(len(d_names)), np.zeros(len(r_names))
+        d_uses, r_uses = np.zeros(len(d_names)), np.zeros(len(r_names))
+        
+        start_temp = max(START_WORSENING * current_obj / math.log(2), 1.0)
+        iteration = 0
+        while iteration < config.alns_max_iterations:
+            elapsed = time.time() - started
+            if elapsed >= budget:
+                break
+            temperature = start_temp * END_TEMPERATURE_RATIO ** (elapsed / budget)
+            
+            d = rng.choice(len(d_names), p=d_weights / d_weights.sum())
+            r = rng.choice(len(r_names), p=r_weights / r_weights.sum())
+            candidate = current.copy()
+            destroy_ops[d_names[d]](self, candidate, self.removal_count(candidate))
+            repair_ops[r_names[r]](self, candidate)
+            cand_obj = self.objective(candidate)
+            
+            score = 0
+            if cand_obj < best_obj:
+                best, best_obj = candidate.copy(), cand_obj
+                score = SCORE_BEST
+            if cand_obj < current_obj:
+                score = score or SCORE_BETTER
+                current, current_obj = candidate, cand_obj
+            elif rng.random() < math.exp((current_obj - cand_obj) / temperature):
+                score = score or SCORE_ACCEPTED
+                current, current_obj = candidate, cand_obj
+            d_scores[d] += score
+            r_scores[r] += score
+            d_uses[d] += 1
+            r_uses[r] += 1
+            
+            iteration += 1
+            if iteration % SEGMENT_LENGTH == 0:
+                for weights, scores, uses in ((d_weights, d_scores, d_uses), (r_weights, r_scores, r_uses)):
+                    used = uses > 0
+                    weights[used] = (1 - REACTION_FACTOR) * weights[used] + REACTION_FACTOR * scores[used] / uses[used]
+                    weights[:] = np.maximum(weights, 0.01)
+                    scores[:] = 0
+                    uses[:] = 0
+                if log:
+                    log(f"ALNS {iteration}: best={best_obj} current={current_obj} "
+                        f"T={temperature:.0f} ({time.time() - started:.1f}s)")
+        return best, iteration
+
+
+# ======================
+# Destroy Operators
+# ======================
+
+def random_removal(engine: ALNSEngine, state: ALNSState, count: int):
+    """Remove count random served shipments."""
+    served = sorted(engine.served_by(state))
+    if served:
+        picked = engine.rng.choice(served, size=min(count, len(served)), replace=False)
+        engine.remove(state, [int(i) for i in picked])
+
+
+def worst_removal(engine: ALNSEngine, state: ALNSState, count: int):
+    """Remove the shipments whose removal saves the most route cost (randomized)."""
+    ev = engine.evaluator
+    gains = []
+    for ship_idx, v in engine.served_by(state).items():
+        seq = [stop_id for stop_id in state.plan[v] if engine.stop_ship[stop_id] != ship_idx]
+        visits = ev.simulate(v, seq)
+        if visits is not None:
+            gains.append((state.cost[v] - ev.route_cost(v, visits), ship_idx))
+    gains.sort(reverse=True)
+    
+    picked = []
+    while gains and len(picked) < count:
+        # Biased towards the top of the list (Ropke & Pisinger, p = 3)
+        k = int(len(gains) * engine.rng.random() ** 3)
+        picked.append(gains.pop(k)[1])
+    engine.remove(state, picked)
+
+
+def related_removal(engine: ALNSEngine, state: ALNSState, count: int):
+    """Remove shipments close to a random seed in pickup/delivery location and ready time."""
+    served = np.array(sorted(engine.served_by(state)), dtype=np.int64)
+    if not len(served):
+        return
+    seed = engine.rng.choice(served)
+    p_loc = engine.stop_loc[engine.pickup_stop[served]]
+    d_loc = engine.stop_loc[engine.delivery_stop[served]]
+    seed_p = engine.stop_loc[engine.pickup_stop[seed]]
+    seed_d = engine.stop_loc[engine.delivery_stop[seed]]
+    
+    max_dist = max(int(engine.dist.max()), 1)
+    max_time = max(int(np.ptp(engine.ready)), 1)
+    relatedness = (
+        (engine.dist[p_loc, seed_p] + engine.dist[d_loc, seed_d]) / max_dist
+        + np.abs(engine.ready[served] - engine.ready[seed]) / max_time
+    )
+    ranked = list(served[np.argsort(relatedness, kind='stable')])
+    
+    picked = []
+    while ranked and len(picked) < count:
+        k = int(len(ranked) * engine.rng.random() ** 6)
+        picked.append(int(ranked.pop(k)))
+    engine.remove(state, picked)
+
+
+def route_removal(engine: ALNSEngine, state: ALNSState, count: int):
+    """Empty one random used route (lets its fixed cost go)."""
+    used = [v for v, seq in state.plan.items() if len(seq) > 2]
+    if used:
+        v = int(engine.rng.choice(used))
+        engine.remove(state, [engine.stop_ship[stop_id] for stop_id in state.plan[v][1:-1]])
+
+
+# ======================
+# Repair Operators
+# ======================
+
+def greedy_repair(engine: ALNSEngine, state: ALNSState):
+    """Insert the shipment with the largest estimated saving (penalty - added cost) first."""
+    table = engine.insertion_table(state)
+    penalty = engine.penalty[table.ships][:, None]
+    while len(table.ships):
+        saving = penalty - table.best
+        row, v = np.unravel_index(np.argmax(saving), saving.shape)
+        if saving[row, v] <= 0:
+            return
+        engine.insert(state, table, int(v), int(row))
+
+
+def regret_repair(engine: ALNSEngine, state: ALNSState):
+    """Insert the shipment that loses most if not placed in its best vehicle (regret-2)."""
+    table = engine.insertion_table(state)
+    penalty = engine.penalty[table.ships].astype(float)
+    while len(table.ships):
+        if table.best.shape[1] > 1:
+            two = np.partition(table.best, 1, axis=1)
+            first, second = two[:, 0], np.minimum(two[:, 1], penalty)
+        else:
+            first, second = table.best[:, 0], penalty
+        regret = np.where(first < penalty, second - first, -np.inf)
+        row = int(np.argmax(regret))
+        if regret[row] == -np.inf:
+            return
+        engine.insert(state, table, int(np.argmin(table.best[row])), row)
+
+
+DestroyOperator = Callable[[ALNSEngine, ALNSState, int], None]
+RepairOperator = Callable[[ALNSEngine, ALNSState], None]
+
+DESTROY_OPERATORS: Dict[str, DestroyOperator] = {
+    'random': random_removal,
+    'worst': worst_removal,
+    'related': related_removal,
+    'route': route_removal,
+}
+
+REPAIR_OPERATORS: Dict[str, RepairOperator] = {
+    'greedy': greedy_repair,
+    'regret': regret_repair,
+}
+
+
+def solve_alns(data: VRPData, config: VRPConfig,
+               destroy_ops: Optional[Dict[str, DestroyOperator]] = None,
+               repair_ops: Optional[Dict[str, RepairOperator]] = None,
+               log: Optional[Callable[[str], None]] = None) -> Solution:
+    """
+    Run ALNS within config.max_solver_time and return the best plan as a Solution.
+    
+    Progress lines go to log (e.g. print) if given; the library itself is silent.
+    """
+    engine = ALNSEngine(data, config)
+    best, iterations = engine.run(destroy_ops or DESTROY_OPERATORS, repair_ops or REPAIR_OPERATORS, log)
+    if log:
+        log(f"ALNS finished after {iterations} iterations: best={engine.objective(best)}")
+    return engine.evaluator.build_solution(best.plan, status='feasible')
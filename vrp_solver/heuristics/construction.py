@@ -0,0 +1,109 @@
+"""
+Greedy Insertion Construction Heuristic.
+
+Builds a feasible plan directly from VRPData in milliseconds:
+repeatedly insert the pickup-delivery pair with the best saving
+(unserved penalty - added route cost) at its cheapest feasible
+positions, until no insertion pays off.
+
+Feasibility and costs come from RouteEvaluator (same rules as the step
+model), so the plan can be passed to CP-SAT as a hint and returned as a
+fallback when the solver finds nothing in time.
+"""
+from typing import Dict, List, Optional, Tuple
+from vrp_solver.domain import VRPData, Solution
+from vrp_solver.config import VRPConfig
+from vrp_solver.logic.evaluation import RouteEvaluator, Visit
+
+
+# (added cost, insertion pickup position, insertion delivery position)
+Insertion = Tuple[int, int, int]
+
+
+def best_insertion(evaluator: RouteEvaluator, v: int, seq: List[int], ship_idx: int,
+                   base_cost: int, max_len: Optional[int] = None) -> Optional[Insertion]:
+    """Cheapest feasible (pickup, delivery) positions of a shipment in vehicle v's sequence."""
+    if max_len is not None and len(seq) + 2 > max_len:
+        return None
+    p_stop = evaluator.pickup_stop[ship_idx]
+    d_stop = evaluator.delivery_stop[ship_idx]
+    arcs = evaluator.infeasible_arcs
+    
+    best = None
+    # Pickup goes before seq[i], delivery before seq[j] (i <= j)
+    for i in range(1, len(seq)):
+        if arcs[seq[i - 1], p_stop]:
+            continue
+        for j in range(i, len(seq)):
+            # Cheap arc checks before the full simulation
+            before_d = p_stop if j == i else seq[j - 1]
+            if arcs[before_d, d_stop] or arcs[d_stop, seq[j]]:
+                continue
+            if j > i and arcs[p_stop, seq[i]]:
+                continue
+            
+            cand = seq[:i] + [p_stop] + seq[i:j] + [d_stop] + seq[j:]
+            visits = evaluator.simulate(v, cand)
+            if visits is None:
+                continue
+            added = evaluator.route_cost(v, visits) - base_cost
+            if best is None or added < best[0]:
+                best = (added, i, j)
+    return best
+
+
+def greedy_insertion(data: VRPData, config: VRPConfig,
+                     vehicle_steps: Optional[List[int]] = None) -> Solution:
+    """
+    Construct a feasible plan by best-saving pair insertion.
+    
+    vehicle_steps caps each route length (start + stops + end), e.g. to fit
+    the iterative horizon of the step model.
+    """
+    evaluator = RouteEvaluator(data, config)
+    num_v = len(data.vehicles)
+    
+    plan: Dict[int, List[int]] = {v: evaluator.empty_route(v) for v in range(num_v)}
+    visits: Dict[int, List[Visit]] = {v: evaluator.simulate(v, plan[v]) for v in range(num_v)}
+    if any(visits[v] is None for v in range(num_v)):
+        # Even an empty route breaks the shift rules: nothing to build
+        return Solution(status='infeasible', served=[False] * len(data.shipments))
+    cost = {v: evaluator.route_cost(v, visits[v]) for v in range(num_v)}
+    max_len = vehicle_steps or [None] * num_v
+    
+    # cache[ship_idx, v] = best insertion into the current route of v
+    unserved = set(range(len(data.shipments)))
+    cache = {}
+    for ship_idx in unserved:
+        for v in range(num_v):
+            if ship_idx in evaluator.compatible[v]:
+                cache[ship_idx, v] = best_insertion(evaluator, v, plan[v], ship_idx, cost[v], max_len[v])
+    
+    while unserved:
+        best = None
+        for (ship_idx, v), ins in cache.items():
+            if ins is None:
+                continue
+            saving = data.shipments[ship_idx].unserved_penalty - ins[0]
+            if saving > 0 and (best is None or saving > best[0]):
+                best = (saving, ship_idx, v, ins)
+        if best is None:
+            break
+        
+        _, ship_idx, v, (_, i, j) = best
+        seq = plan[v]
+        p_stop = evaluator.pickup_stop[ship_idx]
+        d_stop = evaluator.delivery_stop[ship_idx]
+        plan[v] = seq[:i] + [p_stop] + seq[i:j] + [d_stop] + seq[j:]
+        visits[v] = evaluator.simulate(v, plan[v])
+        cost[v] = evaluator.route_cost(v, visits[v])
+        
+        unserved.discard(ship_idx)
+        for key in [key for key in cache if key[0] == ship_idx]:
+            del cache[key]
+        # Only the changed route needs new insertion positions
+        for other in unserved:
+            if (other, v) in cache:
+                cache[other, v] = best_insertion(evaluator, v, plan[v], other, cost[v], max_len[v])
+    
+    return evaluator.build_solution(plan, status='heuristic')
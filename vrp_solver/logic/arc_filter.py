@@ -0,0 +1,64 @@
+"""
+Time-Window Arc Filter.
+
+Finds stop-to-stop transitions that can never be driven directly,
+once per instance, before any model is built:
+
+    ready_i + service_i + travel(i, j) + setup(i, j) (+ rest, + intra) > due_j
+
+plus the structural "delivery -> own pickup" arc. Every term is a lower
+bound of what TimeConstraints adds between consecutive steps, so a pruned
+arc is infeasible in every solution. The result is a plain boolean matrix,
+usable by the CP-SAT model and by heuristics alike.
+"""
+from typing import List, Tuple
+import numpy as np
+from vrp_solver.domain import VRPData
+
+
+def compute_infeasible_arcs(data: VRPData) -> np.ndarray:
+    """Boolean matrix [from_stop, to_stop]: True if the direct transition is infeasible."""
+    table = data.stop_table
+    if len(table) == 0:
+        return np.zeros((0, 0), dtype=bool)
+    
+    loc = table.location_idx
+    service = table.service
+    ready, due = table.window_start, table.window_end
+    
+    # Travel/setup between the stops' locations
+    travel = np.asarray(data.travel_time_matrix)[np.ix_(loc, loc)]
+    setup = np.asarray(data.setup_time_matrix)[np.ix_(loc, loc)]
+    
+    # Break: smallest rest any vehicle must take on this drive
+    rest = np.zeros_like(travel)
+    if data.vehicles:
+        rest = np.min([
+            np.where(travel > veh.labor.break_rule.interval_minutes,
+                     veh.labor.break_rule.duration_minutes, 0)
+            for veh in data.vehicles
+        ], axis=0)
+    
+    # Same-site transit between two shipment stops
+    intra = np.where(loc[:, None] == loc[None, :], data.operations.min_intra_transit, 0)
+    
+    earliest = ready[:, None] + service[:, None] + travel + rest + setup + intra
+    infeasible = earliest > due[None, :]
+    
+    # Windows are only enforced at pickup/delivery stops
+    is_ship = ~table.is_depot
+    infeasible &= is_ship[:, None] & is_ship[None, :]
+    
+    # Delivery can't be followed by its own pickup
+    ship_idx = table.shipment_idx
+    is_pick = table.is_pickup
+    is_drop = table.is_delivery
+    infeasible |= is_drop[:, None] & is_pick[None, :] & (ship_idx[:, None] == ship_idx[None, :])
+    
+    np.fill_diagonal(infeasible, False)
+    return infeasible
+
+
+def infeasible_arc_pairs(infeasible: np.ndarray) -> List[Tuple[int, int]]:
+    """(from_stop, to_stop) pairs of the infeasible-arc matrix."""
+    return [(int(i), int(j)) for i, j in zip(*np.nonzero(infeasible))]
@@ -0,0 +1,161 @@
+"""
+Data-Derived Variable Bounds.
+
+Tight domains for every model variable, computed once per instance
+instead of literals like 0..10000:
+
+- Time: shift start .. shift start + max duration (per vehicle)
+- Load: capacity x capacity_scale_factor (per vehicle)
+- Legs: longest drive/distance/setup/service in the matrices
+- Costs: rates x the above, per vehicle and per objective component
+
+Every cost cap is checked against DOMAIN_LIMIT, so an instance whose
+objective could overflow fails at build time with a readable error
+instead of MODEL_INVALID from the solver.
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+from vrp_solver.domain import VRPData
+from vrp_solver.config import VRPConfig
+from vrp_solver.logic.evaluation import compatible_shipments
+from vrp_solver.logic.rehandling import REHANDLING_COST_CROWDED
+
+
+# Objective values come back as doubles: stay exactly representable
+DOMAIN_LIMIT = 2 ** 53
+
+
+@dataclass
+class VehicleBounds:
+    """Bounds of one vehicle's route variables."""
+    start: int        # Shift start (first arrival)
+    horizon: int      # Latest arrival: shift start + max duration
+    cap_w: int        # Scaled weight capacity
+    cap_v: int        # Scaled volume capacity
+    legs: int         # Most legs one route can drive
+    max_leg: int      # Longest leg: service + drive + rest + setup + anti-teleport
+    leg_cost: int     # Costliest leg: max distance x (per_km + cap_w x per_kg_km)
+    max_wait: int     # Longest wait for a ready time after the shift start
+    overtime: int     # Most overtime minutes
+    labor: int        # Labor cost of a full shift
+
+
+@dataclass
+class ModelBounds:
+    """Instance-wide bounds and per-vehicle bounds."""
+    vehicles: List[VehicleBounds]
+    horizon: int            # Latest arrival of any vehicle
+    max_drive: int
+    max_dist: int
+    max_setup: int
+    max_service: int
+    max_anti_teleport: int  # Depot dwell or same-site transit
+    max_ready: int          # Latest ready time of any stop
+    max_zone: int
+    max_cap_w: int
+    max_cap_v: int
+    max_ship_volume: int    # Scaled volume of the largest shipment
+    max_route_dist: int     # Longest route: most legs x longest leg
+    
+    # Caps of the objective components
+    fixed: int
+    distance: int
+    labor: int
+    zone: int
+    waiting: int
+    unserved: int
+    rehandling: int
+
+
+def check_bound(name: str, value: int) -> int:
+    """Return value, ValueError if it exceeds DOMAIN_LIMIT."""
+    if value > DOMAIN_LIMIT:
+        raise ValueError(
+            f"Bound of {name} ({value}) exceeds {DOMAIN_LIMIT}: "
+            f"reduce cost rates, penalties or capacity_scale_factor"
+        )
+    return value
+
+
+def compute_bounds(data: VRPData, config: VRPConfig,
+                   vehicle_steps: Optional[List[int]] = None) -> ModelBounds:
+    """
+    Bounds of an instance.
+    
+    vehicle_steps caps the legs per vehicle (step model horizon); the
+    number of compatible shipment stops caps them in any case.
+    """
+    scale = config.capacity_scale_factor
+    ops = data.operations
+    
+    max_drive, max_dist, max_setup = (
+        max(int(matrix.flat.max()), 0) if matrix.flat.size else 0
+        for matrix in (data.travel_time_matrix, data.travel_dist_matrix, data.setup_time_matrix)
+    )
+    max_service = max((loc.service_duration for loc in data.locations), default=0)
+    max_anti_teleport = max(ops.depot_service_time, ops.min_intra_transit, 0)
+    max_ready = max((data.get_stop_window(stop.id)[0] for stop in data.shipment_stops), default=0)
+    max_zone = max((loc.zone_id for loc in data.locations), default=0)
+    
+    compatible = compatible_shipments(data, config)
+    vehicles = []
+    for v, veh in enumerate(data.vehicles):
+        shift = veh.labor.shift
+        cost = veh.cost
+        labor_cost = veh.labor.cost
+        cap_w = int(veh.profile.capacity.weight * scale)
+        cap_v = int(veh.profile.capacity.volume * scale)
+        
+        legs = 2 * len(compatible[v]) + 1
+        if vehicle_steps is not None:
+            legs = min(legs, max(vehicle_steps[v] - 1, 0))
+        
+        rest = veh.labor.break_rule.duration_minutes if max_drive > veh.labor.break_rule.interval_minutes else 0
+        overtime = max(shift.max_duration - shift.standard_duration, 0)
+        over_rate = int(labor_cost.regular_rate * labor_cost.overtime_multiplier)
+        vehicles.append(VehicleBounds(
+            start=shift.start_time,
+            horizon=shift.start_time + shift.max_duration,
+            cap_w=cap_w,
+            cap_v=cap_v,
+            legs=legs,
+            max_leg=max_service + max_drive + rest + max_setup + max_anti_teleport,
+            leg_cost=max_dist * (cost.per_km + cap_w * cost.per_kg_km),
+            max_wait=max(max_ready - shift.start_time, 0),
+            overtime=overtime,
+            labor=min(shift.max_duration, shift.standard_duration) * labor_cost.regular_rate
+                  + overtime * over_rate,
+        ))
+    
+    num_ships = len(data.shipments)
+    max_cap_v = max((b.cap_v for b in vehicles), default=0)
+    max_ship_volume = max((int(ship.volume * scale) for ship in data.shipments), default=0)
+    bounds = ModelBounds(
+        vehicles=vehicles,
+        horizon=max((b.horizon for b in vehicles), default=0),
+        max_drive=max_drive,
+        max_dist=max_dist,
+        max_setup=max_setup,
+        max_service=max_service,
+        max_anti_teleport=max_anti_teleport,
+        max_ready=max_ready,
+        max_zone=max_zone,
+        max_cap_w=max((b.cap_w for b in vehicles), default=0),
+        max_cap_v=max_cap_v,
+        max_ship_volume=max_ship_volume,
+        max_route_dist=max((b.legs for b in vehicles), default=0) * max_dist,
+        fixed=sum(veh.cost.fixed for veh in data.vehicles),
+        distance=sum(b.legs * b.leg_cost for b in vehicles),
+        labor=sum(b.labor for b in vehicles),
+        zone=sum(b.legs for b in vehicles) * data.penalties.zone_crossing,
+        waiting=sum(
+            b.legs * b.max_wait * veh.cost.per_wait_minute for b, veh in zip(vehicles, data.vehicles)
+        ),
+        unserved=sum(ship.unserved_penalty for ship in data.shipments),
+        # Blockers of one delivery are on board together: at most a full vehicle
+        rehandling=num_ships * min(max_cap_v, num_ships * max_ship_volume) * REHANDLING_COST_CROWDED,
+    )
+    
+    for name in ('fixed', 'distance', 'labor', 'zone', 'waiting', 'unserved', 'rehandling'):
+        check_bound(name, getattr(bounds, name))
+    return bounds
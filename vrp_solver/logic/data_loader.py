@@ -10,14 +10,14 @@ from vrp_solver.domain import (
     Shipment, Cargo, TimeWindow,
     LaborPolicy, WorkShift, BreakRule, LaborCost,
     PenaltyConfig, OperationalCost,
-    Stop, StopType
+    StopTable, share_profiles
 )
 from vrp_solver.config import VRPConfig
 
 
-def build_stops(vehicles: List[Vehicle], shipments: List[Shipment]) -> List[Stop]:
+def build_stops(vehicles: List[Vehicle], shipments: List[Shipment]) -> StopTable:
     """
-    Build the Stop list from vehicles and shipments.
+    Build the stops from vehicles and shipments (columnar StopTable).
     
     Stop structure:
       - First: Start depot for each vehicle
@@ -26,54 +26,7 @@ def build_stops(vehicles: List[Vehicle], shipments: List[Shipment]) -> List[Stop
     
     This allows multiple stops to reference the same physical location.
     """
-    stops = []
-    stop_id = 0
-    
-    # --- 1. Start Depots (one per vehicle) ---
-    for v_idx, veh in enumerate(vehicles):
-        stops.append(Stop(
-            id=stop_id,
-            stop_type=StopType.DEPOT_START,
-            location_idx=veh.start_loc,
-            vehicle_idx=v_idx,
-            shipment_idx=-1
-        ))
-        stop_id += 1
-    
-    # --- 2. Shipment Stops (pickup + delivery for each) ---
-    for s_idx, ship in enumerate(shipments):
-        # Pickup stop
-        stops.append(Stop(
-            id=stop_id,
-            stop_type=StopType.PICKUP,
-            location_idx=ship.pickup_id,
-            shipment_idx=s_idx,
-            vehicle_idx=-1
-        ))
-        stop_id += 1
-        
-        # Delivery stop
-        stops.append(Stop(
-            id=stop_id,
-            stop_type=StopType.DELIVERY,
-            location_idx=ship.delivery_id,
-            shipment_idx=s_idx,
-            vehicle_idx=-1
-        ))
-        stop_id += 1
-    
-    # --- 3. End Depots (one per vehicle) ---
-    for v_idx, veh in enumerate(vehicles):
-        stops.append(Stop(
-            id=stop_id,
-            stop_type=StopType.DEPOT_END,
-            location_idx=veh.end_loc,
-            vehicle_idx=v_idx,
-            shipment_idx=-1
-        ))
-        stop_id += 1
-    
-    return stops
+    return StopTable.build(vehicles, shipments)
 
 
 def load_dummy_data(config: VRPConfig) -> VRPData:
@@ -222,7 +175,10 @@ def load_dummy_data(config: VRPConfig) -> VRPData:
     
     # --- 5. Build Stops ---
     stops = build_stops(vehicles, shipments)
-        
+    
+    # One instance per distinct profile/cargo/window value
+    share_profiles(locations, vehicles, shipments)
+    
     # --- 6. Matrices ---
     calc_travel_time = [[t * 5 for t in row] for row in raw_time_matrix]
     calc_travel_dist = [[t * 5 for t in row] for row in raw_time_matrix]
@@ -0,0 +1,247 @@
+"""
+Route Evaluation.
+
+Plain-Python replica of the step model's rules for a fixed stop sequence:
+arrival chain (service, drive, rest, setup, anti-teleport), time windows,
+shift length, capacity and the cost components of ObjectiveConstraints.
+
+Lets heuristics check and cost plans exactly as CP-SAT would, and turns
+any plan into the variable-free Solution.
+"""
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from vrp_solver.domain import VRPData, Route, Solution, StopType
+from vrp_solver.config import VRPConfig
+from vrp_solver.logic.arc_filter import compute_infeasible_arcs
+from vrp_solver.logic.rehandling import rehandling_cost
+
+
+# (stop_id, arrival, load_w, load_v) with loads scaled by capacity_scale_factor
+Visit = Tuple[int, int, int, int]
+
+
+def compatible_shipments(data: VRPData, config: VRPConfig) -> Dict[int, List[int]]:
+    """vehicle -> shipments it can carry (required tags + capacity)."""
+    scale = config.capacity_scale_factor
+    result = {}
+    for v, veh in enumerate(data.vehicles):
+        cap = veh.profile.capacity
+        tags = set(veh.profile.tags)
+        result[v] = [
+            ship_idx for ship_idx, ship in enumerate(data.shipments)
+            if set(ship.required_tags) <= tags
+            and int(ship.weight * scale) <= int(cap.weight * scale)
+            and int(ship.volume * scale) <= int(cap.volume * scale)
+        ]
+    return result
+
+
+class RouteEvaluator:
+    """Simulates and costs stop sequences of single vehicles."""
+    
+    def __init__(self, data: VRPData, config: VRPConfig):
+        self.data = data
+        self.config = config
+        scale = config.capacity_scale_factor
+        
+        table = data.stop_table
+        self.stop_loc = table.location_idx.tolist()
+        self.service = table.service.tolist()
+        self.delta_w = np.trunc(table.weight_delta * scale).astype(np.int64).tolist()
+        self.delta_v = np.trunc(table.volume_delta * scale).astype(np.int64).tolist()
+        zones = [loc.zone_id for loc in data.locations]
+        self.zone = [zones[loc] for loc in self.stop_loc]
+        
+        # Time windows are only enforced at pickup/delivery stops
+        windowed = (~table.is_depot).tolist()
+        self.window = [
+            (start, end) if w else None
+            for start, end, w in zip(table.window_start.tolist(), table.window_end.tolist(), windowed)
+        ]
+        
+        # Ready time used by the waiting cost (shipment window start only)
+        ready = np.zeros(len(table), dtype=np.int64)
+        for stop_type, attr in ((StopType.PICKUP, 'pickup_window'), (StopType.DELIVERY, 'delivery_window')):
+            ids = table.ids(stop_type)
+            windows = (getattr(data.shipments[s], attr) for s in table.shipment_idx[ids].tolist())
+            ready[ids] = [w.start if w else 0 for w in windows]
+        self.ready = ready.tolist()
+        
+        def stop_map(stop_type, key_column):
+            ids = table.ids(stop_type)
+            return dict(zip(key_column[ids].tolist(), ids.tolist()))
+        
+        self.start_stop = stop_map(StopType.DEPOT_START, table.vehicle_idx)
+        self.end_stop = stop_map(StopType.DEPOT_END, table.vehicle_idx)
+        self.pickup_stop = stop_map(StopType.PICKUP, table.shipment_idx)
+        self.delivery_stop = stop_map(StopType.DELIVERY, table.shipment_idx)
+        
+        # Scalar matrix lookups in the loops below: ndarray.item gives plain ints
+        self.time_at = data.travel_time_matrix.array.item
+        self.dist_at = data.travel_dist_matrix.array.item
+        self.setup_at = data.setup_time_matrix.array.item
+        
+        self.compatible = compatible_shipments(data, config)
+        self.infeasible_arcs = compute_infeasible_arcs(data)
+    
+    # ======================
+    # Feasibility
+    # ======================
+    
+    def simulate(self, v: int, stop_ids: List[int]) -> Optional[List[Visit]]:
+        """
+        Earliest-arrival schedule of a full route (start ... end), None if infeasible.
+        
+        Both CP-SAT backends pin arrivals to this schedule, so the waiting and
+        labor costs below are the ones the model charges for the same route.
+        """
+        data = self.data
+        veh = data.vehicles[v]
+        shift = veh.labor.shift
+        break_rule = veh.labor.break_rule
+        scale = self.config.capacity_scale_factor
+        cap_w = int(veh.profile.capacity.weight * scale)
+        cap_v = int(veh.profile.capacity.volume * scale)
+        start_stop = self.start_stop[v]
+        
+        visits = []
+        arrival = shift.start_time
+        load_w = load_v = 0
+        for k, stop_id in enumerate(stop_ids):
+            if k > 0:
+                prev = stop_ids[k - 1]
+                if self.infeasible_arcs[prev, stop_id]:
+                    return None
+                li, lj = self.stop_loc[prev], self.stop_loc[stop_id]
+                drive = self.time_at(li, lj)
+                rest = break_rule.duration_minutes if drive > break_rule.interval_minutes else 0
+                setup = self.setup_at(li, lj)
+                if prev == start_stop:
+                    anti_teleport = data.operations.depot_service_time
+                elif li == lj:
+                    anti_teleport = data.operations.min_intra_transit
+                else:
+                    anti_teleport = 0
+                arrival = visits[-1][1] + self.service[prev] + drive + rest + setup + anti_teleport
+                
+                window = self.window[stop_id]
+                if window is not None:
+                    arrival = max(arrival, window[0])  # Wait if early
+                    if arrival > window[1]:
+                        return None
+            
+            if arrival - shift.start_time > shift.max_duration:
+                return None
+            if load_w > cap_w or load_v > cap_v or load_w < 0:
+                return None
+            visits.append((stop_id, arrival, load_w, load_v))
+            load_w += self.delta_w[stop_id]
+            load_v += self.delta_v[stop_id]
+        return visits
+    
+    # ======================
+    # Costs
+    # ======================
+    
+    def route_costs(self, v: int, visits: List[Visit]) -> Dict[str, int]:
+        """Fixed/distance/labor/zone/waiting cost of one vehicle, as in the step objective."""
+        data = self.data
+        veh = data.vehicles[v]
+        veh_cost = veh.cost
+        
+        distance = zone = waiting = 0
+        for k in range(len(visits) - 1):
+            i, arr_i, lw_i, _ = visits[k]
+            j = visits[k + 1][0]
+            li, lj = self.stop_loc[i], self.stop_loc[j]
+            
+            distance += self.dist_at(li, lj) * (veh_cost.per_km + lw_i * veh_cost.per_kg_km)
+            
+            if self.zone[i] != 0 and self.zone[j] != 0 and self.zone[i] != self.zone[j]:
+                zone += data.penalties.zone_crossing
+            
+            if j != self.end_stop[v]:
+                earliest = arr_i + self.service[i] + self.time_at(li, lj)
+                waiting += max(self.ready[j] - earliest, 0) * veh_cost.per_wait_minute
+        
+        # Labor: regular + overtime from the last arrival
+        shift = veh.labor.shift
+        labor_cost = veh.labor.cost
+        work = visits[-1][1] - shift.start_time
+        regular = min(work, shift.standard_duration)
+        overtime = max(work - shift.standard_duration, 0)
+        labor = regular * labor_cost.regular_rate + overtime * int(labor_cost.regular_rate * labor_cost.overtime_multiplier)
+        
+        used = len(visits) > 2
+        return {
+            'fixed': veh_cost.fixed if used else 0,
+            'distance': distance,
+            'labor': labor,
+            'zone_penalty': zone,
+            'waiting': waiting,
+        }
+    
+    def route_cost(self, v: int, visits: List[Visit]) -> int:
+        """Sum of route_costs."""
+        return sum(self.route_costs(v, visits).values())
+    
+    # ======================
+    # Solution Building
+    # ======================
+    
+    def to_route(self, v: int, visits: List[Visit]) -> Route:
+        """Route with result fields (arrival, service, cumulative metrics) filled in."""
+        data = self.data
+        scale = self.config.capacity_scale_factor
+        table = data.stop_table
+        route = Route(vehicle_id=v)
+        cum_dist = 0
+        prev_loc = None
+        for stop_id, arr, lw, lv in visits:
+            loc = self.stop_loc[stop_id]
+            if prev_loc is not None:
+                cum_dist += self.dist_at(prev_loc, loc)
+            prev_loc = loc
+            route.stops.append(table[stop_id].to_stop(
+                arrival_time=arr,
+                service_time=self.service[stop_id],
+                departure_time=arr + self.service[stop_id],
+                cum_dist=cum_dist,
+                cum_weight=lw / scale,
+                cum_volume=lv / scale,
+            ))
+        if route.stops:
+            route.total_distance = cum_dist
+            route.total_time = route.stops[-1].arrival_time - route.stops[0].arrival_time
+        return route
+    
+    def empty_route(self, v: int) -> List[int]:
+        """Stop sequence of an unused vehicle."""
+        return [self.start_stop[v], self.end_stop[v]]
+    
+    def build_solution(self, plan: Dict[int, List[int]], status: str) -> Solution:
+        """Solution (routes, costs, served) of a feasible plan {vehicle: stop sequence}."""
+        data = self.data
+        costs = {'fixed': 0, 'distance': 0, 'labor': 0, 'zone_penalty': 0, 'rehandling': 0,
+                 'waiting': 0, 'late_penalty': 0, 'unserved_penalty': 0}
+        served = [False] * len(data.shipments)
+        routes = []
+        
+        for v in range(len(data.vehicles)):
+            visits = self.simulate(v, plan.get(v) or self.empty_route(v))
+            if visits is None:
+                raise ValueError(f"Plan for vehicle {v} is infeasible")
+            for key, value in self.route_costs(v, visits).items():
+                costs[key] += value
+            if len(visits) > 2:
+                routes.append(self.to_route(v, visits))
+                for stop_id, _, _, _ in visits:
+                    if data.stops[stop_id].is_pickup:
+                        served[data.stops[stop_id].shipment_idx] = True
+        
+        costs['rehandling'] = rehandling_cost(data, self.config, routes)
+        costs['unserved_penalty'] = sum(
+            ship.unserved_penalty for ship, ok in zip(data.shipments, served) if not ok
+        )
+        costs['total'] = sum(costs.values())
+        return Solution(status=status, routes=routes, costs=costs, served=served)
@@ -0,0 +1,52 @@
+"""
+LIFO Rehandling Cost.
+
+A shipment "blocks" another one in the same vehicle when it is loaded
+after it, is still on board when the other is unloaded, and is unloaded
+later (p_curr < p_other < d_curr < d_other). Each blocker costs its
+volume x REHANDLING_COST_BASIC, or x REHANDLING_COST_CROWDED when the
+vehicle is at least CROWDED_RATIO full at the blocked delivery.
+
+Shared by the CP-SAT formulations and the post-solve evaluation.
+"""
+from typing import List
+from vrp_solver.domain import VRPData, Route
+from vrp_solver.config import VRPConfig
+
+
+REHANDLING_COST_BASIC = 10    # Per scaled volume unit moved
+REHANDLING_COST_CROWDED = 50  # Same, when the vehicle is crowded
+CROWDED_RATIO = 0.7           # Load share (volume) that counts as crowded
+
+
+def crowded_threshold(volume_capacity: float, scale: int) -> int:
+    """Scaled volume load from which a vehicle counts as crowded."""
+    return int(volume_capacity * scale * CROWDED_RATIO)
+
+
+def rehandling_cost(data: VRPData, config: VRPConfig, routes: List[Route]) -> int:
+    """Rehandling cost of finished routes (stops carry their arrival load)."""
+    scale = config.capacity_scale_factor
+    total = 0
+    for route in routes:
+        veh = data.vehicles[route.vehicle_id]
+        thresh = crowded_threshold(veh.profile.capacity.volume, scale)
+        
+        pickup_pos = {}
+        delivery_pos = {}
+        drop_load = {}
+        for pos, stop in enumerate(route.stops):
+            if stop.is_pickup:
+                pickup_pos[stop.shipment_idx] = pos
+            elif stop.is_delivery:
+                delivery_pos[stop.shipment_idx] = pos
+                drop_load[stop.shipment_idx] = round(stop.cum_volume * scale)
+        
+        for curr, d_curr in delivery_pos.items():
+            rate = REHANDLING_COST_CROWDED if drop_load[curr] >= thresh else REHANDLING_COST_BASIC
+            for other, d_other in delivery_pos.items():
+                if other == curr:
+                    continue
+                if pickup_pos[curr] < pickup_pos[other] < d_curr < d_other:
+                    total += int(data.shipments[other].cargo.volume * scale) * rate
+    return total
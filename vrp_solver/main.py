@@ -6,42 +6,96 @@ sys.path.append(os.getcwd())
 
 from vrp_solver.config import VRPConfig
 from vrp_solver.logic.data_loader import load_dummy_data
-from vrp_solver.ortools_solver.wrapper import VRPSolver
+from vrp_solver.ortools_solver.backends import create_solver
+from vrp_solver.ortools_solver.horizon import solve_iterative
+from vrp_solver.ortools_solver.lns import solve_lns
+from vrp_solver.ortools_solver.staged import solve_staged
+from vrp_solver.ortools_solver.routing_engine import solve_routing
+from vrp_solver.ortools_solver.profiler import BuildProfiler
+from vrp_solver.heuristics.construction import greedy_insertion
+from vrp_solver.heuristics.alns import solve_alns
 from vrp_solver.ortools_solver.constraints.routing import RoutingConstraints
 from vrp_solver.ortools_solver.constraints.time import TimeConstraints
 from vrp_solver.ortools_solver.constraints.capacity import CapacityConstraints
 from vrp_solver.ortools_solver.constraints.flow import FlowConstraints
 from vrp_solver.ortools_solver.constraints.lifo import LifoConstraints
 from vrp_solver.ortools_solver.constraints.objectives import ObjectiveConstraints
-from vrp_solver.output.printer import print_solution
+from vrp_solver.output.printer import print_solution, print_report
 
 def main():
     # 1. Config & Data
     config = VRPConfig()
     data = load_dummy_data(config)
     
-    # 2. Init Solver
-    solver = VRPSolver(data, config)
-    solver.create_variables()
+    if config.solver_engine == "alns":
+        # Large instances: no CP-SAT model at all
+        print_report(data, solve_alns(data, config, log=print))
+        return
+    
+    if config.solver_engine == "routing":
+        # OR-Tools routing library (dimensions + guided local search)
+        print_report(data, solve_routing(data, config))
+        return
+    
+    if config.use_lns:
+        # One model, re-solved on destroyed neighborhoods of the incumbent
+        _, solution, _ = solve_lns(data, config, log=print)
+        print_report(data, solution)
+        return
+    
+    if config.objective_mode == "staged":
+        # Lexicographic: max service, then min operating cost at that level
+        _, solution, _ = solve_staged(data, config, log=print)
+        print_report(data, solution)
+        return
+    
+    if config.route_horizon == "iterative":
+        # Build/solve rounds with a growing per-vehicle horizon
+        solver, cp_solver, status = solve_iterative(data, config, log=print)
+        print_solution(solver, cp_solver, status)
+        return
+    
+    # 2. Init Solver (config.profile_build: time/size every stage)
+    profiler = BuildProfiler(enabled=config.profile_build)
+    with profiler.measure('__init__'):
+        solver = create_solver(data, config)
+        profiler.attach(solver.model)
+    with profiler.measure('create_variables'):
+        solver.create_variables()
     
     # 3. Apply Constraints
     print("Applying Routing Constraints...")
-    RoutingConstraints.apply(solver)
+    with profiler.measure('RoutingConstraints'):
+        RoutingConstraints.apply(solver)
     
     print("Applying Time Constraints...")
-    TimeConstraints.apply(solver)
+    with profiler.measure('TimeConstraints'):
+        TimeConstraints.apply(solver)
     
     print("Applying Capacity Constraints...")
-    CapacityConstraints.apply(solver)
+    with profiler.measure('CapacityConstraints'):
+        CapacityConstraints.apply(solver)
     
     print("Applying Flow Constraints...")
-    FlowConstraints.apply(solver)
+    with profiler.measure('FlowConstraints'):
+        FlowConstraints.apply(solver)
     
     print("Applying LIFO Constraints...")
-    LifoConstraints.apply(solver)
+    with profiler.measure('LifoConstraints'):
+        LifoConstraints.apply(solver)
     
     print("Applying Objective Constraints...")
-    ObjectiveConstraints.apply(solver)
+    with profiler.measure('ObjectiveConstraints'):
+        ObjectiveConstraints.apply(solver)
+    
+    if config.construction_hint:
+        print("Building Construction Hint...")
+        with profiler.measure('warm_start'):
+            solver.warm_start(greedy_insertion(data, config, solver.vehicle_steps))
+    
+    if config.profile_build:
+        print("Model Build Profile:")
+        print(profiler.report())
     
     # 4. Solve
     print("Solving...")
@@ -0,0 +1,96 @@
+"""
+Model Backend Selection.
+
+Maps VRPConfig.model_backend to the solver class that creates the variables.
+Constraint modules dispatch on solver.backend, so the same
+Routing/Time/Capacity/Flow/LIFO/Objective pipeline runs on either encoding.
+"""
+from typing import List, Optional
+from vrp_solver.domain import VRPData, Solution
+from vrp_solver.config import VRPConfig
+from vrp_solver.ortools_solver.wrapper import VRPSolver, ARC_ENCODINGS
+from vrp_solver.ortools_solver.circuit import CircuitVRPSolver
+from vrp_solver.ortools_solver.constraints.routing import RoutingConstraints
+from vrp_solver.ortools_solver.constraints.time import TimeConstraints
+from vrp_solver.ortools_solver.constraints.capacity import CapacityConstraints
+from vrp_solver.ortools_solver.constraints.flow import FlowConstraints
+from vrp_solver.ortools_solver.constraints.lifo import LifoConstraints
+from vrp_solver.ortools_solver.constraints.objectives import ObjectiveConstraints
+from vrp_solver.ortools_solver.profiler import BuildProfiler
+from vrp_solver.ortools_solver.model_cache import ModelCache, fingerprint
+from vrp_solver.heuristics.construction import greedy_insertion
+
+
+BACKENDS = {
+    'step': VRPSolver,           # route[v, s] step-indexed encoding
+    'circuit': CircuitVRPSolver, # successor arcs + AddCircuit
+}
+
+# Applied in order by build_model (objective last: it reads the other modules' variables)
+CONSTRAINT_MODULES = [
+    RoutingConstraints,
+    TimeConstraints,
+    CapacityConstraints,
+    FlowConstraints,
+    LifoConstraints,
+    ObjectiveConstraints,
+]
+
+
+def create_solver(data: VRPData, config: VRPConfig, vehicle_steps: Optional[List[int]] = None) -> VRPSolver:
+    """Instantiate the solver for config.model_backend."""
+    try:
+        solver_cls = BACKENDS[config.model_backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown model backend '{config.model_backend}' (expected one of {sorted(BACKENDS)})"
+        )
+    if config.arc_encoding not in ARC_ENCODINGS:
+        raise ValueError(
+            f"Unknown arc encoding '{config.arc_encoding}' (expected one of {list(ARC_ENCODINGS)})"
+        )
+    return solver_cls(data, config, vehicle_steps)
+
+
+def build_model(data: VRPData, config: VRPConfig, vehicle_steps: Optional[List[int]] = None,
+                hint: Optional[Solution] = None) -> VRPSolver:
+    """
+    Create the solver, its variables and every constraint module.
+    
+    The model is warm-started from hint, or from a greedy insertion plan
+    when config.construction_hint is set. With config.profile_build every
+    stage is measured into solver.build_profile. With config.model_cache_dir
+    an identical earlier build is loaded instead of rebuilt.
+    """
+    profiler = BuildProfiler(enabled=config.profile_build)
+    with profiler.measure('__init__'):
+        solver = create_solver(data, config, vehicle_steps)
+        profiler.attach(solver.model)
+    solver.build_profile = profiler
+    
+    cache = key = cached = None
+    if config.model_cache_dir:
+        cache = ModelCache(config.model_cache_dir, config.model_cache_max_mb * 2**20)
+        key = fingerprint(data, config, solver.vehicle_steps)
+        with profiler.measure('model_cache'):
+            cached = cache.get(key)
+            if cached is not None:
+                solver.load_model(*cached)
+                profiler.attach(solver.model)
+    
+    if cached is None:
+        with profiler.measure('create_variables'):
+            solver.create_variables()
+        for module in CONSTRAINT_MODULES:
+            with profiler.measure(module.__name__):
+                module.apply(solver)
+        if cache is not None:
+            # Stored before the warm start: hints belong to the request
+            cache.put(key, solver.model, solver.variables)
+    
+    with profiler.measure('warm_start'):
+        if hint is None and config.construction_hint:
+            hint = greedy_insertion(data, config, solver.vehicle_steps)
+        if hint is not None:
+            solver.warm_start(hint)
+    return solver
@@ -0,0 +1,208 @@
+"""
+Circuit (Successor-based) VRP Solver.
+
+Alternative model backend: instead of route[v, s] step variables,
+each vehicle gets one AddCircuit over arc literals
+    arc[v, i, j] = True if vehicle v drives from stop i to stop j
+
+Node layout per vehicle:
+- Own start depot and end depot (closed by a fixed end -> start arc)
+- Every pickup/delivery stop (a self-loop means "not visited by v")
+
+Arrival time, load and rank are stored per Stop (each shipment stop is
+visited by at most one vehicle) and propagated along the arcs by the
+same constraint modules as the step model.
+"""
+from typing import Any, Dict, List, Tuple
+from ortools.sat.python import cp_model
+from vrp_solver.domain import Solution
+from vrp_solver.ortools_solver.wrapper import VRPSolver
+
+
+class CircuitVRPSolver(VRPSolver):
+    backend = 'circuit'
+    
+    def vehicle_arcs(self, v: int) -> List[Tuple[int, int]]:
+        """Candidate (from_stop, to_stop) arcs of vehicle v (self-loops excluded)."""
+        start = self.vehicle_start_stop[v]
+        end = self.vehicle_end_stop[v]
+        # Only shipments this vehicle can carry (tags + capacity)
+        compatible = self.compatible_shipments[v]
+        pickups = {self.shipment_pickup_stop[i] for i in compatible}
+        deliveries = {self.shipment_delivery_stop[i] for i in compatible}
+        ship_stops = sorted(pickups | deliveries)
+        
+        arcs = [(start, end)]
+        for j in ship_stops:
+            # A route can only open with a pickup
+            if j in pickups:
+                arcs.append((start, j))
+        for i in ship_stops:
+            for j in ship_stops:
+                # Time-window infeasible or delivery -> own pickup
+                if i == j or self.infeasible_arcs[i, j]:
+                    continue
+                arcs.append((i, j))
+            # A route can only close after a delivery
+            if i in deliveries:
+                arcs.append((i, end))
+        return arcs
+    
+    def create_variables(self):
+        """Initializes all CP variables for successor-based routing."""
+        m = self.model
+        num_v = self.num_vehicles
+        num_stops = self.num_stops
+        num_ships = self.num_shipments
+        
+        ship_stops = [stop.id for stop in self.data.shipment_stops]
+        
+        # ======================
+        # 1. Arc Literals
+        # ======================
+        arc = {}     # arc[v, i, j] = True if vehicle v drives i -> j
+        visits = {}  # visits[v, stop_id] = True if vehicle v visits stop
+        self.arc_list = {}
+        for v in range(num_v):
+            self.arc_list[v] = self.vehicle_arcs(v)
+            for i, j in self.arc_list[v]:
+                arc[v, i, j] = m.NewBoolVar(f'arc_{v}_{i}_{j}')
+            for stop_id in ship_stops:
+                visits[v, stop_id] = m.NewBoolVar(f'vis_{v}_{stop_id}')
+        
+        self.variables['arc'] = arc
+        self.variables['visits'] = visits
+        
+        # ======================
+        # 2. Per-Stop State (shared by all vehicles)
+        # ======================
+        bounds = self.bounds
+        start = min((vb.start for vb in bounds.vehicles), default=0)
+        
+        stop_arrival = {}  # stop_arrival[stop_id] = arrival time at stop
+        stop_load_w = {}   # stop_load_w[stop_id] = weight load on arrival
+        stop_load_v = {}   # stop_load_v[stop_id] = volume load on arrival
+        for stop_id in range(num_stops):
+            stop_arrival[stop_id] = m.NewIntVar(start, bounds.horizon, f'sarr_{stop_id}')
+            stop_load_w[stop_id] = m.NewIntVar(0, bounds.max_cap_w, f'slw_{stop_id}')
+            stop_load_v[stop_id] = m.NewIntVar(0, bounds.max_cap_v, f'slv_{stop_id}')
+        
+        self.variables['stop_arrival'] = stop_arrival
+        self.variables['stop_load_w'] = stop_load_w
+        self.variables['stop_load_v'] = stop_load_v
+        
+        # ======================
+        # 3. Vehicle Usage
+        # ======================
+        is_used = {}
+        for v in range(num_v):
+            is_used[v] = m.NewBoolVar(f'used_{v}')
+        self.variables['is_used'] = is_used
+        
+        # ======================
+        # 4. Stop Visit State
+        # ======================
+        # visit_step is the rank of the stop within its route
+        visit_step = {}
+        visit_vehicle = {}
+        is_stop_active = {}
+        for stop_id in range(num_stops):
+            visit_step[stop_id] = m.NewIntVar(0, num_stops, f'vstep_{stop_id}')
+            visit_vehicle[stop_id] = m.NewIntVar(0, num_v, f'vveh_{stop_id}')
+            is_stop_active[stop_id] = m.NewBoolVar(f'active_{stop_id}')
+        
+        self.variables['visit_step'] = visit_step
+        self.variables['visit_vehicle'] = visit_vehicle
+        self.variables['is_stop_active'] = is_stop_active
+        
+        # ======================
+        # 5. Shipment Service State
+        # ======================
+        is_served = {}
+        for ship_idx in range(num_ships):
+            is_served[ship_idx] = m.NewBoolVar(f'served_{ship_idx}')
+        self.variables['is_served'] = is_served
+        
+        # ======================
+        # 6. Objective Components
+        # ======================
+        self.variables['cost_terms'] = []
+        
+        return self.variables
+    
+    def load_model(self, model: cp_model.CpModel, variables: Dict[str, Any]):
+        """Adopt a cached model; the candidate arcs are rebuilt (deterministic)."""
+        super().load_model(model, variables)
+        self.arc_list = {v: self.vehicle_arcs(v) for v in range(self.num_vehicles)}
+    
+    def add_solution_hint(self, solution: Solution):
+        """Hint arcs, visits and per-stop arrival/load from a plan."""
+        if not solution.is_feasible:
+            return
+        m = self.model
+        cars = self.variables
+        
+        for v, visits in self._plan_visits(solution).items():
+            if visits is None:
+                continue
+            taken = {(visits[k][0], visits[k + 1][0]) for k in range(len(visits) - 1)}
+            for i, j in self.arc_list[v]:
+                m.AddHint(cars['arc'][v, i, j], (i, j) in taken)
+            
+            on_route = {stop_id for stop_id, _, _, _ in visits}
+            for stop in self.data.shipment_stops:
+                m.AddHint(cars['visits'][v, stop.id], stop.id in on_route)
+            
+            for rank, (stop_id, arrival, lw, lv) in enumerate(visits):
+                m.AddHint(cars['stop_arrival'][stop_id], arrival)
+                m.AddHint(cars['stop_load_w'][stop_id], lw)
+                m.AddHint(cars['stop_load_v'][stop_id], lv)
+                m.AddHint(cars['visit_step'][stop_id], rank)
+            m.AddHint(cars['is_used'][v], len(visits) > 2)
+        
+        for ship_idx, served in enumerate(solution.served):
+            m.AddHint(cars['is_served'][ship_idx], served)
+    
+    def fix_vehicle(self, v: int, visits: List[Tuple[int, int, int, int]]):
+        """Fix the arcs, visits and per-stop state of vehicle v's route."""
+        cars = self.variables
+        taken = {(visits[k][0], visits[k + 1][0]) for k in range(len(visits) - 1)}
+        for i, j in self.arc_list[v]:
+            self.fix_value(cars['arc'][v, i, j], int((i, j) in taken))
+        
+        on_route = {stop_id for stop_id, _, _, _ in visits}
+        for stop in self.data.shipment_stops:
+            self.fix_value(cars['visits'][v, stop.id], int(stop.id in on_route))
+        
+        for rank, (stop_id, arrival, lw, lv) in enumerate(visits):
+            self.fix_value(cars['stop_arrival'][stop_id], arrival)
+            self.fix_value(cars['stop_load_w'][stop_id], lw)
+            self.fix_value(cars['stop_load_v'][stop_id], lv)
+            self.fix_value(cars['visit_step'][stop_id], rank)
+        self.fix_value(cars['is_used'][v], int(len(visits) > 2))
+    
+    def _route_visits(self, cp_solver: cp_model.CpSolver, v: int) -> List[Tuple[int, int, int, int]]:
+        """Follow the active arcs of vehicle v from its start depot."""
+        cars = self.variables
+        val = cp_solver.Value
+        start = self.vehicle_start_stop[v]
+        end = self.vehicle_end_stop[v]
+        
+        succ = {}
+        for i, j in self.arc_list[v]:
+            if val(cars['arc'][v, i, j]):
+                succ[i] = j
+        
+        visits = []
+        stop_id = start
+        while True:
+            visits.append((
+                stop_id,
+                val(cars['stop_arrival'][stop_id]),
+                val(cars['stop_load_w'][stop_id]),
+                val(cars['stop_load_v'][stop_id]),
+            ))
+            if stop_id == end:
+                break
+            stop_id = succ[stop_id]
+        return visits
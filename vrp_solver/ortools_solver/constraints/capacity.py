@@ -11,12 +11,15 @@ from vrp_solver.ortools_solver.wrapper import VRPSolver
 class CapacityConstraints:
     @staticmethod
     def apply(solver: VRPSolver):
+        if solver.backend == 'circuit':
+            return CapacityConstraints._apply_circuit(solver)
+        
         m = solver.model
         data = solver.data
         cars = solver.variables
         
         num_v = solver.num_vehicles
-        max_s = solver.max_steps
+        steps = solver.vehicle_steps  # Per-vehicle horizon
         
         route = cars['route']  # Stop index
         load_w = cars['load_w']
@@ -29,25 +32,22 @@ class CapacityConstraints:
         
         for v in range(num_v):
             veh = data.vehicles[v]
-            end_depot_stop = solver.vehicle_end_stop[v]
             
             # Initial load = 0
             m.Add(load_w[v, 0] == 0)
             m.Add(load_v[v, 0] == 0)
             
-            for s in range(max_s - 1):
+            for s in range(steps[v] - 1):
                 curr_stop = route[v, s]
                 
                 # Get delta from current stop
-                delta_w = m.NewIntVar(-500, 500, f'dw_{v}_{s}')
+                delta_w = m.NewIntVar(min(stop_weight_delta), max(stop_weight_delta), f'dw_{v}_{s}')
                 m.AddElement(curr_stop, stop_weight_delta, delta_w)
-                delta_vol = m.NewIntVar(-500, 500, f'dv_{v}_{s}')
+                delta_vol = m.NewIntVar(min(stop_volume_delta), max(stop_volume_delta), f'dv_{v}_{s}')
                 m.AddElement(curr_stop, stop_volume_delta, delta_vol)
                 
-                # Check if at end depot
-                at_end_depot = m.NewBoolVar(f'aed_{v}_{s}')
-                m.Add(curr_stop == end_depot_stop).OnlyEnforceIf(at_end_depot)
-                m.Add(curr_stop != end_depot_stop).OnlyEnforceIf(at_end_depot.Not())
+                # Check if at end depot (shared registry)
+                at_end_depot = solver.at_end_lit(v, s)
                 
                 # If at end depot or done, reset to 0
                 # Otherwise, apply delta
@@ -63,9 +63,46 @@ class CapacityConstraints:
             
             # Capacity limits
             scale = solver.config.capacity_scale_factor
-            for s in range(max_s):
+            for s in range(steps[v]):
                 m.Add(load_w[v, s] <= int(veh.profile.capacity.weight * scale))
                 m.Add(load_v[v, s] <= int(veh.profile.capacity.volume * scale))
                 # Non-negative load
                 m.Add(load_w[v, s] >= 0)
                 m.Add(load_v[v, s] >= 0)
+
+    @staticmethod
+    def _apply_circuit(solver: VRPSolver):
+        """Load propagation along arc literals."""
+        m = solver.model
+        data = solver.data
+        cars = solver.variables
+        
+        arc = cars['arc']
+        visits = cars['visits']
+        stop_load_w = cars['stop_load_w']
+        stop_load_v = cars['stop_load_v']
+        
+        stop_weight_delta = solver.stop_weight_delta
+        stop_volume_delta = solver.stop_volume_delta
+        scale = solver.config.capacity_scale_factor
+        
+        for v in range(solver.num_vehicles):
+            veh = data.vehicles[v]
+            start_depot_stop = solver.vehicle_start_stop[v]
+            cap_w = int(veh.profile.capacity.weight * scale)
+            cap_v = int(veh.profile.capacity.volume * scale)
+            
+            # Initial load = 0
+            m.Add(stop_load_w[start_depot_stop] == 0)
+            m.Add(stop_load_v[start_depot_stop] == 0)
+            
+            # Load on arrival at j = load on arrival at i + delta of i
+            for i, j in solver.arc_list[v]:
+                lit = arc[v, i, j]
+                m.Add(stop_load_w[j] == stop_load_w[i] + stop_weight_delta[i]).OnlyEnforceIf(lit)
+                m.Add(stop_load_v[j] == stop_load_v[i] + stop_volume_delta[i]).OnlyEnforceIf(lit)
+            
+            # Capacity limits of the visiting vehicle
+            for stop in data.shipment_stops:
+                m.Add(stop_load_w[stop.id] <= cap_w).OnlyEnforceIf(visits[v, stop.id])
+                m.Add(stop_load_v[stop.id] <= cap_v).OnlyEnforceIf(visits[v, stop.id])
@@ -12,6 +12,9 @@ from vrp_solver.ortools_solver.wrapper import VRPSolver
 class FlowConstraints:
     @staticmethod
     def apply(solver: VRPSolver):
+        if solver.backend == 'circuit':
+            return FlowConstraints._apply_circuit(solver)
+        
         m = solver.model
         data = solver.data
         cars = solver.variables
@@ -46,7 +49,7 @@ class FlowConstraints:
                 start_depot = solver.vehicle_start_stop[v]
                 end_depot = solver.vehicle_end_stop[v]
                 
-                for s in range(solver.max_steps):
+                for s in range(solver.vehicle_steps[v]):
                     is_intermediate = m.NewBoolVar(f'inter_{v}_{ship_idx}_{s}')
                     
                     # s > visit_step[p_stop]
@@ -65,3 +68,28 @@ class FlowConstraints:
                     # Constraint: Intermediate steps cannot be end depot
                     # (Going back to depot while carrying would unload prematurely)
                     m.Add(route[v, s] != end_depot).OnlyEnforceIf(is_intermediate)
+
+    @staticmethod
+    def _apply_circuit(solver: VRPSolver):
+        """Pickup-delivery pairing on arc literals.
+        
+        Depot visits in between are impossible: the end depot closes the circuit.
+        """
+        m = solver.model
+        data = solver.data
+        cars = solver.variables
+        
+        visits = cars['visits']
+        visit_step = cars['visit_step']
+        is_served = cars['is_served']
+        
+        for ship_idx, ship in enumerate(data.shipments):
+            p_stop = solver.shipment_pickup_stop[ship_idx]
+            d_stop = solver.shipment_delivery_stop[ship_idx]
+            
+            # 1. Precedence: Pickup before Delivery
+            m.Add(visit_step[p_stop] < visit_step[d_stop]).OnlyEnforceIf(is_served[ship_idx])
+            
+            # 2. Same Vehicle
+            for v in range(solver.num_vehicles):
+                m.Add(visits[v, p_stop] == visits[v, d_stop])
@@ -6,18 +6,34 @@ Handles:
 - Crowded vehicle penalty (load > 70% capacity)
 """
 from vrp_solver.ortools_solver.wrapper import VRPSolver
+from vrp_solver.logic.rehandling import (
+    REHANDLING_COST_BASIC, REHANDLING_COST_CROWDED, crowded_threshold
+)
+
+
+REHANDLING_MODES = ('exact', 'compact', 'post_eval')
 
 
 class LifoConstraints:
     @staticmethod
     def apply(solver: VRPSolver):
+        mode = solver.config.rehandling_mode
+        if mode not in REHANDLING_MODES:
+            raise ValueError(
+                f"Unknown rehandling mode '{mode}' (expected one of {list(REHANDLING_MODES)})"
+            )
+        if mode == 'post_eval':
+            return  # Evaluated on the solution (logic.rehandling), not optimized
+        if mode == 'compact':
+            return LifoConstraints._apply_compact(solver)
+        
         m = solver.model
         data = solver.data
         cars = solver.variables
         
         visit_step = cars['visit_step']
         visit_vehicle = cars['visit_vehicle']
-        load_v = cars['load_v']
+        load_v = cars.get('load_v')
         is_served = cars['is_served']
         
         num_ships = solver.num_shipments
@@ -29,7 +45,7 @@ class LifoConstraints:
             # Threshold: 70% of capacity volume
             # SCALE for float support
             scale = solver.config.capacity_scale_factor
-            thresh_val = int(veh_data.profile.capacity.volume * scale * 0.7)
+            thresh_val = crowded_threshold(veh_data.profile.capacity.volume, scale)
             
             for curr_idx in range(num_ships):
                 p_curr_stop = solver.shipment_pickup_stop[curr_idx]
@@ -43,14 +59,18 @@ class LifoConstraints:
                 m.Add(visit_vehicle[p_curr_stop] != v + 1).OnlyEnforceIf(served_by_v.Not())
                 
                 # 2. Load at delivery moment
-                load_at_drop = m.NewIntVar(0, 2000, f'lad_{v}_{curr_idx}')
+                load_at_drop = m.NewIntVar(0, solver.bounds.vehicles[v].cap_v, f'lad_{v}_{curr_idx}')
                 
-                for s in range(solver.max_steps):
-                    is_drop_step = m.NewBoolVar(f'ids_{v}_{curr_idx}_{s}')
-                    m.Add(visit_step[d_curr_stop] == s).OnlyEnforceIf(is_drop_step)
-                    m.Add(visit_step[d_curr_stop] != s).OnlyEnforceIf(is_drop_step.Not())
-                    
-                    m.Add(load_at_drop == load_v[v, s]).OnlyEnforceIf([served_by_v, is_drop_step])
+                if solver.backend == 'circuit':
+                    # Load is stored per stop: no step scan needed
+                    m.Add(load_at_drop == cars['stop_load_v'][d_curr_stop]).OnlyEnforceIf(served_by_v)
+                else:
+                    for s in range(solver.vehicle_steps[v]):
+                        is_drop_step = m.NewBoolVar(f'ids_{v}_{curr_idx}_{s}')
+                        m.Add(visit_step[d_curr_stop] == s).OnlyEnforceIf(is_drop_step)
+                        m.Add(visit_step[d_curr_stop] != s).OnlyEnforceIf(is_drop_step.Not())
+                        
+                        m.Add(load_at_drop == load_v[v, s]).OnlyEnforceIf([served_by_v, is_drop_step])
                 
                 # 3. Crowded check
                 is_crowded = m.NewBoolVar(f'iic_{v}_{curr_idx}')
@@ -97,16 +117,133 @@ class LifoConstraints:
                     m.AddBoolAnd([served_by_v, other_by_v, la, ua, pr, is_crowded.Not()]).OnlyEnforceIf(blk_basic)
                     m.AddBoolOr([served_by_v.Not(), other_by_v.Not(), la.Not(), ua.Not(), pr.Not(), is_crowded]).OnlyEnforceIf(blk_basic.Not())
                     
-                    cost_crowded = vol_other_scaled * 50
-                    cost_basic = vol_other_scaled * 10
+                    cost_crowded = vol_other_scaled * REHANDLING_COST_CROWDED
+                    cost_basic = vol_other_scaled * REHANDLING_COST_BASIC
                     
-                    term = m.NewIntVar(0, 100000, f'rhT_{v}_{curr_idx}_{other_idx}')
+                    term = m.NewIntVar(0, cost_crowded, f'rhT_{v}_{curr_idx}_{other_idx}')
                     m.Add(term == cost_crowded).OnlyEnforceIf(blk_crowded)
                     m.Add(term == cost_basic).OnlyEnforceIf(blk_basic)
                     m.Add(term == 0).OnlyEnforceIf([blk_crowded.Not(), blk_basic.Not()])
                     
                     rehand_terms.append(term)
         
-        c_rehandling = m.NewIntVar(0, 1000000, 'c_rehandling')
+        c_rehandling = m.NewIntVar(0, solver.bounds.rehandling, 'c_rehandling')
+        m.Add(c_rehandling == sum(rehand_terms))
+        cars['c_rehandling'] = c_rehandling
+
+    @staticmethod
+    def _apply_compact(solver: VRPSolver):
+        """
+        Same cost as the exact encoding, without the vehicle x step scan.
+        
+        Per shipment: one load-at-delivery lookup and a crowded flag.
+        Per shipment pair: one "same vehicle" literal and pickup/delivery
+        precedence literals on visit_step, shared by all vehicles.
+        """
+        m = solver.model
+        data = solver.data
+        cars = solver.variables
+        
+        visit_step = cars['visit_step']
+        visit_vehicle = cars['visit_vehicle']
+        is_served = cars['is_served']
+        
+        num_ships = solver.num_shipments
+        scale = solver.config.capacity_scale_factor
+        
+        # ==============================
+        # 1. Crowded at delivery (per shipment)
+        # ==============================
+        # Threshold of the serving vehicle (visit_vehicle is 1-indexed, 0 = unserved)
+        thresholds = [0] + [
+            crowded_threshold(veh.profile.capacity.volume, scale) for veh in data.vehicles
+        ]
+        
+        if solver.backend != 'circuit':
+            # All (vehicle, step) loads, indexed (vehicle - 1) * max_steps + step
+            max_s = solver.max_steps
+            max_cap_v = solver.bounds.max_cap_v
+            step_loads = []
+            for v in range(solver.num_vehicles):
+                for s in range(max_s):
+                    step_loads.append(cars['load_v'][v, s] if s < solver.vehicle_steps[v] else 0)
+        
+        is_crowded = {}
+        for ship_idx in range(num_ships):
+            p_stop = solver.shipment_pickup_stop[ship_idx]
+            d_stop = solver.shipment_delivery_stop[ship_idx]
+            
+            if solver.backend == 'circuit':
+                load_at_drop = cars['stop_load_v'][d_stop]
+            else:
+                load_idx = m.NewIntVar(0, len(step_loads) - 1, f'ldi_{ship_idx}')
+                m.Add(load_idx == (visit_vehicle[p_stop] - 1) * max_s + visit_step[d_stop]).OnlyEnforceIf(is_served[ship_idx])
+                load_at_drop = m.NewIntVar(0, max_cap_v, f'lad_{ship_idx}')
+                m.AddElement(load_idx, step_loads, load_at_drop)
+            
+            thresh = m.NewIntVar(0, max(thresholds), f'cth_{ship_idx}')
+            m.AddElement(visit_vehicle[p_stop], thresholds, thresh)
+            
+            is_crowded[ship_idx] = m.NewBoolVar(f'iic_{ship_idx}')
+            m.Add(load_at_drop >= thresh).OnlyEnforceIf(is_crowded[ship_idx])
+            m.Add(load_at_drop < thresh).OnlyEnforceIf(is_crowded[ship_idx].Not())
+        
+        # ==============================
+        # 2. Blocking pairs
+        # ==============================
+        # other blocks curr if: same vehicle and p_curr < p_other < d_curr < d_other
+        rehand_terms = []
+        for a in range(num_ships):
+            for b in range(a + 1, num_ships):
+                # Skip pairs no vehicle can carry together
+                if not any(a in ships and b in ships for ships in solver.compatible_shipments.values()):
+                    continue
+                
+                p_a, d_a = solver.shipment_pickup_stop[a], solver.shipment_delivery_stop[a]
+                p_b, d_b = solver.shipment_pickup_stop[b], solver.shipment_delivery_stop[b]
+                
+                # Same vehicle (and served)
+                same = m.NewBoolVar(f'same_{a}_{b}')
+                m.Add(visit_vehicle[p_a] == visit_vehicle[p_b]).OnlyEnforceIf(same)
+                m.AddImplication(same, is_served[a])
+                m.Add(visit_vehicle[p_a] != visit_vehicle[p_b]).OnlyEnforceIf([same.Not(), is_served[a]])
+                
+                # a picked up first / a delivered first
+                pick_first = m.NewBoolVar(f'pf_{a}_{b}')
+                m.Add(visit_step[p_a] < visit_step[p_b]).OnlyEnforceIf(pick_first)
+                m.Add(visit_step[p_a] >= visit_step[p_b]).OnlyEnforceIf(pick_first.Not())
+                
+                drop_first = m.NewBoolVar(f'df_{a}_{b}')
+                m.Add(visit_step[d_a] < visit_step[d_b]).OnlyEnforceIf(drop_first)
+                m.Add(visit_step[d_a] >= visit_step[d_b]).OnlyEnforceIf(drop_first.Not())
+                
+                # (curr, other, curr picked first, curr delivered first)
+                for curr, other, p_first, d_first in (
+                    (a, b, pick_first, drop_first),
+                    (b, a, pick_first.Not(), drop_first.Not()),
+                ):
+                    p_other = solver.shipment_pickup_stop[other]
+                    d_curr = solver.shipment_delivery_stop[curr]
+                    
+                    # Other picked up before curr is delivered (overlap)
+                    overlap = m.NewBoolVar(f'ov_{curr}_{other}')
+                    m.Add(visit_step[p_other] < visit_step[d_curr]).OnlyEnforceIf(overlap)
+                    m.Add(visit_step[p_other] >= visit_step[d_curr]).OnlyEnforceIf(overlap.Not())
+                    
+                    blk = m.NewBoolVar(f'blk_{curr}_{other}')
+                    m.AddBoolAnd([same, p_first, d_first, overlap]).OnlyEnforceIf(blk)
+                    m.AddBoolOr([same.Not(), p_first.Not(), d_first.Not(), overlap.Not()]).OnlyEnforceIf(blk.Not())
+                    
+                    blk_crowded = m.NewBoolVar(f'blkc_{curr}_{other}')
+                    m.AddBoolAnd([blk, is_crowded[curr]]).OnlyEnforceIf(blk_crowded)
+                    m.AddBoolOr([blk.Not(), is_crowded[curr].Not()]).OnlyEnforceIf(blk_crowded.Not())
+                    
+                    vol_other_scaled = int(data.shipments[other].cargo.volume * scale)
+                    rehand_terms.append(vol_other_scaled * REHANDLING_COST_BASIC * blk)
+                    rehand_terms.append(
+                        vol_other_scaled * (REHANDLING_COST_CROWDED - REHANDLING_COST_BASIC) * blk_crowded
+                    )
+        
+        c_rehandling = m.NewIntVar(0, solver.bounds.rehandling, 'c_rehandling')
         m.Add(c_rehandling == sum(rehand_terms))
         cars['c_rehandling'] = c_rehandling
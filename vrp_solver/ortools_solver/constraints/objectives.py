@@ -3,7 +3,7 @@ Objective Constraints for Stop-based VRP.
 
 Handles all cost components:
 - Fixed cost (vehicle usage)
-- Distance cost (with load penalty)
+- Distance cost (with load penalty; linear or exact-product encoding)
 - Labor cost (regular + overtime)
 - Unserved penalty (per shipment)
 - Zone crossing penalty
@@ -11,18 +11,32 @@ Handles all cost components:
 - Late penalty
 - Rehandling cost (from LIFO)
 """
+from ortools.sat.python import cp_model
 from vrp_solver.ortools_solver.wrapper import VRPSolver
+from vrp_solver.logic.bounds import check_bound
+
+
+# Distance cost encodings: carried distance per shipment or load x leg products
+LOAD_COST_MODES = ('linear', 'product')
 
 
 class ObjectiveConstraints:
     @staticmethod
     def apply(solver: VRPSolver):
+        mode = solver.config.load_cost_mode
+        if mode not in LOAD_COST_MODES:
+            raise ValueError(
+                f"Unknown load cost mode '{mode}' (expected one of {list(LOAD_COST_MODES)})"
+            )
+        if solver.backend == 'circuit':
+            return ObjectiveConstraints._apply_circuit(solver)
+        
         m = solver.model
         data = solver.data
         cars = solver.variables
         
         num_v = solver.num_vehicles
-        max_s = solver.max_steps
+        steps = solver.vehicle_steps  # Per-vehicle horizon
         num_loc = solver.num_locations
         num_ships = solver.num_shipments
         
@@ -34,131 +48,82 @@ class ObjectiveConstraints:
         load_w = cars['load_w']
         is_served = cars['is_served']
         
-        # Matrix Helpers
-        flat_dist = [d for row in data.travel_dist_matrix for d in row]
-        flat_time = [t for row in data.travel_time_matrix for t in row]
-        
         penalties = data.penalties
         
         # =====================
         # 1. Fixed Cost
         # =====================
-        c_fixed = m.NewIntVar(0, 1000000, 'c_fixed')
-        m.Add(c_fixed == sum(is_used[v] * data.vehicles[v].cost.fixed for v in range(num_v)))
-        cars['c_fixed'] = c_fixed
+        c_fixed = ObjectiveConstraints._add_fixed_cost(solver)
         
         # =====================
         # 2. Distance Cost
         # =====================
-        c_dist = m.NewIntVar(0, 10000000, 'c_dist')
-        dist_terms = []
-        
-        for v in range(num_v):
-            veh_cost = data.vehicles[v].cost
+        bounds = solver.bounds
+        if solver.config.load_cost_mode == 'linear':
+            ObjectiveConstraints._add_linear_distance_cost(solver)
+        else:
+            c_dist = m.NewIntVar(0, bounds.distance, 'c_dist')
+            dist_terms = []
             
-            for s in range(max_s - 1):
-                # Active edge check
-                act_edge = m.NewBoolVar(f'ae_{v}_{s}')
-                c1 = is_done[v, s+1].Not()
-                c2 = m.NewBoolVar(f'ls_{v}_{s}')
-                m.AddBoolAnd([is_done[v, s+1], is_done[v, s].Not()]).OnlyEnforceIf(c2)
-                m.AddBoolOr([is_done[v, s+1].Not(), is_done[v, s]]).OnlyEnforceIf(c2.Not())
-                m.AddBoolOr([c1, c2]).OnlyEnforceIf(act_edge)
-                m.AddBoolAnd([c1.Not(), c2.Not()]).OnlyEnforceIf(act_edge.Not())
-                
-                # Use route_location for distance lookup
-                curr_loc = route_location[v, s]
-                next_loc = route_location[v, s+1]
-                
-                idx = m.NewIntVar(0, num_loc**2 - 1, f'di_{v}_{s}')
-                m.Add(idx == curr_loc * num_loc + next_loc)
-                
-                d_val = m.NewIntVar(0, 1000, f'dist_{v}_{s}')
-                m.AddElement(idx, flat_dist, d_val)
-                
-                w_pen = m.NewIntVar(0, 100000, f'wp_{v}_{s}')
-                m.Add(w_pen == load_w[v, s] * veh_cost.per_kg_km)
-                
-                rate = m.NewIntVar(0, 100000, f'rate_{v}_{s}')
-                m.Add(rate == veh_cost.per_km + w_pen)
+            for v in range(num_v):
+                veh_cost = data.vehicles[v].cost
+                vb = bounds.vehicles[v]
                 
-                s_cost = m.NewIntVar(0, 1000000, f'sc_{v}_{s}')
-                m.AddMultiplicationEquality(s_cost, [d_val, rate])
-                
-                term = m.NewIntVar(0, 1000000, f'dterm_{v}_{s}')
-                m.Add(term == s_cost).OnlyEnforceIf(act_edge)
-                m.Add(term == 0).OnlyEnforceIf(act_edge.Not())
-                dist_terms.append(term)
-                
-        m.Add(c_dist == sum(dist_terms))
-        cars['c_dist'] = c_dist
+                for s in range(steps[v] - 1):
+                    # Active edge check
+                    act_edge = m.NewBoolVar(f'ae_{v}_{s}')
+                    c1 = is_done[v, s+1].Not()
+                    c2 = m.NewBoolVar(f'ls_{v}_{s}')
+                    m.AddBoolAnd([is_done[v, s+1], is_done[v, s].Not()]).OnlyEnforceIf(c2)
+                    m.AddBoolOr([is_done[v, s+1].Not(), is_done[v, s]]).OnlyEnforceIf(c2.Not())
+                    m.AddBoolOr([c1, c2]).OnlyEnforceIf(act_edge)
+                    m.AddBoolAnd([c1.Not(), c2.Not()]).OnlyEnforceIf(act_edge.Not())
+                    
+                    # Distance from the shared arc lookup
+                    d_val = solver.arc_lookup(v, s).dist
+                    
+                    w_pen = m.NewIntVar(0, vb.cap_w * veh_cost.per_kg_km, f'wp_{v}_{s}')
+                    m.Add(w_pen == load_w[v, s] * veh_cost.per_kg_km)
+                    
+                    rate = m.NewIntVar(veh_cost.per_km, veh_cost.per_km + vb.cap_w * veh_cost.per_kg_km, f'rate_{v}_{s}')
+                    m.Add(rate == veh_cost.per_km + w_pen)
+                    
+                    s_cost = m.NewIntVar(0, vb.leg_cost, f'sc_{v}_{s}')
+                    m.AddMultiplicationEquality(s_cost, [d_val, rate])
+                    
+                    term = m.NewIntVar(0, vb.leg_cost, f'dterm_{v}_{s}')
+                    m.Add(term == s_cost).OnlyEnforceIf(act_edge)
+                    m.Add(term == 0).OnlyEnforceIf(act_edge.Not())
+                    dist_terms.append(term)
+                    
+            m.Add(c_dist == sum(dist_terms))
+            cars['c_dist'] = c_dist
         
         # =====================
         # 3. Labor Cost (Overtime)
         # =====================
-        c_time = m.NewIntVar(0, 1000000, 'c_time')
-        time_terms = []
-        
+        work_end = {}
         for v in range(num_v):
-            veh = data.vehicles[v]
-            labor = veh.labor
-            shift = labor.shift
-            labor_cost = labor.cost
-            
-            max_arr = m.NewIntVar(0, 10000, f'ma_{v}')
-            m.AddMaxEquality(max_arr, [arrival_time[v, s] for s in range(max_s)])
-            
-            tot_work = m.NewIntVar(0, 10000, f'tw_{v}')
-            m.Add(tot_work == max_arr - shift.start_time)
-            
-            reg = m.NewIntVar(0, shift.standard_duration, f'reg_{v}')
-            m.AddMinEquality(reg, [tot_work, shift.standard_duration])
-            
-            diff = m.NewIntVar(-10000, 10000, f'df_{v}')
-            m.Add(diff == tot_work - shift.standard_duration)
-            over = m.NewIntVar(0, 10000, f'ov_{v}')
-            m.AddMaxEquality(over, [diff, 0])
-            
-            c_r = m.NewIntVar(0, 1000000, f'calc_r_{v}')
-            m.Add(c_r == reg * labor_cost.regular_rate)
-            
-            c_o = m.NewIntVar(0, 1000000, f'calc_o_{v}')
-            over_rate = int(labor_cost.regular_rate * labor_cost.overtime_multiplier)
-            m.Add(c_o == over * over_rate)
-            
-            t_term = m.NewIntVar(0, 1000000, f'tt_{v}')
-            m.Add(t_term == c_r + c_o)
-            time_terms.append(t_term)
-            
-        m.Add(c_time == sum(time_terms))
-        cars['c_time'] = c_time
-
+            vb = bounds.vehicles[v]
+            max_arr = m.NewIntVar(vb.start, vb.horizon, f'ma_{v}')
+            m.AddMaxEquality(max_arr, [arrival_time[v, s] for s in range(steps[v])])
+            work_end[v] = max_arr
+        c_time = ObjectiveConstraints._add_labor_cost(solver, work_end)
+        
         # =====================
         # 4. Unserved Penalty (per Shipment!)
         # =====================
-        c_penalty = m.NewIntVar(0, 10000000, 'c_penalty')
-        pen_terms = []
-        
-        for ship_idx in range(num_ships):
-            ship = data.shipments[ship_idx]
-            ns = m.NewIntVar(0, 1, f'ns_{ship_idx}')
-            m.Add(ns == 1 - is_served[ship_idx])
-            pt = m.NewIntVar(0, ship.unserved_penalty, f'pt_{ship_idx}')
-            m.Add(pt == ns * ship.unserved_penalty)
-            pen_terms.append(pt)
-            
-        m.Add(c_penalty == sum(pen_terms))
-        cars['c_penalty'] = c_penalty
+        c_penalty = ObjectiveConstraints._add_unserved_penalty(solver)
         
         # =====================
         # 5. Zone Crossing Penalty
         # =====================
-        c_zone = m.NewIntVar(0, 1000000, 'c_zone')
+        c_zone = m.NewIntVar(0, bounds.zone, 'c_zone')
         z_terms = []
         stop_zones = solver.stop_zone  # Pre-computed: stop_id -> zone_id
         
         for v in range(num_v):
-            for s in range(max_s - 1):
+            for s in range(steps[v] - 1):
                 act_edge = m.NewBoolVar(f'za_{v}_{s}')
                 c1 = is_done[v, s+1].Not()
                 c2 = m.NewBoolVar(f'zl_{v}_{s}')
@@ -170,9 +135,9 @@ class ObjectiveConstraints:
                 curr_stop = route[v, s]
                 next_stop = route[v, s+1]
                 
-                zc = m.NewIntVar(0, 10, f'zc_{v}_{s}')
+                zc = m.NewIntVar(0, bounds.max_zone, f'zc_{v}_{s}')
                 m.AddElement(curr_stop, stop_zones, zc)
-                zn = m.NewIntVar(0, 10, f'zn_{v}_{s}')
+                zn = m.NewIntVar(0, bounds.max_zone, f'zn_{v}_{s}')
                 m.AddElement(next_stop, stop_zones, zn)
                 
                 # Check not at depot (zone 0)
@@ -202,56 +167,36 @@ class ObjectiveConstraints:
         # =====================
         # 6. Waiting Cost
         # =====================
-        c_waiting = m.NewIntVar(0, 1000000, 'c_waiting')
+        c_waiting = m.NewIntVar(0, bounds.waiting, 'c_waiting')
         wait_terms = []
         
-        # Build stop_ready from Shipment TimeWindows
-        stop_ready = []
-        for stop in data.stops:
-            if stop.is_depot:
-                stop_ready.append(0)  # Depot has no waiting constraint
-            elif stop.is_pickup:
-                ship = data.shipments[stop.shipment_idx]
-                stop_ready.append(ship.pickup_window.start if ship.pickup_window else 0)
-            elif stop.is_delivery:
-                ship = data.shipments[stop.shipment_idx]
-                stop_ready.append(ship.delivery_window.start if ship.delivery_window else 0)
-            else:
-                stop_ready.append(0)
-        
-        stop_service = solver.stop_service_duration
+        # stop_id -> shipment window start (0 at depots), from the evaluator
+        stop_ready = solver.evaluator.ready
         
         for v in range(num_v):
             veh_cost = data.vehicles[v].cost
+            vb = bounds.vehicles[v]
+            earliest_max = vb.horizon + bounds.max_service + bounds.max_drive
             
-            for s in range(max_s - 1):
-                curr_loc = route_location[v, s]
-                next_loc = route_location[v, s+1]
-                
-                idx = m.NewIntVar(0, num_loc**2 - 1, f'widx_{v}_{s}')
-                m.Add(idx == curr_loc * num_loc + next_loc)
-                
-                drive_t = m.NewIntVar(0, 1000, f'wdt_{v}_{s}')
-                m.AddElement(idx, flat_time, drive_t)
-                
-                curr_stop = route[v, s]
-                service_t = m.NewIntVar(0, 1000, f'wst_{v}_{s}')
-                m.AddElement(curr_stop, stop_service, service_t)
+            for s in range(steps[v] - 1):
+                leg = solver.arc_lookup(v, s)
+                drive_t = leg.drive
+                service_t = leg.service
                 
                 next_stop = route[v, s+1]
-                ready_next = m.NewIntVar(0, 10000, f'wrn_{v}_{s}')
+                ready_next = m.NewIntVar(0, bounds.max_ready, f'wrn_{v}_{s}')
                 m.AddElement(next_stop, stop_ready, ready_next)
                 
-                earliest_simple = m.NewIntVar(0, 10000, f'es_{v}_{s}')
+                earliest_simple = m.NewIntVar(vb.start, earliest_max, f'es_{v}_{s}')
                 m.Add(earliest_simple == arrival_time[v, s] + service_t + drive_t)
                 
-                wait_gap = m.NewIntVar(-10000, 10000, f'wg_{v}_{s}')
+                wait_gap = m.NewIntVar(-earliest_max, bounds.max_ready - vb.start, f'wg_{v}_{s}')
                 m.Add(wait_gap == ready_next - earliest_simple)
                 
-                wait_val = m.NewIntVar(0, 10000, f'wv_{v}_{s}')
+                wait_val = m.NewIntVar(0, vb.max_wait, f'wv_{v}_{s}')
                 m.AddMaxEquality(wait_val, [wait_gap, 0])
                 
-                term = m.NewIntVar(0, 100000, f'wc_{v}_{s}')
+                term = m.NewIntVar(0, vb.max_wait * veh_cost.per_wait_minute, f'wc_{v}_{s}')
                 m.Add(term == wait_val * veh_cost.per_wait_minute).OnlyEnforceIf(is_done[v, s+1].Not())
                 m.Add(term == 0).OnlyEnforceIf(is_done[v, s+1])
                 wait_terms.append(term)
@@ -260,21 +205,386 @@ class ObjectiveConstraints:
         cars['c_waiting'] = c_waiting
         
         # =====================
-        # 7. Late Penalty
+        # 7-8. Late Penalty, Total Cost & Minimize
         # =====================
-        c_late = m.NewIntVar(0, 10000000, 'c_late')
-        if 'late_flags' in cars:
+        ObjectiveConstraints._add_total_cost(solver)
+    
+    # =====================
+    # Shared Cost Components
+    # =====================
+    
+    @staticmethod
+    def _add_fixed_cost(solver: VRPSolver):
+        m = solver.model
+        data = solver.data
+        cars = solver.variables
+        is_used = cars['is_used']
+        
+        c_fixed = m.NewIntVar(0, solver.bounds.fixed, 'c_fixed')
+        m.Add(c_fixed == sum(is_used[v] * data.vehicles[v].cost.fixed for v in range(solver.num_vehicles)))
+        cars['c_fixed'] = c_fixed
+        return c_fixed
+    
+    @staticmethod
+    def _add_labor_cost(solver: VRPSolver, work_end):
+        """Regular + overtime labor cost from each vehicle's last arrival."""
+        m = solver.model
+        data = solver.data
+        cars = solver.variables
+        
+        c_time = m.NewIntVar(0, solver.bounds.labor, 'c_time')
+        time_terms = []
+        
+        for v in range(solver.num_vehicles):
+            veh = data.vehicles[v]
+            labor = veh.labor
+            shift = labor.shift
+            labor_cost = labor.cost
+            vb = solver.bounds.vehicles[v]
+            
+            tot_work = m.NewIntVar(0, shift.max_duration, f'tw_{v}')
+            m.Add(tot_work == work_end[v] - shift.start_time)
+            
+            reg = m.NewIntVar(0, shift.standard_duration, f'reg_{v}')
+            m.AddMinEquality(reg, [tot_work, shift.standard_duration])
+            
+            diff = m.NewIntVar(-shift.standard_duration, vb.overtime, f'df_{v}')
+            m.Add(diff == tot_work - shift.standard_duration)
+            over = m.NewIntVar(0, vb.overtime, f'ov_{v}')
+            m.AddMaxEquality(over, [diff, 0])
+            
+            c_r = m.NewIntVar(0, shift.standard_duration * labor_cost.regular_rate, f'calc_r_{v}')
+            m.Add(c_r == reg * labor_cost.regular_rate)
+            
+            over_rate = int(labor_cost.regular_rate * labor_cost.overtime_multiplier)
+            c_o = m.NewIntVar(0, vb.overtime * over_rate, f'calc_o_{v}')
+            m.Add(c_o == over * over_rate)
+            
+            t_term = m.NewIntVar(0, vb.labor, f'tt_{v}')
+            m.Add(t_term == c_r + c_o)
+            time_terms.append(t_term)
+        
+        m.Add(c_time == sum(time_terms))
+        cars['c_time'] = c_time
+        return c_time
+    
+    @staticmethod
+    def _add_linear_distance_cost(solver: VRPSolver):
+        """
+        Distance cost without per-leg products (load_cost_mode='linear').
+        
+        A leg is charged with the load on arrival at its start, so a
+        shipment pays for the legs leaving the stops after its pickup up to
+        and including its delivery: the cumulative distance at the step
+        after the delivery minus the one at the step after the pickup.
+        With per-vehicle route distances this gives the exact cost of the
+        product encoding as a linear expression.
+        """
+        m = solver.model
+        data = solver.data
+        cars = solver.variables
+        bounds = solver.bounds
+        is_done = cars['is_done']
+        steps = solver.vehicle_steps
+        
+        # cum_dist[v, s] = distance driven before arriving at step s
+        cum_dist = {}
+        for v in range(solver.num_vehicles):
+            cum_dist[v, 0] = m.NewConstant(0)
+            for s in range(steps[v] - 1):
+                cum_dist[v, s+1] = m.NewIntVar(0, bounds.max_route_dist, f'cd_{v}_{s+1}')
+                m.Add(cum_dist[v, s+1] == cum_dist[v, s] + solver.arc_lookup(v, s).dist).OnlyEnforceIf(
+                    is_done[v, s].Not()
+                )
+                m.Add(cum_dist[v, s+1] == cum_dist[v, s]).OnlyEnforceIf(is_done[v, s])
+        
+        # Cumulative distance when leaving each shipment stop (0 if not visited)
+        departed = {}
+        for stop in data.shipment_stops:
+            departed[stop.id] = m.NewIntVar(0, bounds.max_route_dist, f'cdep_{stop.id}')
+            m.Add(departed[stop.id] == 0).OnlyEnforceIf(cars['is_stop_active'][stop.id].Not())
+            for v in range(solver.num_vehicles):
+                for s in range(steps[v] - 1):
+                    if stop.id in solver.step_domains[v][s]:
+                        m.Add(departed[stop.id] == cum_dist[v, s+1]).OnlyEnforceIf(
+                            solver.active_visit_lit(v, s, stop.id)
+                        )
+        
+        def served_by(v, ship_idx):
+            lit = m.NewBoolVar(f'kgv_{v}_{ship_idx}')
+            p_stop = solver.shipment_pickup_stop[ship_idx]
+            m.Add(cars['visit_vehicle'][p_stop] == v + 1).OnlyEnforceIf(lit)
+            m.Add(cars['visit_vehicle'][p_stop] != v + 1).OnlyEnforceIf(lit.Not())
+            return lit
+        
+        # per_km part: route length per vehicle
+        km_cost = sum(
+            data.vehicles[v].cost.per_km * cum_dist[v, steps[v] - 1] for v in range(solver.num_vehicles)
+        )
+        kg_cost = ObjectiveConstraints._carried_load_cost(solver, departed, served_by)
+        
+        c_dist = m.NewIntVar(0, bounds.distance, 'c_dist')
+        m.Add(c_dist == km_cost + kg_cost)
+        cars['c_dist'] = c_dist
+        return c_dist
+    
+    @staticmethod
+    def _carried_load_cost(solver: VRPSolver, departed, served_by):
+        """
+        per_kg_km cost as weight x distance carried, per shipment.
+        
+        departed[stop_id] is the cumulative route distance when leaving the
+        stop; served_by(v, ship_idx) returns the literal "shipment on
+        vehicle v" (only needed when per_kg_km differs between vehicles).
+        """
+        m = solver.model
+        data = solver.data
+        bounds = solver.bounds
+        scale = solver.config.capacity_scale_factor
+        rates = sorted({veh.cost.per_kg_km for veh in data.vehicles})
+        
+        terms = []
+        for ship_idx, ship in enumerate(data.shipments):
+            weight = int(ship.weight * scale)
+            if weight == 0 or rates == [0]:
+                continue
+            p_stop = solver.shipment_pickup_stop[ship_idx]
+            d_stop = solver.shipment_delivery_stop[ship_idx]
+            carried = departed[d_stop] - departed[p_stop]
+            
+            if len(rates) == 1:
+                terms.append(rates[0] * weight * carried)
+                continue
+            
+            # Rate of the vehicle that carries it
+            cost = m.NewIntVar(0, bounds.max_route_dist * weight * rates[-1], f'kgc_{ship_idx}')
+            m.Add(cost == 0).OnlyEnforceIf(solver.variables['is_served'][ship_idx].Not())
+            for v, veh in enumerate(data.vehicles):
+                m.Add(cost == veh.cost.per_kg_km * weight * carried).OnlyEnforceIf(served_by(v, ship_idx))
+            terms.append(cost)
+        return sum(terms)
+    
+    @staticmethod
+    def _add_unserved_penalty(solver: VRPSolver):
+        m = solver.model
+        data = solver.data
+        cars = solver.variables
+        is_served = cars['is_served']
+        
+        c_penalty = m.NewIntVar(0, solver.bounds.unserved, 'c_penalty')
+        pen_terms = []
+        
+        for ship_idx in range(solver.num_shipments):
+            ship = data.shipments[ship_idx]
+            ns = m.NewIntVar(0, 1, f'ns_{ship_idx}')
+            m.Add(ns == 1 - is_served[ship_idx])
+            pt = m.NewIntVar(0, ship.unserved_penalty, f'pt_{ship_idx}')
+            m.Add(pt == ns * ship.unserved_penalty)
+            pen_terms.append(pt)
+        
+        m.Add(c_penalty == sum(pen_terms))
+        cars['c_penalty'] = c_penalty
+        return c_penalty
+    
+    @staticmethod
+    def _add_total_cost(solver: VRPSolver):
+        """Late penalty, then the total cost objective over all components."""
+        m = solver.model
+        cars = solver.variables
+        penalties = solver.data.penalties
+        bounds = solver.bounds
+        
+        # =====================
+        # Late Penalty
+        # =====================
+        late_cap = check_bound('late_penalty', len(cars.get('late_flags', [])) * penalties.late_delivery)
+        c_late = m.NewIntVar(0, late_cap, 'c_late')
+        if cars.get('late_flags'):
             m.Add(c_late == sum(cars['late_flags']) * penalties.late_delivery)
         else:
             m.Add(c_late == 0)
         cars['c_late'] = c_late
         
         # =====================
-        # 8. Total Cost & Minimize
+        # Total Cost & Minimize
         # =====================
-        total_cost = m.NewIntVar(0, 100000000, 'total_cost')
         c_rehand = cars.get('c_rehandling', 0)
+        total_cap = check_bound('total_cost', (
+            bounds.fixed + bounds.distance + bounds.labor + bounds.unserved + bounds.zone
+            + bounds.waiting + late_cap + (bounds.rehandling if 'c_rehandling' in cars else 0)
+        ))
+        total_cost = m.NewIntVar(0, total_cap, 'total_cost')
         
-        m.Add(total_cost == c_fixed + c_dist + c_time + c_penalty + c_zone + c_waiting + c_late + c_rehand)
+        m.Add(total_cost == cars['c_fixed'] + cars['c_dist'] + cars['c_time'] + cars['c_penalty']
+              + cars['c_zone'] + cars['c_waiting'] + c_late + c_rehand)
         m.Minimize(total_cost)
         cars['total_cost'] = total_cost
+        return total_cost
+    
+    # =====================
+    # Circuit Backend
+    # =====================
+    
+    @staticmethod
+    def _apply_circuit(solver: VRPSolver):
+        """Arc-based costs: every leg attribute is a constant per arc literal."""
+        m = solver.model
+        data = solver.data
+        cars = solver.variables
+        
+        num_v = solver.num_vehicles
+        penalties = data.penalties
+        
+        arc = cars['arc']
+        visits = cars['visits']
+        stop_arrival = cars['stop_arrival']
+        stop_load_w = cars['stop_load_w']
+        is_stop_active = cars['is_stop_active']
+        
+        ship_stops = [stop.id for stop in data.shipment_stops]
+        stop_zones = solver.stop_zone
+        bounds = solver.bounds
+        max_kg_rate = max((veh.cost.per_kg_km for veh in data.vehicles), default=0)
+        
+        # =====================
+        # 1. Fixed Cost
+        # =====================
+        ObjectiveConstraints._add_fixed_cost(solver)
+        
+        # =====================
+        # 2. Distance Cost
+        # =====================
+        # per_km part is linear in the arc literals
+        km_lits, km_coefs = [], []
+        out_dist = {}  # out_dist[stop_id] = length of the leg leaving the stop
+        for stop_id in ship_stops:
+            out_dist[stop_id] = m.NewIntVar(0, bounds.max_dist, f'od_{stop_id}')
+            m.Add(out_dist[stop_id] == 0).OnlyEnforceIf(is_stop_active[stop_id].Not())
+        
+        for v in range(num_v):
+            veh_cost = data.vehicles[v].cost
+            for i, j in solver.arc_list[v]:
+                d = data.travel_dist_matrix[solver.stop_to_location[i], solver.stop_to_location[j]]
+                km_lits.append(arc[v, i, j])
+                km_coefs.append(d * veh_cost.per_km)
+                if i in out_dist:
+                    m.Add(out_dist[i] == d).OnlyEnforceIf(arc[v, i, j])
+        
+        if solver.config.load_cost_mode == 'linear':
+            # per_kg_km part: weight x distance carried, from the cumulative
+            # route distance on arrival (0 at the start depot and when inactive)
+            stop_cum = {}
+            for stop_id in ship_stops:
+                stop_cum[stop_id] = m.NewIntVar(0, bounds.max_route_dist, f'scd_{stop_id}')
+                m.Add(stop_cum[stop_id] == 0).OnlyEnforceIf(is_stop_active[stop_id].Not())
+            for v in range(num_v):
+                for i, j in solver.arc_list[v]:
+                    if j not in stop_cum:
+                        continue
+                    d = data.travel_dist_matrix[solver.stop_to_location[i], solver.stop_to_location[j]]
+                    prev = stop_cum[i] if i in stop_cum else 0
+                    m.Add(stop_cum[j] == prev + d).OnlyEnforceIf(arc[v, i, j])
+            
+            departed = {stop_id: stop_cum[stop_id] + out_dist[stop_id] for stop_id in ship_stops}
+            kg_cost = ObjectiveConstraints._carried_load_cost(
+                solver, departed, lambda v, ship_idx: visits[v, solver.shipment_pickup_stop[ship_idx]]
+            )
+        else:
+            # per_kg_km part: one product per stop (load on arrival x outgoing leg)
+            kg_terms = []
+            for stop_id in ship_stops:
+                load_dist = m.NewIntVar(0, bounds.max_dist * bounds.max_cap_w, f'ldist_{stop_id}')
+                m.AddMultiplicationEquality(load_dist, [out_dist[stop_id], stop_load_w[stop_id]])
+                
+                kg_term = m.NewIntVar(0, bounds.max_dist * bounds.max_cap_w * max_kg_rate, f'kgt_{stop_id}')
+                for v in range(num_v):
+                    rate = data.vehicles[v].cost.per_kg_km
+                    m.Add(kg_term == load_dist * rate).OnlyEnforceIf(visits[v, stop_id])
+                m.Add(kg_term == 0).OnlyEnforceIf(is_stop_active[stop_id].Not())
+                kg_terms.append(kg_term)
+            kg_cost = sum(kg_terms)
+        
+        c_dist = m.NewIntVar(0, bounds.distance, 'c_dist')
+        m.Add(c_dist == cp_model.LinearExpr.WeightedSum(km_lits, km_coefs) + kg_cost)
+        cars['c_dist'] = c_dist
+        
+        # =====================
+        # 3. Labor Cost (Overtime)
+        # =====================
+        # The end depot is the last arrival of every route
+        work_end = {v: stop_arrival[solver.vehicle_end_stop[v]] for v in range(num_v)}
+        ObjectiveConstraints._add_labor_cost(solver, work_end)
+        
+        # =====================
+        # 4. Unserved Penalty (per Shipment!)
+        # =====================
+        ObjectiveConstraints._add_unserved_penalty(solver)
+        
+        # =====================
+        # 5. Zone Crossing Penalty
+        # =====================
+        z_lits = []
+        for v in range(num_v):
+            for i, j in solver.arc_list[v]:
+                zc, zn = stop_zones[i], stop_zones[j]
+                if zc != 0 and zn != 0 and zc != zn:
+                    z_lits.append(arc[v, i, j])
+        
+        c_zone = m.NewIntVar(0, bounds.zone, 'c_zone')
+        m.Add(c_zone == penalties.zone_crossing * sum(z_lits))
+        cars['c_zone'] = c_zone
+        
+        # =====================
+        # 6. Waiting Cost
+        # =====================
+        # wait_cost[j] = rate * max(ready_j - (arrival at the predecessor + service + drive), 0),
+        # exact as in the step model: the active arc fixes the predecessor
+        wait_terms = []
+        wait_cost = {}
+        max_wait = max((vb.max_wait for vb in bounds.vehicles), default=0)
+        max_wait_cost = max(
+            (vb.max_wait * veh.cost.per_wait_minute for vb, veh in zip(bounds.vehicles, data.vehicles)),
+            default=0
+        )
+        start = min((vb.start for vb in bounds.vehicles), default=0)
+        max_leave = bounds.horizon + bounds.max_service + bounds.max_drive
+        
+        # stop_id -> shipment window start (0 at depots), from the evaluator
+        stop_ready = solver.evaluator.ready
+        
+        wait_from = {}  # wait_from[j] = arrival at the predecessor + its service + the drive to j
+        wait_min = {}   # wait_min[j] = minutes waited for ready_j
+        for stop_id in ship_stops:
+            wait_cost[stop_id] = m.NewIntVar(0, max_wait_cost, f'wc_{stop_id}')
+            wait_terms.append(wait_cost[stop_id])
+            m.Add(wait_cost[stop_id] == 0).OnlyEnforceIf(is_stop_active[stop_id].Not())
+            ready = stop_ready[stop_id]
+            if ready <= start:
+                m.Add(wait_cost[stop_id] == 0)  # Ready before any vehicle leaves
+                continue
+            wait_from[stop_id] = m.NewIntVar(start, max_leave, f'wf_{stop_id}')
+            wait_min[stop_id] = m.NewIntVar(0, max_wait, f'wm_{stop_id}')
+            m.AddMaxEquality(wait_min[stop_id], [ready - wait_from[stop_id], 0])
+        
+        for v in range(num_v):
+            veh_cost = data.vehicles[v].cost
+            for i, j in solver.arc_list[v]:
+                if j not in wait_from:
+                    continue
+                loc_i = solver.stop_to_location[i]
+                loc_j = solver.stop_to_location[j]
+                leg = solver.stop_service_duration[i] + data.travel_time_matrix[loc_i, loc_j]
+                m.Add(wait_from[j] == stop_arrival[i] + leg).OnlyEnforceIf(arc[v, i, j])
+            for stop_id in wait_min:
+                m.Add(
+                    wait_cost[stop_id] == veh_cost.per_wait_minute * wait_min[stop_id]
+                ).OnlyEnforceIf(cars['visits'][v, stop_id])
+        
+        c_waiting = m.NewIntVar(0, bounds.waiting, 'c_waiting')
+        m.Add(c_waiting == sum(wait_terms))
+        cars['c_waiting'] = c_waiting
+        
+        # =====================
+        # 7-8. Late Penalty, Total Cost & Minimize
+        # =====================
+        ObjectiveConstraints._add_total_cost(solver)
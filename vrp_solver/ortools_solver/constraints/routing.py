@@ -13,12 +13,15 @@ from vrp_solver.domain import StopType
 class RoutingConstraints:
     @staticmethod
     def apply(solver: VRPSolver):
+        if solver.backend == 'circuit':
+            return RoutingConstraints._apply_circuit(solver)
+        
         m = solver.model
         data = solver.data
         cars = solver.variables
         
         num_v = solver.num_vehicles
-        max_s = solver.max_steps
+        steps = solver.vehicle_steps  # Per-vehicle horizon
         num_stops = solver.num_stops
         
         route = cars['route']
@@ -39,36 +42,36 @@ class RoutingConstraints:
             m.Add(route[v, 0] == start_depot_stop)
             m.Add(is_done[v, 0] == False)
             
-            # Forbid re-visiting Start Depot at any later step
-            for s in range(1, max_s):
-                m.Add(route[v, s] != start_depot_stop)
+            # Start depot is never revisited and the last step is the end
+            # depot: both are already excluded/fixed by the step domains
             
             # Route continuity: once done, stay at end depot
-            for s in range(max_s - 1):
+            for s in range(steps[v] - 1):
                 # If done[s], then done[s+1]
                 m.AddImplication(is_done[v, s], is_done[v, s+1])
                 
                 # If done[s], route must be at end depot
-                m.Add(route[v, s] == end_depot_stop).OnlyEnforceIf(is_done[v, s])
+                m.AddImplication(is_done[v, s], solver.at_end_lit(v, s))
                 
                 # [Optimization] Forbid self-loops (consecutive same stops) while active
                 # This prevents "Waiting at Node" from appearing as separate steps in the output
                 m.Add(route[v, s] != route[v, s+1]).OnlyEnforceIf(is_done[v, s+1].Not())
+                
+                # Time-window infeasible transitions (precomputed arc filter)
+                forbidden = solver.forbidden_transitions(v, s)
+                if forbidden:
+                    m.AddForbiddenAssignments([route[v, s], route[v, s+1]], forbidden)
             
             # Last step must be done
-            m.Add(is_done[v, max_s - 1] == True)
+            m.Add(is_done[v, steps[v] - 1] == True)
         
         # ====================================================
         # 2. End depot detection: done[s+1] when reaching end depot
         # ====================================================
         for v in range(num_v):
-            end_depot_stop = solver.vehicle_end_stop[v]
-            
-            for s in range(max_s - 1):
-                # Create indicator: is current step at end depot?
-                at_end = m.NewBoolVar(f'at_end_{v}_{s}')
-                m.Add(route[v, s] == end_depot_stop).OnlyEnforceIf(at_end)
-                m.Add(route[v, s] != end_depot_stop).OnlyEnforceIf(at_end.Not())
+            for s in range(steps[v] - 1):
+                # Indicator: is current step at end depot? (shared registry)
+                at_end = solver.at_end_lit(v, s)
                 
                 # If at end depot and NOT already done, become done
                 m.AddImplication(at_end, is_done[v, s])
@@ -76,20 +79,9 @@ class RoutingConstraints:
         # ====================================================
         # 3. Restrict which stops each vehicle can visit
         # ====================================================
-        # Each vehicle can only visit:
-        # - Its own start/end depots
-        # - Any shipment stop (pickup/delivery)
-        for v in range(num_v):
-            other_depot_stops = []
-            for v2 in range(num_v):
-                if v2 != v:
-                    other_depot_stops.append(solver.vehicle_start_stop[v2])
-                    other_depot_stops.append(solver.vehicle_end_stop[v2])
-            
-            # Forbid visiting other vehicles' depots
-            for s in range(max_s):
-                for forbidden_stop in other_depot_stops:
-                    m.Add(route[v, s] != forbidden_stop)
+        # Done statically in solver.step_domains (own depots, tag and
+        # capacity compatibility, step position) and applied as the
+        # route[v, s] variable domains: no per-step != constraints here.
         
         # ====================================================
         # 4. Link Stop visits to route
@@ -102,19 +94,9 @@ class RoutingConstraints:
             visits_bools = []
             
             for v in range(num_v):
-                for s in range(max_s):
+                for s in range(steps[v]):
                     # Is route[v,s] == stop_id AND not done yet?
-                    is_this_stop = m.NewBoolVar(f'is_stop_{v}_{s}_{stop_id}')
-                    not_done = is_done[v, s].Not()
-                    
-                    m.Add(route[v, s] == stop_id).OnlyEnforceIf(is_this_stop)
-                    m.Add(route[v, s] != stop_id).OnlyEnforceIf(is_this_stop.Not())
-                    
-                    # Track this as a valid visit
-                    is_valid_visit = m.NewBoolVar(f'valid_{v}_{s}_{stop_id}')
-                    m.AddBoolAnd([is_this_stop, not_done]).OnlyEnforceIf(is_valid_visit)
-                    m.AddBoolOr([is_this_stop.Not(), not_done.Not()]).OnlyEnforceIf(is_valid_visit.Not())
-                    
+                    is_valid_visit = solver.active_visit_lit(v, s, stop_id)
                     visits_bools.append(is_valid_visit)
                     
                     # If this is a valid visit, record step and vehicle
@@ -156,3 +138,101 @@ class RoutingConstraints:
             # (meaning it visits at least one non-depot stop)
             m.Add(is_used[v] == 0).OnlyEnforceIf(is_done[v, 1])
             m.Add(is_used[v] == 1).OnlyEnforceIf(is_done[v, 1].Not())
+        
+        # ====================================================
+        # 7. Symmetry breaking (interchangeable vehicles)
+        # ====================================================
+        # Within a class: used vehicles come first, ordered by first stop
+        # (route[v, 1] is a pickup when used, and each pickup is visited once)
+        for members in solver.vehicle_classes:
+            for a, b in zip(members, members[1:]):
+                m.AddImplication(is_used[b], is_used[a])
+                m.Add(route[a, 1] < route[b, 1]).OnlyEnforceIf(is_used[b])
+
+    @staticmethod
+    def _apply_circuit(solver: VRPSolver):
+        """Successor-based routing: one AddCircuit per vehicle."""
+        m = solver.model
+        data = solver.data
+        cars = solver.variables
+        
+        num_v = solver.num_vehicles
+        
+        arc = cars['arc']
+        visits = cars['visits']
+        visit_step = cars['visit_step']
+        visit_vehicle = cars['visit_vehicle']
+        is_stop_active = cars['is_stop_active']
+        is_served = cars['is_served']
+        is_used = cars['is_used']
+        
+        ship_stops = [stop.id for stop in data.shipment_stops]
+        
+        # ====================================================
+        # 1. One circuit per vehicle (start -> ... -> end -> start)
+        # ====================================================
+        for v in range(num_v):
+            start_depot_stop = solver.vehicle_start_stop[v]
+            end_depot_stop = solver.vehicle_end_stop[v]
+            
+            # Local node numbering: 0 = start, 1 = end, 2.. = shipment stops
+            node = {start_depot_stop: 0, end_depot_stop: 1}
+            for k, stop_id in enumerate(ship_stops):
+                node[stop_id] = k + 2
+            
+            closing = m.NewConstant(1)
+            circuit_arcs = [(1, 0, closing)]
+            for i, j in solver.arc_list[v]:
+                circuit_arcs.append((node[i], node[j], arc[v, i, j]))
+            
+            # Self-loop = stop skipped by this vehicle
+            for stop_id in ship_stops:
+                n = node[stop_id]
+                circuit_arcs.append((n, n, visits[v, stop_id].Not()))
+            
+            m.AddCircuit(circuit_arcs)
+            
+            # Vehicle is used unless it drives straight to its end depot
+            m.Add(is_used[v] == 1 - arc[v, start_depot_stop, end_depot_stop])
+            
+            # Rank propagation along arcs (step index of the stop)
+            m.Add(visit_step[start_depot_stop] == 0)
+            for i, j in solver.arc_list[v]:
+                m.Add(visit_step[j] == visit_step[i] + 1).OnlyEnforceIf(arc[v, i, j])
+        
+        # ====================================================
+        # 2. Link Stop visits to vehicles
+        # ====================================================
+        for stop_id in ship_stops:
+            visits_bools = [visits[v, stop_id] for v in range(num_v)]
+            
+            # Each shipment stop is visited at most once
+            m.Add(sum(visits_bools) <= 1)
+            m.Add(sum(visits_bools) == is_stop_active[stop_id])
+            
+            # visit_vehicle is 1-indexed, 0 if not visited
+            m.Add(visit_vehicle[stop_id] == sum((v + 1) * visits[v, stop_id] for v in range(num_v)))
+            m.Add(visit_step[stop_id] == 0).OnlyEnforceIf(is_stop_active[stop_id].Not())
+        
+        # ====================================================
+        # 3. Link shipment service to stop activity
+        # ====================================================
+        for ship_idx in range(solver.num_shipments):
+            p_stop = solver.shipment_pickup_stop[ship_idx]
+            d_stop = solver.shipment_delivery_stop[ship_idx]
+            
+            m.Add(is_served[ship_idx] == is_stop_active[p_stop])
+            m.Add(is_stop_active[p_stop] == is_stop_active[d_stop])
+        
+        # ====================================================
+        # 4. Symmetry breaking (interchangeable vehicles)
+        # ====================================================
+        # Within a class: used vehicles come first, ordered by first pickup
+        first_stop = {}
+        for members in solver.vehicle_classes:
+            for v in members:
+                start = solver.vehicle_start_stop[v]
+                first_stop[v] = sum(j * arc[v, i, j] for i, j in solver.arc_list[v] if i == start)
+            for a, b in zip(members, members[1:]):
+                m.AddImplication(is_used[b], is_used[a])
+                m.Add(first_stop[a] < first_stop[b]).OnlyEnforceIf(is_used[b])
@@ -15,12 +15,15 @@ from vrp_solver.domain import StopType
 class TimeConstraints:
     @staticmethod
     def apply(solver: VRPSolver):
+        if solver.backend == 'circuit':
+            return TimeConstraints._apply_circuit(solver)
+        
         m = solver.model
         data = solver.data
         cars = solver.variables
         
         num_v = solver.num_vehicles
-        max_s = solver.max_steps
+        steps = solver.vehicle_steps  # Per-vehicle horizon
         num_loc = solver.num_locations
         
         route = cars['route']
@@ -29,11 +32,6 @@ class TimeConstraints:
         is_done = cars['is_done']
         is_served = cars['is_served']
         
-        # Data flattening for AddElement
-        flat_time = [t for row in data.travel_time_matrix for t in row]
-        flat_setup = [t for row in data.setup_time_matrix for t in row]
-        serv_dur = solver.stop_service_duration  # Per-stop service duration
-        
         cars['late_flags'] = []
         cars['debug_due_dates'] = {}
         cars['debug_is_late'] = {}
@@ -42,45 +40,37 @@ class TimeConstraints:
         depot_min_service = data.operations.depot_service_time
         min_intra = data.operations.min_intra_transit
         
+        # stop_id -> window start (0 at depots): a vehicle waits there if early
+        window_open = TimeConstraints.window_open(solver)
+        max_open = max(window_open, default=0)
+        
         for v in range(num_v):
             veh = data.vehicles[v]
             labor = veh.labor
             break_rule = labor.break_rule
             shift = labor.shift
+            vb = solver.bounds.vehicles[v]
             
             # Initial Arrival at shift start
             m.Add(arrival_time[v, 0] == shift.start_time)
             
-            for s in range(max_s - 1):
+            for s in range(steps[v] - 1):
                 # Use route_location (already linked via Element in wrapper)
                 curr_loc = route_location[v, s]
                 next_loc = route_location[v, s+1]
                 
-                # Index for flat matrix: curr_loc * num_loc + next_loc
-                idx = m.NewIntVar(0, num_loc**2-1, f'idx_{v}_{s}')
-                m.Add(idx == curr_loc * num_loc + next_loc)
-                
-                # Drive time
-                drive_val = m.NewIntVar(0, 1000, f'dt_{v}_{s}')
-                m.AddElement(idx, flat_time, drive_val)
-                
-                # Setup time
-                setup_val = m.NewIntVar(0, 1000, f'st_{v}_{s}')
-                m.AddElement(idx, flat_setup, setup_val)
-                
-                # Service duration (from stop lookup array)
-                curr_stop = route[v, s]
-                service_val = m.NewIntVar(0, 1000, f'sert_{v}_{s}')
-                m.AddElement(curr_stop, serv_dur, service_val)
+                # Drive / setup / service (shared arc lookup)
+                leg = solver.arc_lookup(v, s)
+                drive_val = leg.drive
+                setup_val = leg.setup
+                service_val = leg.service
                 
                 # --- Anti-teleport logic ---
-                anti_teleport_t = m.NewIntVar(0, 100, f'att_{v}_{s}')
+                anti_teleport_t = m.NewIntVar(0, solver.bounds.max_anti_teleport, f'att_{v}_{s}')
                 
                 # Check if transitioning from depot
                 start_depot_stop = solver.vehicle_start_stop[v]
-                from_depot = m.NewBoolVar(f'fd_{v}_{s}')
-                m.Add(route[v, s] == start_depot_stop).OnlyEnforceIf(from_depot)
-                m.Add(route[v, s] != start_depot_stop).OnlyEnforceIf(from_depot.Not())
+                from_depot = solver.visit_lit(v, s, start_depot_stop)
                 
                 # Check if staying at same location
                 same_loc = m.NewBoolVar(f'sl_{v}_{s}')
@@ -104,20 +94,25 @@ class TimeConstraints:
                 m.Add(rest_t == 0).OnlyEnforceIf(long_drive.Not())
                 
                 # --- Calculate arrival time ---
-                calc_arrival = m.NewIntVar(0, 10000, f'ca_{v}_{s}')
+                calc_arrival = m.NewIntVar(vb.start, vb.horizon + vb.max_leg, f'ca_{v}_{s}')
                 m.Add(calc_arrival == arrival_time[v, s] + service_val + drive_val + rest_t + setup_val + anti_teleport_t)
                 
-                # No waiting logic here - handled via time window constraints below
+                # Earliest arrival: wait only for the window start of the next stop
+                # (the schedule RouteEvaluator.simulate costs, so both agree on waiting)
+                next_open = m.NewIntVar(0, max_open, f'wo_{v}_{s}')
+                m.AddElement(route[v, s+1], window_open, next_open)
+                earliest = m.NewIntVar(vb.start, max(vb.horizon + vb.max_leg, max_open), f'ea_{v}_{s}')
+                m.AddMaxEquality(earliest, [calc_arrival, next_open])
+                
                 # FIX: Only freeze time if we were ALREADY done at step s.
                 # If s was active (False), but s+1 is done (True) -> Transition -> Travel time applies.
                 m.Add(arrival_time[v, s+1] == arrival_time[v, s]).OnlyEnforceIf(is_done[v, s])
-                # CRITICAL: Use >= to allow waiting (vehicle can arrive early and wait)
                 # FIX: Apply travel constraint whenever we are moving FROM a valid step (is_done[v, s] is False)
                 # Even if we move TO the end depot (is_done[v, s+1] becomes True), we must travel there.
-                m.Add(arrival_time[v, s+1] >= calc_arrival).OnlyEnforceIf(is_done[v, s].Not())
+                m.Add(arrival_time[v, s+1] == earliest).OnlyEnforceIf(is_done[v, s].Not())
             
             # --- Work shift limit ---
-            for s in range(max_s):
+            for s in range(steps[v]):
                 m.Add(arrival_time[v, s] - shift.start_time <= shift.max_duration)
         
         # ==============================================
@@ -130,34 +125,15 @@ class TimeConstraints:
             d_stop_id = solver.shipment_delivery_stop[ship_idx]
             
             # Get time windows from Shipment (Source of Truth!)
-            if ship.pickup_window:
-                p_tw_start = ship.pickup_window.start
-                p_tw_end = ship.pickup_window.end
-            else:
-                # Fallback to location window
-                p_loc = data.locations[data.stops[p_stop_id].location_idx]
-                p_tw_start = p_loc.start_window
-                p_tw_end = p_loc.end_window
-            
-            if ship.delivery_window:
-                d_tw_start = ship.delivery_window.start
-                d_tw_end = ship.delivery_window.end
-            else:
-                d_loc = data.locations[data.stops[d_stop_id].location_idx]
-                d_tw_start = d_loc.start_window
-                d_tw_end = d_loc.end_window
+            # Falls back to location opening hours
+            p_tw_start, p_tw_end = data.get_stop_window(p_stop_id)
+            d_tw_start, d_tw_end = data.get_stop_window(d_stop_id)
             
             # For each vehicle×step, if this is the pickup stop, enforce TW
             for v in range(num_v):
-                for s in range(max_s):
+                for s in range(steps[v]):
                     # Pickup time window
-                    is_pickup_visit = m.NewBoolVar(f'ipv_{ship_idx}_{v}_{s}')
-                    m.Add(route[v, s] == p_stop_id).OnlyEnforceIf(is_pickup_visit)
-                    m.Add(route[v, s] != p_stop_id).OnlyEnforceIf(is_pickup_visit.Not())
-                    
-                    valid_pickup = m.NewBoolVar(f'vp_{ship_idx}_{v}_{s}')
-                    m.AddBoolAnd([is_pickup_visit, is_done[v, s].Not()]).OnlyEnforceIf(valid_pickup)
-                    m.AddBoolOr([is_pickup_visit.Not(), is_done[v, s]]).OnlyEnforceIf(valid_pickup.Not())
+                    valid_pickup = solver.active_visit_lit(v, s, p_stop_id)
                     
                     # arrival >= pickup_tw_start (wait if early)
                     # arrival <= pickup_tw_end (hard constraint)
@@ -165,21 +141,95 @@ class TimeConstraints:
                     m.Add(arrival_time[v, s] <= p_tw_end).OnlyEnforceIf(valid_pickup)
                     
                     # Delivery time window
-                    is_delivery_visit = m.NewBoolVar(f'idv_{ship_idx}_{v}_{s}')
-                    m.Add(route[v, s] == d_stop_id).OnlyEnforceIf(is_delivery_visit)
-                    m.Add(route[v, s] != d_stop_id).OnlyEnforceIf(is_delivery_visit.Not())
-                    
-                    valid_delivery = m.NewBoolVar(f'vd_{ship_idx}_{v}_{s}')
-                    m.AddBoolAnd([is_delivery_visit, is_done[v, s].Not()]).OnlyEnforceIf(valid_delivery)
-                    m.AddBoolOr([is_delivery_visit.Not(), is_done[v, s]]).OnlyEnforceIf(valid_delivery.Not())
+                    valid_delivery = solver.active_visit_lit(v, s, d_stop_id)
                     
                     m.Add(arrival_time[v, s] >= d_tw_start).OnlyEnforceIf(valid_delivery)
                     m.Add(arrival_time[v, s] <= d_tw_end).OnlyEnforceIf(valid_delivery)
         
         # Late penalty tracking (simplified for now)
         for v in range(num_v):
-            for s in range(max_s):
+            for s in range(steps[v]):
                 step_late = m.NewBoolVar(f'late_{v}_{s}')
                 m.Add(step_late == 0)  # Placeholder - all within TW or infeasible
                 cars['late_flags'].append(step_late)
                 cars['debug_is_late'][(v, s)] = step_late
+
+    @staticmethod
+    def window_open(solver: VRPSolver):
+        """stop_id -> earliest service start: window start at shipment stops, 0 at depots."""
+        return [window[0] if window else 0 for window in solver.evaluator.window]
+    
+    @staticmethod
+    def arc_duration(solver: VRPSolver, v: int, i: int, j: int) -> int:
+        """Minimum time between arriving at stop i and arriving at stop j."""
+        data = solver.data
+        break_rule = data.vehicles[v].labor.break_rule
+        
+        curr_loc = solver.stop_to_location[i]
+        next_loc = solver.stop_to_location[j]
+        drive = data.travel_time_matrix[curr_loc, next_loc]
+        setup = data.setup_time_matrix[curr_loc, next_loc]
+        service = solver.stop_service_duration[i]
+        
+        # Anti-teleport: depot dwell or same-site transit
+        if i == solver.vehicle_start_stop[v]:
+            anti_teleport = data.operations.depot_service_time
+        elif curr_loc == next_loc:
+            anti_teleport = data.operations.min_intra_transit
+        else:
+            anti_teleport = 0
+        
+        rest = break_rule.duration_minutes if drive > break_rule.interval_minutes else 0
+        return service + drive + rest + setup + anti_teleport
+    
+    @staticmethod
+    def _apply_circuit(solver: VRPSolver):
+        """Time propagation along arc literals."""
+        m = solver.model
+        data = solver.data
+        cars = solver.variables
+        
+        arc = cars['arc']
+        stop_arrival = cars['stop_arrival']
+        
+        cars['late_flags'] = []
+        cars['debug_due_dates'] = {}
+        cars['debug_is_late'] = {}
+        
+        # Shipment stop -> arrival via its incoming arc, before waiting
+        bounds = solver.bounds
+        window_open = TimeConstraints.window_open(solver)
+        start = min((vb.start for vb in bounds.vehicles), default=0)
+        max_arrival = max([bounds.horizon + vb.max_leg for vb in bounds.vehicles] + window_open)
+        earliest = {
+            stop.id: m.NewIntVar(start, max_arrival, f'ea_{stop.id}')
+            for stop in data.shipment_stops
+        }
+        
+        for v in range(solver.num_vehicles):
+            shift = data.vehicles[v].labor.shift
+            start_depot_stop = solver.vehicle_start_stop[v]
+            end_depot_stop = solver.vehicle_end_stop[v]
+            
+            # Departure at shift start, return within the shift
+            m.Add(stop_arrival[start_depot_stop] == shift.start_time)
+            m.Add(stop_arrival[end_depot_stop] - shift.start_time <= shift.max_duration)
+            
+            # Arrival via the chosen arc; shipment stops add the wait for their window below
+            for i, j in solver.arc_list[v]:
+                dur = TimeConstraints.arc_duration(solver, v, i, j)
+                target = stop_arrival[j] if j == end_depot_stop else earliest[j]
+                m.Add(target == stop_arrival[i] + dur).OnlyEnforceIf(arc[v, i, j])
+        
+        # Earliest arrival: wait only for the window start (as in the step model)
+        is_stop_active = cars['is_stop_active']
+        for stop_id, arrival_via_arc in earliest.items():
+            arrival = m.NewIntVar(start, max_arrival, f'pa_{stop_id}')
+            m.AddMaxEquality(arrival, [arrival_via_arc, window_open[stop_id]])
+            m.Add(stop_arrival[stop_id] == arrival).OnlyEnforceIf(is_stop_active[stop_id])
+        
+        # Time windows (one pair per stop, not per vehicle x step)
+        for stop in data.shipment_stops:
+            tw_start, tw_end = data.get_stop_window(stop.id)
+            m.Add(stop_arrival[stop.id] >= tw_start).OnlyEnforceIf(is_stop_active[stop.id])
+            m.Add(stop_arrival[stop.id] <= tw_end).OnlyEnforceIf(is_stop_active[stop.id])
@@ -0,0 +1,130 @@
+"""
+Iterative-Deepening Route Horizon.
+
+The step model normally gives every vehicle max_steps slots, enough for one
+vehicle to serve every shipment. Most of them end up as end-depot padding.
+
+Here each vehicle starts with a horizon estimated from its capacity and
+shift length. After each solve, only vehicles whose route fills its horizon
+(end depot reached at the last step) are grown, and the model is rebuilt
+with the previous routes as a hint. Model size follows the real route length.
+"""
+import time
+from dataclasses import replace
+from typing import Callable, List, Optional, Tuple
+from ortools.sat.python import cp_model
+from vrp_solver.domain import VRPData
+from vrp_solver.config import VRPConfig
+from vrp_solver.ortools_solver.wrapper import VRPSolver
+from vrp_solver.ortools_solver.backends import build_model
+
+
+def estimate_vehicle_steps(data: VRPData, config: VRPConfig) -> List[int]:
+    """Initial per-vehicle horizon (start depot + shipment stops + end depot)."""
+    ship_stops = data.shipment_stops
+    if not data.shipments:
+        return [2] * len(data.vehicles)
+    
+    # Shift: every extra stop costs at least its service plus the shortest hop
+    min_service = min(data.locations[s.location_idx].service_duration for s in ship_stops)
+    hops = data.travel_time_matrix.flat
+    hops = hops[hops > 0]
+    min_hop = int(hops.min()) if hops.size else 0
+    min_stop_time = max(1, min_service + min_hop)
+    
+    weights = sorted(ship.weight for ship in data.shipments)
+    volumes = sorted(ship.volume for ship in data.shipments)
+    
+    steps = []
+    for veh in data.vehicles:
+        shift_stops = veh.labor.shift.max_duration // min_stop_time
+        
+        # Capacity: how many of the smallest shipments fit on board at once
+        on_board = min(
+            _count_fitting(weights, veh.profile.capacity.weight),
+            _count_fitting(volumes, veh.profile.capacity.volume),
+        )
+        load_stops = 2 * max(on_board, 1)
+        
+        num_stops = min(shift_stops, load_stops, 2 * len(data.shipments))
+        steps.append(max(num_stops, 2) + 2)
+    return steps
+
+
+def _count_fitting(sizes: List[float], capacity: float) -> int:
+    """Number of items (ascending sizes) that fit together within capacity."""
+    total = 0.0
+    for k, size in enumerate(sizes):
+        total += size
+        if total > capacity:
+            return k
+    return len(sizes)
+
+
+def saturated_vehicles(solver: VRPSolver, cp_solver: cp_model.CpSolver) -> List[int]:
+    """Vehicles whose route only reaches the end depot at its last step."""
+    is_done = solver.variables['is_done']
+    return [
+        v for v in range(solver.num_vehicles)
+        if not cp_solver.Value(is_done[v, solver.vehicle_steps[v] - 2])
+    ]
+
+
+def solve_iterative(data: VRPData, config: VRPConfig,
+                    log: Optional[Callable[[str], None]] = None) -> Tuple[VRPSolver, cp_model.CpSolver, int]:
+    """
+    Solve with a per-vehicle horizon that grows only where routes saturate.
+    
+    Non-final rounds get half of the remaining time budget, so the whole
+    run stays within config.max_solver_time. log, if given, receives one
+    line per round.
+    
+    OPTIMAL is only returned when the last model had the full horizon;
+    an optimum of a truncated horizon is reported as FEASIBLE.
+    """
+    if config.model_backend != 'step':
+        # Successor encodings have no step horizon
+        solver = build_model(data, config)
+        cp_solver, status = solver.solve()
+        return solver, cp_solver, status
+    
+    deadline = time.time() + config.max_solver_time
+    vehicle_steps = estimate_vehicle_steps(data, config)
+    hint = None
+    
+    for round_idx in range(max(config.max_horizon_rounds, 1)):
+        remaining = max(deadline - time.time(), 0.1)
+        solver = build_model(data, config, vehicle_steps, hint=hint)
+        vehicle_steps = solver.vehicle_steps  # Clamped to full_steps
+        at_full = all(n >= solver.full_steps for n in vehicle_steps)
+        last_round = at_full or round_idx == config.max_horizon_rounds - 1
+        
+        round_time = remaining if last_round else remaining / 2
+        solver.config = replace(config, max_solver_time=round_time)
+        
+        cp_solver, status = solver.solve()
+        if log:
+            log(f"Horizon round {round_idx}: steps={vehicle_steps} "
+                f"vars={len(solver.model.Proto().variables)} status={cp_solver.StatusName(status)}")
+        
+        if last_round:
+            break
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            grow = saturated_vehicles(solver, cp_solver)
+            if not grow:
+                break
+            hint = solver.extract_solution(cp_solver, status)
+        else:
+            # No solution in time: grow everyone and try again
+            grow = range(solver.num_vehicles)
+        
+        # Double the shipment-stop slots of saturated vehicles
+        vehicle_steps = [
+            2 * n - 2 if v in grow else n
+            for v, n in enumerate(vehicle_steps)
+        ]
+    
+    solver.config = config
+    if status == cp_model.OPTIMAL and not at_full:
+        status = cp_model.FEASIBLE  # Optimal for the restricted horizon only
+    return solver, cp_solver, status
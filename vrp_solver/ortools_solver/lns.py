@@ -0,0 +1,197 @@
+"""
+Large Neighborhood Search around VRPSolver.
+
+The model (variables + every constraint module) is built once. Each
+iteration a destroy operator picks the vehicles to re-plan, every other
+vehicle is fixed to the incumbent route through its variable domains, and
+CP-SAT re-solves for a short slice. Better plans become the incumbent and
+the hint of the next iteration; the domains are restored in between.
+
+Unserved shipments are never fixed, so any freed vehicle may pick them up.
+"""
+import random
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from ortools.sat.python import cp_model
+from vrp_solver.domain import VRPData, Solution
+from vrp_solver.config import VRPConfig
+from vrp_solver.ortools_solver.wrapper import VRPSolver
+from vrp_solver.ortools_solver.backends import build_model
+
+
+# vehicle -> (stop_id, arrival, load_w, load_v) of the incumbent (see VRPSolver._plan_visits)
+Plan = Dict[int, List[Tuple[int, int, int, int]]]
+
+# (solver, incumbent plan, rng, neighborhood size) -> vehicles to re-plan
+DestroyOperator = Callable[[VRPSolver, Plan, random.Random, int], Set[int]]
+
+
+@dataclass
+class LNSIteration:
+    """Instrumentation record of one LNS iteration."""
+    iteration: int
+    operator: str
+    freed_vehicles: List[int]
+    status: str          # CP-SAT status name of the slice
+    objective: Optional[int]  # Slice objective (None if no solution)
+    best: int            # Incumbent total after the iteration
+    improved: bool
+    fixed_vars: int      # Variables fixed through their domain
+    solve_time: float    # Seconds spent in CP-SAT
+
+
+# ======================
+# Destroy Operators
+# ======================
+
+def random_vehicles(solver: VRPSolver, plan: Plan, rng: random.Random, size: int) -> Set[int]:
+    """Any size vehicles, used or not."""
+    return set(rng.sample(range(solver.num_vehicles), min(size, solver.num_vehicles)))
+
+
+def zone_vehicles(solver: VRPSolver, plan: Plan, rng: random.Random, size: int) -> Set[int]:
+    """Vehicles visiting one random zone (Location.zone_id), topped up at random."""
+    zones = sorted({solver.stop_zone[stop.id] for stop in solver.data.shipment_stops})
+    if not zones:
+        return random_vehicles(solver, plan, rng, size)
+    zone = rng.choice(zones)
+    
+    in_zone = [
+        v for v, visits in plan.items()
+        if any(solver.stop_zone[stop_id] == zone for stop_id, _, _, _ in visits[1:-1])
+    ]
+    freed = set(rng.sample(in_zone, min(size, len(in_zone))))
+    if len(freed) < size:
+        others = [v for v in range(solver.num_vehicles) if v not in freed]
+        freed |= set(rng.sample(others, min(size - len(freed), len(others))))
+    return freed
+
+
+def time_related_vehicles(solver: VRPSolver, plan: Plan, rng: random.Random, size: int) -> Set[int]:
+    """Vehicles serving the shipments picked up closest in time to a random seed shipment."""
+    # Served shipments: incumbent pickup time and vehicle
+    pickup = {}
+    for v, visits in plan.items():
+        for stop_id, arrival, _, _ in visits:
+            stop = solver.data.stops[stop_id]
+            if stop.is_pickup:
+                pickup[stop.shipment_idx] = (arrival, v)
+    if not pickup:
+        return random_vehicles(solver, plan, rng, size)
+    
+    seed_time, _ = pickup[rng.choice(sorted(pickup))]
+    freed = set()
+    for arrival, v in sorted(pickup.values(), key=lambda item: abs(item[0] - seed_time)):
+        if len(freed) >= size:
+            break
+        freed.add(v)
+    return freed
+
+
+DESTROY_OPERATORS: Dict[str, DestroyOperator] = {
+    'vehicles': random_vehicles,      # random vehicle subset
+    'zone': zone_vehicles,            # vehicles of one zone
+    'time': time_related_vehicles,    # vehicles serving time-related shipments
+}
+
+
+# ======================
+# Driver
+# ======================
+
+def _priced(solver: VRPSolver, solution: Solution, status: str) -> Solution:
+    """solution re-costed by the evaluator: incumbent and candidates compare on one cost function."""
+    plan = {route.vehicle_id: [stop.id for stop in route.stops] for route in solution.routes}
+    return solver.evaluator.build_solution(plan, status)
+
+
+def solve_lns(data: VRPData, config: VRPConfig,
+              operators: Optional[Dict[str, DestroyOperator]] = None,
+              vehicle_steps: Optional[List[int]] = None,
+              log: Optional[Callable[[str], None]] = None) -> Tuple[VRPSolver, Solution, List[LNSIteration]]:
+    """
+    Improve the incumbent by re-solving destroyed neighborhoods until
+    config.max_solver_time is spent.
+    
+    The incumbent starts as the construction hint, or as a first
+    unrestricted slice when config.construction_hint is off. Operators are
+    picked round-robin from config.lns_operators (names in operators,
+    DESTROY_OPERATORS by default). Candidates are costed by RouteEvaluator,
+    like the incumbent. log, if given, receives one line per iteration;
+    the returned history holds the same records.
+    """
+    operators = operators or DESTROY_OPERATORS
+    names = [name for name in config.lns_operators if name in operators]
+    if not names:
+        raise ValueError(
+            f"No known LNS operator in {list(config.lns_operators)} (expected some of {sorted(operators)})"
+        )
+    
+    deadline = time.time() + config.max_solver_time
+    rng = random.Random(config.lns_seed)
+    solver = build_model(data, config, vehicle_steps)
+    slice_config = replace(config, max_solver_time=config.lns_slice_time)
+    
+    incumbent = solver.fallback
+    if incumbent is None:
+        solver.config = slice_config
+        cp_solver, status = solver.solve()
+        incumbent = solver.extract_solution(cp_solver, status)
+        if incumbent.is_feasible:
+            incumbent = _priced(solver, incumbent, incumbent.status)
+    
+    history = []
+    iteration = 0
+    while incumbent.is_feasible and iteration < config.lns_max_iterations:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        
+        name = names[iteration % len(names)]
+        plan = solver._plan_visits(incumbent)
+        freed = operators[name](solver, plan, rng, config.lns_neighborhood_size)
+        
+        # Fix the rest via domains, hint everything from the incumbent
+        for v in range(solver.num_vehicles):
+            if v not in freed and len(plan[v]) <= solver.vehicle_steps[v]:
+                solver.fix_vehicle(v, plan[v])
+        fixed_vars = len(solver._saved_domains)
+        solver.model.ClearHints()
+        solver.add_solution_hint(incumbent)
+        
+        solver.config = replace(slice_config, max_solver_time=min(config.lns_slice_time, remaining))
+        started = time.time()
+        cp_solver, status = solver.solve()
+        solve_time = time.time() - started
+        solver.release_fixed()
+        
+        objective = None
+        improved = False
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            # Optimal within the neighborhood only
+            candidate = _priced(solver, solver.extract_solution(cp_solver, status), 'feasible')
+            objective = candidate.total_cost
+            if objective < incumbent.total_cost:
+                incumbent = candidate
+                improved = True
+        
+        record = LNSIteration(
+            iteration=iteration,
+            operator=name,
+            freed_vehicles=sorted(freed),
+            status=cp_solver.StatusName(status),
+            objective=objective,
+            best=incumbent.total_cost,
+            improved=improved,
+            fixed_vars=fixed_vars,
+            solve_time=solve_time,
+        )
+        history.append(record)
+        if log:
+            log(f"LNS {iteration}: {name} freed={record.freed_vehicles} status={record.status} "
+                f"obj={objective} best={record.best}{' *' if improved else ''} ({solve_time:.2f}s)")
+        iteration += 1
+    
+    solver.config = config
+    return solver, incumbent, history
@@ -0,0 +1,239 @@
+"""
+Persisted CP-SAT Model Cache.
+
+build_model spends most of a small solve in Python model construction.
+Identical scenarios (same VRPData, same model-relevant VRPConfig fields,
+same per-vehicle horizon) produce the same CpModelProto, so the proto and
+the index maps of solver.variables are stored on disk and reused:
+
+- Key: SHA-256 fingerprint of the data, the config (minus solve-only
+  fields), the horizon and the model-building code
+- Entry: <key>.model (gzip text-format CpModelProto, before the warm
+  start hint) and <key>.json (proto index of every solver.variables entry)
+- Eviction: least recently used first, once the directory exceeds its
+  size cap (hits refresh the entry's mtime)
+"""
+import dataclasses
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import ortools
+from ortools.sat.python import cp_model
+from vrp_solver.domain import VRPData, StopTable, MatrixStore
+from vrp_solver.config import VRPConfig
+
+
+# Fields that change how the model is solved, not the model itself
+SOLVE_ONLY_FIELDS = frozenset({
+    'construction_hint',  # The hint is added after the cached build
+    'max_solver_time', 'num_solver_workers', 'solver_profile', 'profile_build',
+    'service_stage_time', 'cost_stage_time', 'max_horizon_rounds',
+    'lns_operators', 'lns_neighborhood_size', 'lns_slice_time', 'lns_max_iterations', 'lns_seed',
+    'alns_max_iterations', 'alns_seed',
+    'model_cache_dir', 'model_cache_max_mb',
+})
+
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _encode(obj):
+    """JSON fallback for fingerprinting: enums, arrays, stop tables, matrices, sets."""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, StopTable):
+        return obj.columns()
+    if isinstance(obj, MatrixStore):
+        return obj.digest()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Cannot fingerprint {type(obj).__name__}")
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Hash of the vrp_solver sources: any code change invalidates the cache."""
+    digest = hashlib.sha256(ortools.__version__.encode())
+    for root, dirs, files in os.walk(_PACKAGE_DIR):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith('.py'):
+                with open(os.path.join(root, name), 'rb') as f:
+                    digest.update(name.encode())
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def fingerprint(data: VRPData, config: VRPConfig, vehicle_steps: Optional[List[int]] = None) -> str:
+    """Content hash of everything the built model depends on."""
+    model_config = {
+        k: v for k, v in dataclasses.asdict(config).items() if k not in SOLVE_ONLY_FIELDS
+    }
+    payload = json.dumps(
+        [dataclasses.asdict(data), model_config, vehicle_steps, code_version()],
+        sort_keys=True, separators=(',', ':'), default=_encode,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# ======================
+# Variable Index Maps
+# ======================
+
+def variable_index_map(variables: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    JSON-ready proto indices of solver.variables.
+    
+    Dicts become [key, index] pairs (tuple keys as lists), lists of
+    variables lists of indices, single variables an index.
+    """
+    maps = {}
+    for name, value in variables.items():
+        if isinstance(value, dict):
+            maps[name] = {'dict': [[list(k) if isinstance(k, tuple) else k, var.Index()]
+                                   for k, var in value.items()]}
+        elif isinstance(value, list):
+            maps[name] = {'list': [var.Index() for var in value]}
+        else:
+            maps[name] = {'var': value.Index()}
+    return maps
+
+
+def restore_variables(model: cp_model.CpModel, maps: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of variable_index_map on the loaded model."""
+    var = model.GetIntVarFromProtoIndex
+    variables = {}
+    for name, entry in maps.items():
+        if 'dict' in entry:
+            variables[name] = {
+                tuple(k) if isinstance(k, list) else k: var(idx) for k, idx in entry['dict']
+            }
+        elif 'list' in entry:
+            variables[name] = [var(idx) for idx in entry['list']]
+        else:
+            variables[name] = var(entry['var'])
+    return variables
+
+
+# ======================
+# Proto (De)serialization
+# ======================
+
+def _write_model(model: cp_model.CpModel, path: str):
+    proto = model.Proto()
+    if hasattr(proto, 'SerializeToString'):
+        payload = proto.SerializeToString()  # protobuf-backed CpModelProto (ortools < 9.12)
+    else:
+        # pybind-backed proto: text format is the only format it can read back
+        fd, text_path = tempfile.mkstemp(suffix='.txt')
+        os.close(fd)
+        try:
+            model.ExportToFile(text_path)
+            with open(text_path, 'rb') as f:
+                payload = f.read()
+        finally:
+            os.remove(text_path)
+    with gzip.open(path, 'wb', compresslevel=1) as f:
+        f.write(payload)
+
+
+def _read_model(path: str) -> cp_model.CpModel:
+    with gzip.open(path, 'rb') as f:
+        payload = f.read()
+    model = cp_model.CpModel()
+    proto = model.Proto()
+    if hasattr(proto, 'ParseFromString'):
+        proto.ParseFromString(payload)
+    elif not proto.parse_text_format(payload.decode()):
+        raise ValueError(f"Unreadable cached model {path}")
+    if hasattr(model, 'rebuild_constant_map'):
+        model.rebuild_constant_map()  # NewConstant reuse on the loaded model
+    return model
+
+
+# ======================
+# On-Disk LRU Cache
+# ======================
+
+class ModelCache:
+    """Directory of cached models, LRU-evicted above max_bytes."""
+    
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+    
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, key)
+        return base + '.model', base + '.json'
+    
+    def get(self, key: str) -> Optional[Tuple[cp_model.CpModel, Dict[str, Any]]]:
+        """(model, variables) of a cached build, None on a miss."""
+        model_path, maps_path = self._paths(key)
+        try:
+            with open(maps_path) as f:
+                maps = json.load(f)
+            model = _read_model(model_path)
+        except (OSError, ValueError):
+            return None  # Missing, half-evicted or corrupt: rebuild
+        
+        for path in (model_path, maps_path):
+            try:
+                os.utime(path)  # Most recently used
+            except OSError:
+                pass
+        return model, restore_variables(model, maps)
+    
+    def put(self, key: str, model: cp_model.CpModel, variables: Dict[str, Any]):
+        """Store a build (written atomically: concurrent readers never see half an entry)."""
+        model_path, maps_path = self._paths(key)
+        maps = variable_index_map(variables)
+        
+        for path, write in ((model_path, lambda p: _write_model(model, p)),
+                            (maps_path, lambda p: self._write_json(maps, p))):
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            os.close(fd)
+            try:
+                write(tmp)
+                os.replace(tmp, path)
+            except BaseException:
+                os.remove(tmp)
+                raise
+        self.evict()
+    
+    @staticmethod
+    def _write_json(maps: Dict[str, Any], path: str):
+        with open(path, 'w') as f:
+            json.dump(maps, f, separators=(',', ':'))
+    
+    def evict(self):
+        """Drop least recently used entries until the directory fits max_bytes."""
+        entries = {}  # key -> [last use, bytes]
+        for name in os.listdir(self.directory):
+            key, ext = os.path.splitext(name)
+            if ext not in ('.model', '.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entry = entries.setdefault(key, [0.0, 0])
+            entry[0] = max(entry[0], stat.st_mtime)
+            entry[1] += stat.st_size
+        
+        total = sum(size for _, size in entries.values())
+        for key, (_, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if total <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
@@ -0,0 +1,153 @@
+"""
+CP-SAT Parameter Profiles.
+
+Named search settings for VRPSolver.solve(): worker count, subsolver
+portfolio, linearization level, presolve effort and random seed.
+
+Worker counts follow VRPConfig.num_solver_workers (0 = all available) and
+are capped by the CPU quota of the process, so a container limited to
+4 CPUs does not run 32 workers on them. The quota is read from the cgroup
+(v2 cpu.max, v1 cfs quota/period) and the scheduler affinity.
+"""
+import math
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from ortools.sat.python import cp_model
+from vrp_solver.config import VRPConfig
+
+
+@dataclass(frozen=True)
+class SolverProfile:
+    """CP-SAT settings of one profile."""
+    linearization_level: int          # 0: no LP, 1: default, 2: full LP relaxation
+    max_presolve_iterations: int      # Presolve effort (CP-SAT default 3)
+    probing_level: int                # Presolve probing (CP-SAT default 2)
+    random_seed: int = 1              # CP-SAT default
+    auto_workers: Optional[int] = None # num_workers of auto (0) requests (None: the CPU count)
+    ignore_subsolvers: Tuple[str, ...] = ()
+    extra_subsolvers: Tuple[str, ...] = ()
+    deterministic: bool = False       # Interleaved search + deterministic time limit
+
+
+# Wall limit of deterministic runs, relative to max_solver_time
+DETERMINISTIC_WALL_FACTOR = 4.0
+
+# Bound-proving workers: useless when only a first plan is wanted
+_BOUND_SUBSOLVERS = (
+    'core', 'max_lp', 'lb_tree_search', 'objective_lb_search', 'objective_shaving',
+    'probing', 'pseudo_costs', 'reduced_costs',
+)
+
+SOLVER_PROFILES = {
+    'fast-feasible': SolverProfile(          # first good plan, cheap presolve
+        linearization_level=0,
+        max_presolve_iterations=1,
+        probing_level=0,
+        ignore_subsolvers=_BOUND_SUBSOLVERS,
+    ),
+    'balanced': SolverProfile(               # CP-SAT defaults
+        linearization_level=1,
+        max_presolve_iterations=3,
+        probing_level=2,
+    ),
+    'deep': SolverProfile(                   # long runs: LP bounds + full presolve
+        linearization_level=2,
+        max_presolve_iterations=5,
+        probing_level=2,
+        extra_subsolvers=('lb_tree_search', 'objective_lb_search'),
+    ),
+    'deterministic': SolverProfile(          # same result for the same model and workers
+        linearization_level=1,
+        max_presolve_iterations=3,
+        probing_level=2,
+        auto_workers=8,                      # fixed count: same result on every machine
+        deterministic=True,
+    ),
+}
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: min of affinity and cgroup CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(cpus, 1)
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """CPU quota (quota / period) of the cgroup, None if unlimited or unknown."""
+    # cgroup v2: "<quota|max> <period>"
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == 'max' else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    
+    # cgroup v1: quota of -1 means unlimited
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        return None if quota <= 0 or period <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
+
+
+def get_profile(name: str) -> SolverProfile:
+    """Profile by name, ValueError for unknown names."""
+    try:
+        return SOLVER_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown solver profile '{name}' (expected one of {sorted(SOLVER_PROFILES)})"
+        ) from None
+
+
+def solver_workers(config: VRPConfig, profile: SolverProfile) -> int:
+    """
+    num_workers for a solve.
+    
+    Deterministic runs keep the requested count even above the quota:
+    their result depends on the worker count, not on the machine. An auto
+    request (0) uses profile.auto_workers when set, not the CPU count;
+    explicit counts are honored as given.
+    """
+    if config.num_solver_workers > 0:
+        requested = config.num_solver_workers
+    elif profile.auto_workers is not None:
+        requested = profile.auto_workers
+    else:
+        requested = available_cpus()
+    if not profile.deterministic:
+        requested = min(requested, available_cpus())
+    return max(requested, 1)
+
+
+def configure_solver(cp_solver: cp_model.CpSolver, config: VRPConfig) -> None:
+    """Apply config.solver_profile, the worker count and the time limit."""
+    profile = get_profile(config.solver_profile)
+    params = cp_solver.parameters
+    params.num_workers = solver_workers(config, profile)
+    params.linearization_level = profile.linearization_level
+    params.max_presolve_iterations = profile.max_presolve_iterations
+    params.cp_model_probing_level = profile.probing_level
+    params.random_seed = profile.random_seed
+    params.ignore_subsolvers.extend(profile.ignore_subsolvers)
+    params.extra_subsolvers.extend(profile.extra_subsolvers)
+    
+    if profile.deterministic:
+        # Wall time would cut the search at a machine-dependent point:
+        # limit deterministic time, keep a generous wall limit as a safety net
+        params.interleave_search = True
+        params.max_deterministic_time = config.max_solver_time
+        params.max_time_in_seconds = DETERMINISTIC_WALL_FACTOR * config.max_solver_time
+    else:
+        params.max_time_in_seconds = config.max_solver_time
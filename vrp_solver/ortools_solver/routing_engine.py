@@ -0,0 +1,183 @@
+"""
+OR-Tools Routing Engine.
+
+Maps VRPData onto the dedicated routing library (pywrapcp.RoutingModel)
+instead of a CP-SAT model:
+
+- Nodes: stops (own start/end depot per vehicle)
+- Arc cost: distance * per_km + zone crossing penalty
+- Fixed cost: cost.fixed of every used vehicle
+- Capacity dimensions: weight_delta / volume_delta (scaled)
+- Time dimension: service + drive + rest + setup + anti-teleport per leg,
+  waiting as slack, shipment windows, shift start and max duration.
+  Labor = span cost (regular rate) + soft bound at the standard duration
+  (overtime surcharge). Waiting is charged as slack cost.
+- Pickup & delivery pairs on the same vehicle, pickup first
+- unserved_penalty as a disjunction penalty on the pickup
+- Tags / capacity compatibility as allowed vehicles
+
+Load-distance (per_kg_km) cannot be expressed as an arc cost here; the
+returned Solution is re-evaluated by RouteEvaluator, so its costs are the
+same components as the CP-SAT objective.
+"""
+from typing import Dict, List, Tuple
+import numpy as np
+from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+from vrp_solver.domain import VRPData, Solution
+from vrp_solver.config import VRPConfig
+from vrp_solver.logic.evaluation import RouteEvaluator
+from vrp_solver.heuristics.construction import greedy_insertion
+
+
+def solve_routing(data: VRPData, config: VRPConfig) -> Solution:
+    """Solve with the OR-Tools routing library within config.max_solver_time."""
+    evaluator = RouteEvaluator(data, config)
+    num_v = len(data.vehicles)
+    scale = config.capacity_scale_factor
+    stop_loc = evaluator.stop_loc
+    
+    manager = pywrapcp.RoutingIndexManager(
+        data.num_stops, num_v,
+        [evaluator.start_stop[v] for v in range(num_v)],
+        [evaluator.end_stop[v] for v in range(num_v)],
+    )
+    routing = pywrapcp.RoutingModel(manager)
+    
+    # Stop x stop matrices, registered once so the search never calls back into Python
+    loc = np.array(stop_loc)
+    dist = np.asarray(data.travel_dist_matrix, dtype=np.int64)[np.ix_(loc, loc)]
+    drive = np.asarray(data.travel_time_matrix, dtype=np.int64)[np.ix_(loc, loc)]
+    setup = np.asarray(data.setup_time_matrix, dtype=np.int64)[np.ix_(loc, loc)]
+    
+    # ======================
+    # 1. Arc Costs (distance + zone) and Fixed Costs
+    # ======================
+    zone = np.array(evaluator.zone)
+    crossing = (zone[:, None] != 0) & (zone[None, :] != 0) & (zone[:, None] != zone[None, :])
+    zone_cost = crossing * data.penalties.zone_crossing
+    
+    arc_callbacks: Dict[int, int] = {}
+    for v, veh in enumerate(data.vehicles):
+        per_km = veh.cost.per_km
+        if per_km not in arc_callbacks:
+            arc_callbacks[per_km] = routing.RegisterTransitMatrix((dist * per_km + zone_cost).tolist())
+        routing.SetArcCostEvaluatorOfVehicle(arc_callbacks[per_km], v)
+        routing.SetFixedCostOfVehicle(veh.cost.fixed, v)
+    
+    # ======================
+    # 2. Capacity Dimensions
+    # ======================
+    for name, deltas, capacities in (
+        ('Weight', evaluator.delta_w, [int(veh.profile.capacity.weight * scale) for veh in data.vehicles]),
+        ('Volume', evaluator.delta_v, [int(veh.profile.capacity.volume * scale) for veh in data.vehicles]),
+    ):
+        demand = routing.RegisterUnaryTransitVector(list(deltas))
+        routing.AddDimensionWithVehicleCapacity(demand, 0, capacities, True, name)
+    
+    # ======================
+    # 3. Time Dimension
+    # ======================
+    # Leg i -> j: service_i + drive + rest + setup + anti-teleport (as in TimeConstraints)
+    anti_teleport = np.where(loc[:, None] == loc[None, :], data.operations.min_intra_transit, 0)
+    anti_teleport[list(evaluator.start_stop.values()), :] = data.operations.depot_service_time
+    base_leg = np.asarray(evaluator.service)[:, None] + drive + setup + anti_teleport
+    
+    leg_callbacks: Dict[Tuple[int, int], int] = {}
+    vehicle_legs = []
+    for veh in data.vehicles:
+        rule = veh.labor.break_rule
+        key = (rule.interval_minutes, rule.duration_minutes)
+        if key not in leg_callbacks:
+            rest = np.where(drive > rule.interval_minutes, rule.duration_minutes, 0)
+            leg_callbacks[key] = routing.RegisterTransitMatrix((base_leg + rest).tolist())
+        vehicle_legs.append(leg_callbacks[key])
+    
+    horizon = max(veh.labor.shift.start_time + veh.labor.shift.max_duration for veh in data.vehicles)
+    routing.AddDimensionWithVehicleTransits(vehicle_legs, horizon, horizon, False, 'Time')
+    time_dim = routing.GetDimensionOrDie('Time')
+    
+    for stop in data.shipment_stops:
+        window = evaluator.window[stop.id]
+        if window is not None:
+            time_dim.CumulVar(manager.NodeToIndex(stop.id)).SetRange(window[0], min(window[1], horizon))
+    
+    for v, veh in enumerate(data.vehicles):
+        shift = veh.labor.shift
+        labor = veh.labor.cost
+        start, end = routing.Start(v), routing.End(v)
+        time_dim.CumulVar(start).SetRange(shift.start_time, shift.start_time)
+        time_dim.CumulVar(end).SetMax(shift.start_time + shift.max_duration)
+        
+        # Labor: regular rate over the whole shift, overtime surcharge past the standard duration
+        time_dim.SetSpanCostCoefficientForVehicle(labor.regular_rate, v)
+        surcharge = int(labor.regular_rate * labor.overtime_multiplier) - labor.regular_rate
+        if surcharge > 0:
+            time_dim.SetCumulVarSoftUpperBound(end, shift.start_time + shift.standard_duration, surcharge)
+        time_dim.SetSlackCostCoefficientForVehicle(veh.cost.per_wait_minute, v)
+        routing.AddVariableMinimizedByFinalizer(time_dim.CumulVar(end))
+    
+    # ======================
+    # 4. Pickup & Delivery, Compatibility, Unserved Penalty
+    # ======================
+    solver = routing.solver()
+    compatible = {v: set(ships) for v, ships in evaluator.compatible.items()}
+    for ship_idx, ship in enumerate(data.shipments):
+        p_index = manager.NodeToIndex(evaluator.pickup_stop[ship_idx])
+        d_index = manager.NodeToIndex(evaluator.delivery_stop[ship_idx])
+        routing.AddPickupAndDelivery(p_index, d_index)
+        solver.Add(routing.VehicleVar(p_index) == routing.VehicleVar(d_index))
+        solver.Add(time_dim.CumulVar(p_index) <= time_dim.CumulVar(d_index))
+        
+        # -1: the pair may stay unserved
+        allowed = [v for v in range(num_v) if ship_idx in compatible[v]] + [-1]
+        routing.VehicleVar(p_index).SetValues(allowed)
+        routing.VehicleVar(d_index).SetValues(allowed)
+        
+        # Pickup and delivery are active together: charge the penalty once
+        routing.AddDisjunction([p_index], ship.unserved_penalty)
+        routing.AddDisjunction([d_index], 0)
+    
+    # ======================
+    # 5. Search
+    # ======================
+    params = pywrapcp.DefaultRoutingSearchParameters()
+    params.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.PARALLEL_CHEAPEST_INSERTION
+    params.local_search_metaheuristic = routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    params.time_limit.FromMilliseconds(int(config.max_solver_time * 1000))
+    
+    hint = greedy_insertion(data, config) if config.construction_hint else None
+    assignment = None
+    if hint is not None and hint.is_feasible and hint.routes:
+        routing.CloseModelWithParameters(params)
+        routes = [[] for _ in range(num_v)]
+        for route in hint.routes:
+            routes[route.vehicle_id] = [stop.id for stop in route.stops[1:-1]]
+        initial = routing.ReadAssignmentFromRoutes(routes, True)
+        if initial is not None:
+            assignment = routing.SolveFromAssignmentWithParameters(initial, params)
+    if assignment is None:
+        assignment = routing.SolveWithParameters(params)
+    
+    if assignment is None:
+        if hint is not None and hint.is_feasible:
+            return hint
+        return Solution(status='infeasible', served=[False] * len(data.shipments))
+    
+    solution = evaluator.build_solution(_read_plan(routing, manager, assignment, num_v), status='feasible')
+    # The search objective lacks load-distance: keep the hint if it is cheaper in full
+    if hint is not None and hint.is_feasible and hint.total_cost < solution.total_cost:
+        return hint
+    return solution
+
+
+def _read_plan(routing, manager, assignment, num_v: int) -> Dict[int, List[int]]:
+    """vehicle -> stop sequence (start ... end) of a routing assignment."""
+    plan = {}
+    for v in range(num_v):
+        index = routing.Start(v)
+        seq = [manager.IndexToNode(index)]
+        while not routing.IsEnd(index):
+            index = assignment.Value(routing.NextVar(index))
+            seq.append(manager.IndexToNode(index))
+        plan[v] = seq
+    return plan
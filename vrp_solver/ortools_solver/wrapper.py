@@ -3,14 +3,79 @@ VRP Solver Wrapper.
 
 Creates CP-SAT model variables for Stop-based VRP.
 """
+import queue
+import threading
+import numpy as np
 from ortools.sat.python import cp_model
-from typing import Dict, Any, List
-from vrp_solver.domain import VRPData, StopType
+from typing import Dict, Any, Iterator, List, Tuple, NamedTuple, Optional
+from vrp_solver.domain import VRPData, StopType, Solution
 from vrp_solver.config import VRPConfig
+from vrp_solver.logic.evaluation import RouteEvaluator
+from vrp_solver.logic.rehandling import rehandling_cost
+from vrp_solver.logic.bounds import compute_bounds
+from vrp_solver.ortools_solver.parameters import configure_solver
+
+
+# Solution cost key -> model variable name
+COST_VARIABLES = {
+    'fixed': 'c_fixed',
+    'distance': 'c_dist',
+    'labor': 'c_time',
+    'zone_penalty': 'c_zone',
+    'rehandling': 'c_rehandling',
+    'waiting': 'c_waiting',
+    'late_penalty': 'c_late',
+    'unserved_penalty': 'c_penalty',
+    'total': 'total_cost',
+}
+
+
+# Leg attribute encodings of the step model (see VRPSolver.arc_lookup)
+ARC_ENCODINGS = ('element', 'table')
+
+
+class ArcLookup(NamedTuple):
+    """Leg attributes of step s -> s+1 for one vehicle (linked once via Element or table)."""
+    idx: Any      # curr_loc * num_loc + next_loc (None with the table encoding)
+    drive: Any    # travel time
+    dist: Any     # travel distance
+    setup: Any    # setup/cleaning time
+    service: Any  # service duration at the step's stop
+
+
+class SolutionUpdate(NamedTuple):
+    """One plan of VRPSolver.solve_stream()."""
+    objective: int            # Total cost of the plan
+    bound: Optional[float]    # Best objective bound so far (None if unknown)
+    wall_time: float          # Seconds since the solve started
+    solution: Solution
+    final: bool               # Last update: status of the finished solve
+
+
+class _SolutionStreamer(cp_model.CpSolverSolutionCallback):
+    """Extracts every improving solution in the solver thread and queues it."""
+    
+    def __init__(self, solver: 'VRPSolver', updates: queue.Queue):
+        super().__init__()
+        self.solver = solver
+        self.updates = updates
+    
+    def on_solution_callback(self):
+        solution = self.solver.extract_solution(self, cp_model.FEASIBLE)
+        self.updates.put(SolutionUpdate(
+            objective=solution.total_cost,
+            bound=self.BestObjectiveBound(),
+            wall_time=self.WallTime(),
+            solution=solution,
+            final=False,
+        ))
 
 
 class VRPSolver:
-    def __init__(self, data: VRPData, config: VRPConfig):
+    # Model encoding used by the constraint modules
+    backend = 'step'
+    
+    def __init__(self, data: VRPData, config: VRPConfig, vehicle_steps: Optional[List[int]] = None):
         self.data = data
         self.config = config
         self.model = cp_model.CpModel()
@@ -22,55 +87,152 @@ class VRPSolver:
         self.num_stops = data.num_stops
         self.num_shipments = len(data.shipments)
         
-        # Max steps: enough for all stops + buffer (no artificial limit)
-        self.max_steps = (2 * self.num_shipments) + (2 * self.num_vehicles) + 5
+        # Full horizon: enough for all stops + buffer (no artificial limit)
+        self.full_steps = (2 * self.num_shipments) + (2 * self.num_vehicles) + 5
+        
+        # Per-vehicle horizon (smaller when solving by iterative deepening)
+        if vehicle_steps is None:
+            vehicle_steps = [self.full_steps] * self.num_vehicles
+        self.vehicle_steps = [min(max(n, 2), self.full_steps) for n in vehicle_steps]
+        self.max_steps = max(self.vehicle_steps, default=self.full_steps)
+        
+        # Data-derived domains (time, load, leg and cost caps)
+        self.bounds = compute_bounds(data, config, self.vehicle_steps)
         
         # Pre-compute lookup arrays for Element constraints
         self._build_lookup_arrays()
+        
+        # Plain-Python route rules (plan checks, costs, Route building)
+        self.evaluator = RouteEvaluator(data, config)
+        
+        # Heuristic plan returned if the solver finds nothing (see warm_start)
+        self.fallback: Optional[Solution] = None
+        
+        # Static pruning: which stops each vehicle may visit at each step
+        self._build_reachability()
+        
+        # Interchangeable vehicles (for symmetry breaking)
+        self._build_vehicle_classes()
+        
+        # Memoized reified literals shared by all constraint modules
+        self._visit_lits: Dict[Tuple[int, int, int], Any] = {}
+        self._active_visit_lits: Dict[Tuple[int, int, int], Any] = {}
+        self._arc_lookups: Dict[Tuple[int, int], ArcLookup] = {}
+        
+        # Original domains of variables fixed by fix_vehicle (LNS), by proto index
+        self._saved_domains: Dict[int, List[int]] = {}
+        
+        # Per-stage build instrumentation (set by build_model)
+        self.build_profile = None
     
     def _build_lookup_arrays(self):
         """Build arrays for efficient Element constraint lookups."""
         data = self.data
         
+        table = data.stop_table
+        
         # stop_id -> location_idx
-        self.stop_to_location = [s.location_idx for s in data.stops]
+        self.stop_to_location = table.location_idx.tolist()
+        
+        # Flat matrix views [from * num_loc + to] (no copy) and their value ranges
+        self.flat_time = data.travel_time_matrix.flat
+        self.flat_dist = data.travel_dist_matrix.flat
+        self.flat_setup = data.setup_time_matrix.flat
+        self.flat_range = {
+            name: (int(flat.min()), int(flat.max())) if flat.size else (0, 0)
+            for name, flat in (('time', self.flat_time), ('dist', self.flat_dist), ('setup', self.flat_setup))
+        }
+        self._element_values = None  # Lists for AddElement, built on first use
         
         # stop_id -> weight_delta
-        # Apply scaling for float support (e.g. 0.1 -> 10)
+        # Apply scaling for float support (e.g. 0.1 -> 10), truncated like int()
         scale = self.config.capacity_scale_factor
-        self.stop_weight_delta = [int(s.weight_delta * scale) for s in data.stops]
+        self.stop_weight_delta = np.trunc(table.weight_delta * scale).astype(np.int64).tolist()
         
         # stop_id -> volume_delta
-        self.stop_volume_delta = [int(s.volume_delta * scale) for s in data.stops]
+        self.stop_volume_delta = np.trunc(table.volume_delta * scale).astype(np.int64).tolist()
         
         # stop_id -> service_duration (from location)
-        self.stop_service_duration = [
-            data.locations[s.location_idx].service_duration for s in data.stops
-        ]
+        self.stop_service_duration = table.service.tolist()
         
         # stop_id -> zone_id (from location)
-        self.stop_zone = [
-            data.locations[s.location_idx].zone_id for s in data.stops
-        ]
+        zones = [loc.zone_id for loc in data.locations]
+        self.stop_zone = [zones[loc] for loc in self.stop_to_location]
+        
+        def stop_map(stop_type, key_column):
+            ids = table.ids(stop_type)
+            return dict(zip(key_column[ids].tolist(), ids.tolist()))
         
         # Identify depot stops per vehicle
-        self.vehicle_start_stop = {}
-        self.vehicle_end_stop = {}
-        for stop in data.stops:
-            if stop.stop_type == StopType.DEPOT_START:
-                self.vehicle_start_stop[stop.vehicle_idx] = stop.id
-            elif stop.stop_type == StopType.DEPOT_END:
-                self.vehicle_end_stop[stop.vehicle_idx] = stop.id
+        self.vehicle_start_stop = stop_map(StopType.DEPOT_START, table.vehicle_idx)
+        self.vehicle_end_stop = stop_map(StopType.DEPOT_END, table.vehicle_idx)
         
         # Identify shipment stops
-        self.shipment_pickup_stop = {}
-        self.shipment_delivery_stop = {}
-        for stop in data.stops:
-            if stop.stop_type == StopType.PICKUP:
-                self.shipment_pickup_stop[stop.shipment_idx] = stop.id
-            elif stop.stop_type == StopType.DELIVERY:
-                self.shipment_delivery_stop[stop.shipment_idx] = stop.id
+        self.shipment_pickup_stop = stop_map(StopType.PICKUP, table.shipment_idx)
+        self.shipment_delivery_stop = stop_map(StopType.DELIVERY, table.shipment_idx)
 
+    def _build_reachability(self):
+        """Per-vehicle compatible shipments and per-step stop domains."""
+        # compatible_shipments[v] = shipments vehicle v can carry (tags + capacity)
+        self.compatible_shipments = self.evaluator.compatible
+        
+        # infeasible_arcs[i, j] = True if stop j can never directly follow stop i
+        self.infeasible_arcs = self.evaluator.infeasible_arcs
+        
+        # step_domains[v][s] = set of stop ids allowed at route[v, s]
+        # - step 0 is the own start depot, the last step the own end depot
+        # - a pickup needs a delivery and the end depot after it
+        # - a delivery needs its pickup before it (so never at step 1)
+        self.step_domains = {}
+        for v in range(self.num_vehicles):
+            last = self.vehicle_steps[v] - 1
+            pickups = [self.shipment_pickup_stop[i] for i in self.compatible_shipments[v]]
+            deliveries = [self.shipment_delivery_stop[i] for i in self.compatible_shipments[v]]
+            end = self.vehicle_end_stop[v]
+            
+            domains = []
+            for s in range(last + 1):
+                if s == 0:
+                    allowed = [self.vehicle_start_stop[v]]
+                elif s == last:
+                    allowed = [end]
+                else:
+                    allowed = [end]
+                    if s <= last - 2:
+                        allowed += pickups
+                    if s >= 2:
+                        allowed += deliveries
+                domains.append(set(allowed))
+            self.step_domains[v] = domains
+    
+    def _build_vehicle_classes(self):
+        """Group vehicles that are interchangeable in the model."""
+        def signature(v):
+            veh = self.data.vehicles[v]
+            return (veh.profile, veh.cost, veh.labor, veh.start_loc, veh.end_loc,
+                    self.vehicle_steps[v])
+        
+        # vehicle_classes = lists of >= 2 equivalent vehicle indices (ascending)
+        groups = []
+        for v in range(self.num_vehicles):
+            sig = signature(v)
+            for group_sig, members in groups:
+                if group_sig == sig:
+                    members.append(v)
+                    break
+            else:
+                groups.append((sig, [v]))
+        self.vehicle_classes = [members for _, members in groups if len(members) > 1]
+    
+    def forbidden_transitions(self, v: int, s: int) -> List[Tuple[int, int]]:
+        """Infeasible (route[v, s], route[v, s+1]) pairs within the step domains."""
+        curr = sorted(self.step_domains[v][s])
+        nxt = sorted(self.step_domains[v][s + 1])
+        if not curr or not nxt:
+            return []
+        block = self.infeasible_arcs[np.ix_(curr, nxt)]
+        return [(curr[a], nxt[b]) for a, b in zip(*np.nonzero(block))]
+    
     def create_variables(self):
         """Initializes all CP variables for Stop-based routing."""
         m = self.model
@@ -89,12 +251,15 @@ class VRPSolver:
         is_done = {}        # is_done[v, s] = True if route is finished at step s
         
         for v in range(num_v):
-            for s in range(max_s):
-                # Domain: any stop index (0 to num_stops-1)
-                route[v, s] = m.NewIntVar(0, num_stops - 1, f'route_{v}_{s}')
-                arrival_time[v, s] = m.NewIntVar(0, 10000, f'arr_{v}_{s}')
-                load_w[v, s] = m.NewIntVar(0, 2000, f'lw_{v}_{s}')
-                load_v[v, s] = m.NewIntVar(0, 2000, f'lv_{v}_{s}')
+            vb = self.bounds.vehicles[v]
+            for s in range(self.vehicle_steps[v]):
+                # Domain: stops reachable by this vehicle at this step
+                route[v, s] = m.NewIntVarFromDomain(
+                    cp_model.Domain.FromValues(sorted(self.step_domains[v][s])), f'route_{v}_{s}'
+                )
+                arrival_time[v, s] = m.NewIntVar(vb.start, vb.horizon, f'arr_{v}_{s}')
+                load_w[v, s] = m.NewIntVar(0, vb.cap_w, f'lw_{v}_{s}')
+                load_v[v, s] = m.NewIntVar(0, vb.cap_v, f'lv_{v}_{s}')
                 is_done[v, s] = m.NewBoolVar(f'done_{v}_{s}')
         
         self.variables['route'] = route
@@ -141,8 +306,11 @@ class VRPSolver:
         # These will store the location index at each route step
         route_location = {}
         for v in range(num_v):
-            for s in range(max_s):
-                route_location[v, s] = m.NewIntVar(0, self.num_locations - 1, f'rloc_{v}_{s}')
+            for s in range(self.vehicle_steps[v]):
+                locs = sorted({self.stop_to_location[i] for i in self.step_domains[v][s]})
+                route_location[v, s] = m.NewIntVarFromDomain(
+                    cp_model.Domain.FromValues(locs), f'rloc_{v}_{s}'
+                )
                 # Link via Element constraint
                 m.AddElement(route[v, s], self.stop_to_location, route_location[v, s])
         self.variables['route_location'] = route_location
@@ -153,9 +321,314 @@ class VRPSolver:
         self.variables['cost_terms'] = []
         
         return self.variables
-
+    
+    def load_model(self, model: cp_model.CpModel, variables: Dict[str, Any]):
+        """Adopt a complete model built earlier (model cache) instead of building one."""
+        self.model = model
+        self.variables = variables
+    
+    # ======================
+    # Literal Registry
+    # ======================
+    
+    def visit_lit(self, v: int, s: int, stop_id: int):
+        """Literal for route[v, s] == stop_id, encoded once per model."""
+        key = (v, s, stop_id)
+        lit = self._visit_lits.get(key)
+        if lit is None and stop_id not in self.step_domains[v][s]:
+            # Pruned from the domain: statically false
+            lit = self.model.NewConstant(0)
+            self._visit_lits[key] = lit
+        elif lit is None:
+            m = self.model
+            route = self.variables['route']
+            lit = m.NewBoolVar(f'is_stop_{v}_{s}_{stop_id}')
+            m.Add(route[v, s] == stop_id).OnlyEnforceIf(lit)
+            m.Add(route[v, s] != stop_id).OnlyEnforceIf(lit.Not())
+            self._visit_lits[key] = lit
+        return lit
+    
+    def active_visit_lit(self, v: int, s: int, stop_id: int):
+        """Literal for route[v, s] == stop_id AND NOT is_done[v, s]."""
+        key = (v, s, stop_id)
+        lit = self._active_visit_lits.get(key)
+        if lit is None and stop_id not in self.step_domains[v][s]:
+            lit = self.visit_lit(v, s, stop_id)  # Statically false
+            self._active_visit_lits[key] = lit
+        elif lit is None:
+            m = self.model
+            is_this_stop = self.visit_lit(v, s, stop_id)
+            not_done = self.variables['is_done'][v, s].Not()
+            lit = m.NewBoolVar(f'valid_{v}_{s}_{stop_id}')
+            m.AddBoolAnd([is_this_stop, not_done]).OnlyEnforceIf(lit)
+            m.AddBoolOr([is_this_stop.Not(), not_done.Not()]).OnlyEnforceIf(lit.Not())
+            self._active_visit_lits[key] = lit
+        return lit
+    
+    def at_end_lit(self, v: int, s: int):
+        """Literal for route[v, s] == end depot of vehicle v."""
+        return self.visit_lit(v, s, self.vehicle_end_stop[v])
+    
+    def arc_lookup(self, v: int, s: int) -> ArcLookup:
+        """Drive/distance/setup/service of leg s -> s+1, built once per (v, s)."""
+        key = (v, s)
+        leg = self._arc_lookups.get(key)
+        if leg is None:
+            m = self.model
+            num_loc = self.num_locations
+            route = self.variables['route']
+            route_location = self.variables['route_location']
+            
+            drive = m.NewIntVar(*self.flat_range['time'], f'dt_{v}_{s}')
+            dist = m.NewIntVar(*self.flat_range['dist'], f'dist_{v}_{s}')
+            setup = m.NewIntVar(*self.flat_range['setup'], f'st_{v}_{s}')
+            
+            if self.config.arc_encoding == 'table':
+                # One tuple per feasible location pair: propagates both ways
+                idx = None
+                m.AddAllowedAssignments(
+                    [route_location[v, s], route_location[v, s+1], drive, dist, setup],
+                    self.arc_table(v, s),
+                )
+            else:
+                idx = m.NewIntVar(0, num_loc**2 - 1, f'idx_{v}_{s}')
+                m.Add(idx == route_location[v, s] * num_loc + route_location[v, s+1])
+                if self._element_values is None:
+                    # AddElement takes a Python sequence, not an array
+                    self._element_values = [flat.tolist() for flat in (self.flat_time, self.flat_dist, self.flat_setup)]
+                time_values, dist_values, setup_values = self._element_values
+                m.AddElement(idx, time_values, drive)
+                m.AddElement(idx, dist_values, dist)
+                m.AddElement(idx, setup_values, setup)
+            
+            serv_dur = self.stop_service_duration
+            service = m.NewIntVar(min(serv_dur), max(serv_dur), f'sert_{v}_{s}')
+            m.AddElement(route[v, s], serv_dur, service)
+            
+            leg = ArcLookup(idx, drive, dist, setup, service)
+            self._arc_lookups[key] = leg
+        return leg
+    
+    def arc_table(self, v: int, s: int) -> List[Tuple[int, int, int, int, int]]:
+        """
+        (from_loc, to_loc, drive, dist, setup) tuples of leg s -> s+1.
+        
+        Location pairs of the step domains with at least one stop pair not
+        pruned by the arc filter (the end depot may follow itself).
+        """
+        curr = sorted(self.step_domains[v][s])
+        nxt = sorted(self.step_domains[v][s + 1])
+        allowed = ~self.infeasible_arcs[np.ix_(curr, nxt)]
+        loc = np.asarray(self.stop_to_location)
+        rows, cols = np.nonzero(allowed)
+        pairs = np.array(sorted(set(zip(loc[curr][rows].tolist(), loc[nxt][cols].tolist()))), dtype=np.int64)
+        if not len(pairs):
+            return []
+        flat = pairs[:, 0] * self.num_locations + pairs[:, 1]
+        return np.column_stack(
+            [pairs, self.flat_time[flat], self.flat_dist[flat], self.flat_setup[flat]]
+        ).tolist()
+    
+    def _plan_visits(self, solution: Solution) -> Dict[int, List[Tuple[int, int, int, int]]]:
+        """
+        Per-vehicle (stop_id, arrival, load_w, load_v) of a Solution, unused
+        vehicles included, with interchangeable vehicles reordered to satisfy
+        the symmetry-breaking rules (used first, ascending first stop).
+        """
+        scale = self.config.capacity_scale_factor
+        plan = {}
+        for route in solution.routes:
+            plan[route.vehicle_id] = [
+                (stop.id, stop.arrival_time, round(stop.cum_weight * scale), round(stop.cum_volume * scale))
+                for stop in route.stops
+            ]
+        for v in range(self.num_vehicles):
+            if v not in plan:
+                plan[v] = self.evaluator.simulate(v, self.evaluator.empty_route(v))
+        
+        for members in self.vehicle_classes:
+            used = sorted((plan[v] for v in members if len(plan[v]) > 2), key=lambda visits: visits[1][0])
+            for k, v in enumerate(members):
+                if k < len(used):
+                    # Same depots/shift: only the depot stop ids change
+                    visits = used[k]
+                    start, end = self.vehicle_start_stop[v], self.vehicle_end_stop[v]
+                    plan[v] = [(start,) + visits[0][1:]] + visits[1:-1] + [(end,) + visits[-1][1:]]
+                else:
+                    plan[v] = self.evaluator.simulate(v, self.evaluator.empty_route(v))
+        return plan
+    
+    def add_solution_hint(self, solution: Solution):
+        """Hint route/arrival/load/is_done/is_used from a plan (heuristic or previous solve)."""
+        if not solution.is_feasible:
+            return
+        m = self.model
+        cars = self.variables
+        
+        for v, visits in self._plan_visits(solution).items():
+            if visits is None or len(visits) > self.vehicle_steps[v]:
+                continue  # Does not fit this horizon
+            
+            # Pad with the end depot, as the model does (loads reset to 0)
+            last = len(visits) - 1
+            for s in range(self.vehicle_steps[v]):
+                stop_id, arrival, lw, lv = visits[min(s, last)]
+                m.AddHint(cars['route'][v, s], stop_id)
+                m.AddHint(cars['is_done'][v, s], s >= last)
+                m.AddHint(cars['arrival_time'][v, s], arrival)
+                m.AddHint(cars['load_w'][v, s], lw if s <= last else 0)
+                m.AddHint(cars['load_v'][v, s], lv if s <= last else 0)
+            m.AddHint(cars['is_used'][v], last > 1)
+        
+        for ship_idx, served in enumerate(solution.served):
+            m.AddHint(cars['is_served'][ship_idx], served)
+    
+    # ======================
+    # Neighborhood Fixing (LNS)
+    # ======================
+    
+    def fix_value(self, var, value: int):
+        """Restrict var to a single value through its domain (undone by release_fixed)."""
+        index = var.Index()
+        proto = self.model.Proto().variables[index]
+        self._saved_domains.setdefault(index, list(proto.domain))
+        proto.domain.clear()
+        proto.domain.extend([value, value])
+    
+    def fix_vehicle(self, v: int, visits: List[Tuple[int, int, int, int]]):
+        """Fix vehicle v to a route of _plan_visits, with the same values as add_solution_hint."""
+        cars = self.variables
+        last = len(visits) - 1
+        for s in range(self.vehicle_steps[v]):
+            stop_id, arrival, lw, lv = visits[min(s, last)]
+            self.fix_value(cars['route'][v, s], stop_id)
+            self.fix_value(cars['is_done'][v, s], int(s >= last))
+            self.fix_value(cars['arrival_time'][v, s], arrival)
+            self.fix_value(cars['load_w'][v, s], lw if s <= last else 0)
+            self.fix_value(cars['load_v'][v, s], lv if s <= last else 0)
+        self.fix_value(cars['is_used'][v], int(last > 1))
+    
+    def release_fixed(self):
+        """Restore every domain narrowed by fix_value."""
+        variables = self.model.Proto().variables
+        for index, domain in self._saved_domains.items():
+            variables[index].domain.clear()
+            variables[index].domain.extend(domain)
+        self._saved_domains.clear()
+    
+    def warm_start(self, solution: Solution):
+        """Hint the model with a plan and return it if the solver finds nothing."""
+        self.add_solution_hint(solution)
+        if solution.is_feasible:
+            self.fallback = solution
+    
     def solve(self):
         solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = self.config.max_solver_time
+        configure_solver(solver, self.config)
         status = solver.Solve(self.model)
         return solver, status
+    
+    def solve_stream(self) -> Iterator[SolutionUpdate]:
+        """
+        Solve in a background thread, yielding each improving plan as CP-SAT
+        finds it.
+        
+        The warm-start fallback (if any) comes first, so a usable plan is
+        available before presolve ends. The last update is final and carries
+        the status of the finished solve. Closing the generator early stops
+        the search.
+        """
+        if self.fallback is not None:
+            yield SolutionUpdate(self.fallback.total_cost, None, 0.0, self.fallback, False)
+        
+        cp_solver = cp_model.CpSolver()
+        configure_solver(cp_solver, self.config)
+        updates: queue.Queue = queue.Queue()
+        streamer = _SolutionStreamer(self, updates)
+        result = {}
+        
+        def run():
+            try:
+                result['status'] = cp_solver.Solve(self.model, streamer)
+            except Exception as e:  # Re-raised in the consumer thread
+                result['error'] = e
+            finally:
+                updates.put(None)
+        
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        try:
+            while True:
+                update = updates.get()
+                if update is None:
+                    break
+                yield update
+        finally:
+            if thread.is_alive():
+                cp_solver.StopSearch()
+            thread.join()
+        
+        if 'error' in result:
+            raise result['error']
+        solution = self.extract_solution(cp_solver, result['status'])
+        yield SolutionUpdate(
+            objective=solution.total_cost,
+            bound=cp_solver.BestObjectiveBound(),
+            wall_time=cp_solver.WallTime(),
+            solution=solution,
+            final=True,
+        )
+    
+    # ======================
+    # Solution Extraction
+    # ======================
+    
+    def _route_visits(self, cp_solver: cp_model.CpSolver, v: int) -> List[Tuple[int, int, int, int]]:
+        """Visited (stop_id, arrival, load_w, load_v) of vehicle v, in route order."""
+        cars = self.variables
+        val = cp_solver.Value
+        visits = []
+        for s in range(self.vehicle_steps[v]):
+            is_d = val(cars['is_done'][v, s])
+            prev_d = val(cars['is_done'][v, s-1]) if s > 0 else False
+            if is_d and prev_d:
+                break  # Tail padding at end depot
+            visits.append((
+                val(cars['route'][v, s]),
+                val(cars['arrival_time'][v, s]),
+                val(cars['load_w'][v, s]),
+                val(cars['load_v'][v, s]),
+            ))
+        return visits
+    
+    def extract_solution(self, cp_solver: cp_model.CpSolver, status) -> Solution:
+        """Convert solver values into a variable-free Solution."""
+        data = self.data
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            if self.fallback is not None:
+                return self.fallback
+            return Solution(status='infeasible', served=[False] * self.num_shipments)
+        
+        cars = self.variables
+        val = cp_solver.Value
+        
+        routes = []
+        for v in range(self.num_vehicles):
+            if not val(cars['is_used'][v]):
+                continue
+            
+            route = self.evaluator.to_route(v, self._route_visits(cp_solver, v))
+            routes.append(route)
+        
+        costs = {key: val(cars[name]) if name in cars else 0 for key, name in COST_VARIABLES.items()}
+        if self.config.rehandling_mode == 'post_eval':
+            # Not in the model: evaluate on the final routes
+            costs['rehandling'] = rehandling_cost(data, self.config, routes)
+            costs['total'] += costs['rehandling']
+        
+        return Solution(
+            status='optimal' if status == cp_model.OPTIMAL else 'feasible',
+            routes=routes,
+            costs=costs,
+            served=[bool(val(cars['is_served'][i])) for i in range(self.num_shipments)],
+        )
@@ -2,46 +2,38 @@
 VRP Solution Printer for Stop-based model.
 """
 from ortools.sat.python import cp_model
+from vrp_solver.domain import VRPData, Solution
 from vrp_solver.ortools_solver.wrapper import VRPSolver
 
 
 def print_solution(wrapper: VRPSolver, cp_solver: cp_model.CpSolver, status):
-    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+    print_report(wrapper.data, wrapper.extract_solution(cp_solver, status))
+
+
+def print_report(data: VRPData, solution: Solution):
+    """Print a variable-free Solution (any backend or engine)."""
+    if not solution.is_feasible:
         print("No solution found.")
         return
 
-    cars = wrapper.variables
-    data = wrapper.data
-    
-    # helper for getValue
-    def val(var):
-        if isinstance(var, int): return var
-        return cp_solver.Value(var)
-    
-    t_cost = val(cars['total_cost'])
-    fv     = val(cars['c_fixed'])
-    dv     = val(cars['c_dist'])
-    tv     = val(cars['c_time'])
-    zv     = val(cars['c_zone'])
-    rh     = val(cars.get('c_rehandling', 0))
-    wv     = val(cars['c_waiting'])
-    pv     = val(cars['c_penalty'])
-    lv     = val(cars['c_late'])
+    costs = solution.costs
     
     print("============================================================")
     print("🚚 VRP FINAL SIMULATION REPORT (Stop-Based Model)")
     print("============================================================")
+    if solution.status == "heuristic":
+        print("⚠️  No solver solution in time: showing the construction heuristic plan")
     print("💰 Total Cost breakdown:")
-    print(f"   Total Objective : {t_cost}")
+    print(f"   Total Objective : {costs.get('total', 0)}")
     print("   ----------------------------------------")
-    print(f"   1. Fixed Cost   : {fv}")
-    print(f"   2. Dist Cost    : {dv}")
-    print(f"   3. Labor Cost   : {tv}")
-    print(f"   4. Zone Penalty : {zv}")
-    print(f"   5. Re-handling  : {rh}")
-    print(f"   6. Waiting Cost : {wv}")
-    print(f"   7. Miss Penalty : {pv}")
-    print(f"   8. Late Penalty : {lv}")
+    print(f"   1. Fixed Cost   : {costs.get('fixed', 0)}")
+    print(f"   2. Dist Cost    : {costs.get('distance', 0)}")
+    print(f"   3. Labor Cost   : {costs.get('labor', 0)}")
+    print(f"   4. Zone Penalty : {costs.get('zone_penalty', 0)}")
+    print(f"   5. Re-handling  : {costs.get('rehandling', 0)}")
+    print(f"   6. Waiting Cost : {costs.get('waiting', 0)}")
+    print(f"   7. Miss Penalty : {costs.get('unserved_penalty', 0)}")
+    print(f"   8. Late Penalty : {costs.get('late_penalty', 0)}")
     print("============================================================\n")
     
     # Shipment Service Summary
@@ -49,21 +41,24 @@ def print_solution(wrapper: VRPSolver, cp_solver: cp_model.CpSolver, status):
     print("📦 SHIPMENT SERVICE STATUS")
     print("============================================================")
     
-    is_served = cars['is_served']
-    visit_step = cars['visit_step']
-    visit_vehicle = cars['visit_vehicle']
+    # ship_idx -> (vehicle, pickup step, delivery step)
+    placement = {}
+    for route in solution.routes:
+        for step, stop in enumerate(route.stops):
+            if stop.is_depot:
+                continue
+            veh, p_step, d_step = placement.get(stop.shipment_idx, (route.vehicle_id + 1, 0, 0))
+            if stop.is_pickup:
+                p_step = step
+            else:
+                d_step = step
+            placement[stop.shipment_idx] = (veh, p_step, d_step)
     
     served_count = 0
     for ship_idx, ship in enumerate(data.shipments):
-        if val(is_served[ship_idx]):
+        if solution.served[ship_idx]:
             served_count += 1
-            p_stop = wrapper.shipment_pickup_stop[ship_idx]
-            d_stop = wrapper.shipment_delivery_stop[ship_idx]
-            
-            p_step = val(visit_step[p_stop])
-            d_step = val(visit_step[d_stop])
-            veh = val(visit_vehicle[p_stop])
-            
+            veh, p_step, d_step = placement[ship_idx]
             print(f"  ✅ {ship.name}: Pickup@step{p_step} -> Delivery@step{d_step} (Vehicle {veh})")
         else:
             print(f"  ❌ {ship.name}: NOT SERVED")
@@ -72,38 +67,20 @@ def print_solution(wrapper: VRPSolver, cp_solver: cp_model.CpSolver, status):
     print("============================================================\n")
     
     # Vehicle Routes
-    route = cars['route']
-    arrival_time = cars['arrival_time']
-    load_w = cars['load_w']
-    is_done = cars['is_done']
-    is_used = cars['is_used']
-    
     print("============================================================")
     print("🚛 VEHICLE ROUTES")
     print("============================================================")
     
-    for v in range(wrapper.num_vehicles):
-        if val(is_used[v]):
-            print(f"\n🚛 Vehicle {v + 1}")
+    for route in solution.routes:
+        print(f"\n🚛 Vehicle {route.vehicle_id + 1}")
+        
+        for step, stop in enumerate(route.stops):
+            loc = data.locations[stop.location_idx]
+            
+            stop_info = f"{stop.stop_type.value}"
+            if stop.shipment_idx >= 0:
+                stop_info += f" (Ship_{stop.shipment_idx})"
             
-            for s in range(wrapper.max_steps):
-                if val(is_done[v, s]) and (s > 0 and val(is_done[v, s-1])):
-                    continue  # Skip tail
-                
-                vd = val(is_done[v, s])
-                vpd = val(is_done[v, s-1]) if s > 0 else False
-                
-                if not vd or (vd and not vpd):
-                    stop_idx = val(route[v, s])
-                    stop = data.stops[stop_idx]
-                    loc = data.locations[stop.location_idx]
-                    w = val(load_w[v, s])
-                    arr = val(arrival_time[v, s])
-                    
-                    stop_info = f"{stop.stop_type.value}"
-                    if stop.shipment_idx >= 0:
-                        stop_info += f" (Ship_{stop.shipment_idx})"
-                    
-                    print(f"   Step {s:02d} | {loc.name} | {stop_info} | Time: {arr:04d} | Load {w}")
+            print(f"   Step {step:02d} | {loc.name} | {stop_info} | Time: {stop.arrival_time:04d} | Load {stop.cum_weight:g}")
     
     print("\n============================================================")
@@ -174,7 +174,7 @@ def print_worker_schedule(solver, cp_solver, data, idx_to_site):
         sorted_steps = []
         found_end = False
         
-        for s in range(solver.max_steps):
+        for s in range(solver.vehicle_steps[v]):
             is_nav_done = cp_solver.Value(vars['is_done'][v, s])
             
             # If we previously hit the end, ignore further padding steps
@@ -0,0 +1,68 @@
+"""
+Cross-engine cost consistency.
+
+ALNS, the routing engine and the greedy construction report costs through
+RouteEvaluator.build_solution; CP-SAT through ObjectiveConstraints. Fixing
+an engine's routes in the CP-SAT model (times left to the solver) must
+reproduce its cost breakdown on both model backends, or comparing engines
+by total is meaningless.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import replace
+from ortools.sat.python import cp_model
+from vrp_solver.config import VRPConfig
+from vrp_solver.domain import VRPData, Solution
+from vrp_solver.logic.data_loader import load_dummy_data
+from vrp_solver.ortools_solver.backends import build_model
+from vrp_solver.ortools_solver.routing_engine import solve_routing
+from vrp_solver.heuristics.construction import greedy_insertion
+from vrp_solver.heuristics.alns import solve_alns
+
+
+def cpsat_costs(data: VRPData, config: VRPConfig, solution: Solution) -> dict:
+    """
+    Cost breakdown CP-SAT gives the routes of solution: every hinted
+    variable but the arrival times is fixed, CP-SAT schedules the routes.
+    """
+    solver = build_model(data, replace(config, construction_hint=False))
+    solver.add_solution_hint(solution)  # No warm_start: its fallback would mask a rejected plan
+    
+    cars = solver.variables
+    arrivals = cars['arrival_time'] if 'arrival_time' in cars else cars['stop_arrival']
+    timed = {var.Index() for var in arrivals.values()}
+    hint = solver.model.Proto().solution_hint
+    for index, value in list(zip(hint.vars, hint.values)):
+        if index not in timed:
+            solver.fix_value(solver.model.GetIntVarFromProtoIndex(index), value)
+    solver.model.ClearHints()
+    
+    cp_solver = cp_model.CpSolver()
+    cp_solver.parameters.max_time_in_seconds = 30
+    cp_solver.parameters.num_workers = 1
+    status = cp_solver.Solve(solver.model)
+    assert status == cp_model.OPTIMAL, \
+        f"{config.model_backend} model: {cp_solver.StatusName(status)} on the fixed routes"
+    return solver.extract_solution(cp_solver, status).costs
+
+
+def test_engine_costs_match_cpsat():
+    config = VRPConfig(max_solver_time=2, alns_max_iterations=300)
+    data = load_dummy_data(config)
+    plans = {
+        'greedy': greedy_insertion(data, config),
+        'alns': solve_alns(data, config),
+        'routing': solve_routing(data, config),
+    }
+    for engine, solution in plans.items():
+        assert solution.is_feasible, f"{engine} found no plan"
+        for backend in ('step', 'circuit'):
+            costs = cpsat_costs(data, replace(config, model_backend=backend), solution)
+            assert costs == solution.costs, f"{engine} plan on the {backend} model: {costs} != {solution.costs}"
+
+
+if __name__ == "__main__":
+    test_engine_costs_match_cpsat()
+    print("Engine costs match CP-SAT")
@@ -357,7 +357,7 @@ def main():
         for v in range(solver.num_vehicles):
             if cp_solver.Value(vars['is_used'][v]):
                 print(f"\n{vrp_data.vehicles[v].name}:")
-                for s in range(solver.max_steps):
+                for s in range(solver.vehicle_steps[v]):
                     is_d = cp_solver.Value(vars['is_done'][v, s])
                     loc_idx = cp_solver.Value(vars['route'][v, s])
                     arr = cp_solver.Value(vars['arrival_time'][v, s])